@@ -2,8 +2,11 @@
 from utils.dict_parse import DictParse
 from config.config import config
 from functools import wraps
-from typing import Any
+from typing import Any, List, Optional, Tuple
+import binascii
 import pymongo
+import base64
+import json
 import os
 
 
@@ -38,11 +41,28 @@ class DataAccessBase:
     CURRENT_STATS_COL = DB["currentStats"]
     NOTIFICATION_COL = DB["notifications"]
     FORMER_USERS_COL = DB["formerUsers"]
+    META_COL = DB["metadata"]
+    STAT_SUMMARY_COL = DB["statSummaries"]
+    TASK_REMINDER_COL = DB["taskReminders"]
+    OUTBOX_COL = DB["outbox"]
 
     # Set config constants
     DB_SPECS = db_spec
     CONFIG = config
 
+    # Indexes the class' queries rely on, as (collection, IndexModel) pairs
+    INDEXES = []
+
+    # Query shapes the indexes have to serve, as (collection, query) pairs
+    QUERY_SHAPES = []
+
+    # Cursor pagination orders, always ending with the unique _id
+    ID_SORT = [("_id", pymongo.ASCENDING)]
+    NEWEST_SORT = [
+        ("datetime_created", pymongo.DESCENDING),
+        ("_id", pymongo.DESCENDING),
+    ]
+
     def sendError(message: str, **kwargs: Any) -> dict:
         """Error message format method"""
 
@@ -75,3 +95,45 @@ class DataAccessBase:
 
         # End of wrapper definition
         return wrapper
+
+    def find_page(
+        collection: pymongo.collection.Collection,
+        query: dict,
+        page_size: int,
+        cursor: str,
+        sort: List[Tuple[str, int]],
+    ) -> Tuple[Optional[list], dict]:
+        """Keyset pagination method that continues after the given cursor"""
+
+        # Decode the sort key values of the last document of the previous
+        # page, an empty cursor starting from the first page
+        if cursor != "":
+            try:
+                values = json.loads(base64.urlsafe_b64decode(cursor))
+            except (binascii.Error, ValueError, TypeError):
+                values = None
+            if not isinstance(values, list) or len(values) != len(sort):
+                return None, {}
+
+            # Only match documents that sort after those values
+            after = []
+            for i, (key, direction) in enumerate(sort):
+                clause = {k: values[j] for j, (k, _) in enumerate(sort[:i])}
+                operator = "$gt" if direction == pymongo.ASCENDING else "$lt"
+                clause[key] = {operator: values[i]}
+                after.append(clause)
+            query = {"$and": [query, {"$or": after}]}
+
+        # Get one more document than needed to know if a page follows
+        results = list(collection.find(query).sort(sort).limit(page_size + 1))
+
+        # Point the next cursor after the last document of the page
+        next_cursor = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            next_cursor = base64.urlsafe_b64encode(
+                json.dumps([results[-1].get(k) for k, _ in sort]).encode()
+            ).decode()
+
+        # Return the page and the cursor to the next one
+        return results, {"next_cursor": next_cursor}
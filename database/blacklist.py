@@ -0,0 +1,188 @@
+# Imports
+from flask_jwt_extended import decode_token
+from utils.dict_parse import DictParse
+from .base import DataAccessBase
+from pymongo import ASCENDING, IndexModel, UpdateOne
+import threading
+import datetime
+import time
+
+
+class BlacklistAccess(DataAccessBase):
+    """Class that handles revoked JWT tokens"""
+
+    # Indexes the class' queries rely on, letting MongoDB drop entries once
+    # their token would have expired
+    INDEXES = [
+        (
+            DataAccessBase.BLACKLIST_COL,
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ),
+        (
+            DataAccessBase.BLACKLIST_COL,
+            IndexModel([("created_at", ASCENDING)]),
+        ),
+    ]
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (DataAccessBase.BLACKLIST_COL, {"created_at": {"$gte": 0}}),
+    ]
+
+    # Seconds between incremental refreshes of the in-memory blacklist
+    REFRESH_INTERVAL = 5
+
+    # Seconds refreshes look back to tolerate clock skew between workers
+    REFRESH_OVERLAP = 30
+
+    # Static variable declaration
+    _revoked = {}
+    _refreshed = None
+    _checked = float("-inf")
+    _lock = threading.Lock()
+    _revoked_lock = threading.Lock()
+
+    @staticmethod
+    def convert_legacy_entries() -> None:
+        """Method to convert entries that stored the full tokens"""
+
+        # Convert entries that stored the full tokens into per-JTI entries
+        # that expire once any token could have expired
+        now = datetime.datetime.utcnow()
+        expiry = now + datetime.timedelta(
+            hours=DataAccessBase.CONFIG.JWT.refresh_expiry
+        )
+        legacy = list(
+            DataAccessBase.BLACKLIST_COL.find(
+                {"access_jti": {"$exists": True}}
+            )
+        )
+        for item in legacy:
+            BlacklistAccess._store(
+                [
+                    (item["access_jti"], expiry),
+                    (item["refresh_jti"], expiry),
+                ]
+            )
+        if legacy:
+            DataAccessBase.BLACKLIST_COL.delete_many(
+                {"_id": {"$in": [item["_id"] for item in legacy]}}
+            )
+
+    @staticmethod
+    @DataAccessBase.dict_wrap
+    def revoke(*tokens: str) -> DictParse:
+        """Method to revoke the given encoded tokens"""
+
+        # Get the JTI and expiry of every token
+        entries = []
+        for token in tokens:
+            decoded = decode_token(token)
+            entries.append(
+                (
+                    decoded["jti"],
+                    datetime.datetime.utcfromtimestamp(decoded["exp"]),
+                )
+            )
+
+        # Place the entries into the blacklist collection
+        BlacklistAccess._store(entries)
+
+        # Return message
+        return DataAccessBase.sendSuccess("Signed out")
+
+    @staticmethod
+    def is_revoked(jti: str) -> bool:
+        """Method to check if a token's JTI has been revoked"""
+
+        # Pull in entries revoked by other workers if it is time to
+        if (
+            time.monotonic() - BlacklistAccess._checked
+            >= BlacklistAccess.REFRESH_INTERVAL
+        ):
+            BlacklistAccess._refresh()
+
+        # Return whether the JTI is in the blacklist
+        return jti in BlacklistAccess._revoked
+
+    @staticmethod
+    def _store(entries: list) -> None:
+        """Method to save (jti, expiry) pairs to the collection and memory"""
+
+        # Return if there is nothing to save
+        if not entries:
+            return
+
+        # Upsert every entry so revoking a token twice is harmless
+        now = datetime.datetime.utcnow()
+        DataAccessBase.BLACKLIST_COL.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": jti},
+                    {
+                        "$setOnInsert": {
+                            "expires_at": expires_at,
+                            "created_at": now,
+                        }
+                    },
+                    upsert=True,
+                )
+                for jti, expires_at in entries
+            ],
+            ordered=False,
+        )
+
+        # Add the entries to this worker's blacklist right away
+        with BlacklistAccess._revoked_lock:
+            BlacklistAccess._revoked.update(entries)
+
+    @staticmethod
+    def _refresh() -> None:
+        """Method to load the entries revoked since the last refresh"""
+
+        # Wait for another thread's first load, since the blacklist is
+        # empty until then, and otherwise return if one is already refreshing
+        first_load = BlacklistAccess._refreshed is None
+        if not BlacklistAccess._lock.acquire(blocking=first_load):
+            return
+
+        # Try
+        try:
+            # Return if another thread finished the first load while waiting
+            if first_load and BlacklistAccess._refreshed is not None:
+                return
+
+            # Query the whole collection first, and then only new entries
+            now = datetime.datetime.utcnow()
+            query = {}
+            if BlacklistAccess._refreshed is not None:
+                query["created_at"] = {
+                    "$gte": BlacklistAccess._refreshed
+                    - datetime.timedelta(
+                        seconds=BlacklistAccess.REFRESH_OVERLAP
+                    )
+                }
+
+            # Get the new entries
+            found = {
+                item["_id"]: item["expires_at"]
+                for item in DataAccessBase.BLACKLIST_COL.find(
+                    query, {"expires_at": 1}
+                )
+            }
+
+            # Merge the new entries into the blacklist and drop the expired
+            # ones, keeping the entries stored while the query ran
+            with BlacklistAccess._revoked_lock:
+                revoked = BlacklistAccess._revoked
+                revoked.update(found)
+                for jti in [k for k, v in revoked.items() if v <= now]:
+                    del revoked[jti]
+
+            # Track the refresh
+            BlacklistAccess._refreshed = now
+            BlacklistAccess._checked = time.monotonic()
+
+        # Release the lock
+        finally:
+            BlacklistAccess._lock.release()
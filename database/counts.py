@@ -0,0 +1,131 @@
+# Imports
+from pymongo.collection import Collection
+from typing import Iterable, Optional
+import threading
+import json
+import time
+
+
+class CountCache:
+    """Per-process cache of document counts keyed by query shape"""
+
+    # Seconds a count is reused, bounding the drift from other processes
+    TTL = 30
+
+    # Most counts held at once before the oldest ones are dropped
+    MAX_ENTRIES = 10000
+
+    # Static variable declaration
+    _counts = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _fields(query: dict) -> Optional[dict]:
+        """Method to get the field values of a plain equality query"""
+
+        # Merge an $and of equality clauses into a single clause
+        if list(query) == ["$and"]:
+            merged = {}
+            for clause in query["$and"]:
+                fields = CountCache._fields(clause)
+                if fields is None:
+                    return None
+                merged.update(fields)
+            return merged
+
+        # Return nothing if any condition is more than an equality
+        for key, value in query.items():
+            if key.startswith("$") or isinstance(value, (dict, list)):
+                return None
+        return dict(query)
+
+    @staticmethod
+    def _matches(fields: dict, document: dict) -> bool:
+        """Method to check if a document matches equality field values"""
+
+        # Compare every field, following dotted paths into the document and
+        # matching array fields that contain the value
+        for key, value in fields.items():
+            current = document
+            for part in key.split("."):
+                current = (
+                    current.get(part) if isinstance(current, dict) else None
+                )
+            if current != value and not (
+                isinstance(current, list) and value in current
+            ):
+                return False
+        return True
+
+    @staticmethod
+    def count(
+        collection: Collection, query: dict, estimated: bool = False
+    ) -> int:
+        """Method to get the number of documents matching a query"""
+
+        # Return the held count if it is still fresh
+        key = (collection.name, json.dumps(query, sort_keys=True, default=str))
+        now = time.monotonic()
+        entry = CountCache._counts.get(key)
+        if entry is not None and now - entry["time"] < CountCache.TTL:
+            return entry["count"]
+
+        # Count from collection metadata if an estimate is fine, or with
+        # the query otherwise
+        if estimated and query == {}:
+            count = collection.estimated_document_count()
+        else:
+            count = collection.count_documents(query)
+
+        # Hold the count, dropping the oldest counts when full
+        with CountCache._lock:
+            while len(CountCache._counts) >= CountCache.MAX_ENTRIES:
+                del CountCache._counts[next(iter(CountCache._counts))]
+            CountCache._counts[key] = {
+                "count": count,
+                "time": now,
+                "fields": CountCache._fields(query),
+            }
+
+        # Return the count
+        return count
+
+    @staticmethod
+    def _apply(collection: Collection, document: dict, delta: int) -> None:
+        """Method to move the counts a document counts towards"""
+
+        # Adjust the equality counts the document matches, and drop the
+        # counts that cannot be adjusted without the query
+        with CountCache._lock:
+            for key, entry in list(CountCache._counts.items()):
+                if key[0] != collection.name:
+                    continue
+                if entry["fields"] is None:
+                    del CountCache._counts[key]
+                elif CountCache._matches(entry["fields"], document):
+                    entry["count"] = max(entry["count"] + delta, 0)
+
+    @staticmethod
+    def inserted(collection: Collection, document: dict) -> None:
+        """Method to account for an inserted document"""
+        CountCache._apply(collection, document, 1)
+
+    @staticmethod
+    def deleted(collection: Collection, document: dict) -> None:
+        """Method to account for a deleted document"""
+        CountCache._apply(collection, document, -1)
+
+    @staticmethod
+    def updated(collection: Collection, fields: Iterable[str]) -> None:
+        """Method to drop the counts an update to the given fields affects"""
+
+        # Drop the counts filtering on an updated field, and the counts
+        # that cannot tell which fields they filter on
+        fields = {i.split(".")[0] for i in fields}
+        with CountCache._lock:
+            for key, entry in list(CountCache._counts.items()):
+                if key[0] == collection.name and (
+                    entry["fields"] is None
+                    or fields & {i.split(".")[0] for i in entry["fields"]}
+                ):
+                    del CountCache._counts[key]
@@ -1,6 +1,7 @@
 # Imports
 from utils.dict_parse import DictParse
 from .base import DataAccessBase
+from pymongo import ASCENDING, IndexModel
 from config.config import config
 from models.event import Event
 from typing import Any
@@ -11,6 +12,36 @@ import uuid
 class EventAccess(DataAccessBase):
     """Class that handles event information"""
 
+    # Indexes the class' queries rely on
+    INDEXES = [
+        (
+            DataAccessBase.EVENT_COL,
+            IndexModel([("unit", ASCENDING), ("start_datetime", ASCENDING)]),
+        ),
+        (
+            DataAccessBase.EVENT_COL,
+            IndexModel([("start_datetime", ASCENDING)]),
+        ),
+    ]
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (
+            DataAccessBase.EVENT_COL,
+            {"unit": "", "start_datetime": {"$gte": 0, "$lte": 0}},
+        ),
+        (
+            DataAccessBase.EVENT_COL,
+            {
+                "start_datetime": {"$lte": 0},
+                "$or": [
+                    {"heads_up_dispatched": {"$ne": True}},
+                    {"heads_up_dispatched": {"$exists": False}},
+                ],
+            },
+        ),
+    ]
+
     @staticmethod
     @DataAccessBase.dict_wrap
     def create_event(
@@ -0,0 +1,68 @@
+# Imports
+from flask import g, has_request_context
+from pymongo.collection import Collection
+from typing import Optional
+import copy
+
+
+class IdentityMap:
+    """Request-scoped map of the documents already fetched by the request"""
+
+    @staticmethod
+    def _documents() -> Optional[dict]:
+        """Method to get the current request's document map"""
+
+        # Return nothing if this is not running inside of a request
+        if not has_request_context():
+            return None
+
+        # Initialize the map on the first use within the request
+        if "identity_map" not in g:
+            g.identity_map = {}
+            g.identity_map_hits = 0
+
+        # Return the map
+        return g.identity_map
+
+    @staticmethod
+    def get(collection: Collection, id: str) -> Optional[dict]:
+        """Method to get a copy of a document fetched earlier"""
+
+        # Return nothing if the document has not been fetched yet
+        documents = IdentityMap._documents()
+        if documents is None or (collection.name, id) not in documents:
+            return None
+
+        # Track the saved round-trip and return a copy of the document
+        g.identity_map_hits += 1
+        return copy.deepcopy(documents[(collection.name, id)])
+
+    @staticmethod
+    def put(collection: Collection, document: Optional[dict]) -> None:
+        """Method to remember a document fetched by the request"""
+
+        # Save a copy of the document if there is one
+        documents = IdentityMap._documents()
+        if documents is not None and document is not None:
+            documents[(collection.name, document["_id"])] = copy.deepcopy(
+                document
+            )
+
+    @staticmethod
+    def evict(collection: Collection, id: Optional[str] = None) -> None:
+        """Method to forget a document, or a whole collection, after writes"""
+
+        # Return if there is nothing to evict
+        documents = IdentityMap._documents()
+        if documents is None:
+            return
+
+        # Remove the matching documents
+        for key in list(documents):
+            if key[0] == collection.name and id in (None, key[1]):
+                del documents[key]
+
+    @staticmethod
+    def hits() -> int:
+        """Method to get how many fetches the request has saved"""
+        return g.get("identity_map_hits", 0) if has_request_context() else 0
@@ -0,0 +1,185 @@
+# Imports
+from database.base import DataAccessBase
+from database.blacklist import BlacklistAccess
+from database.event import EventAccess
+from database.notification import NotificationAccess
+from database.outbox import OutboxAccess
+from database.unit import UnitAccess
+from database.user import UserAccess
+from database.statistic.feedback import FeedbackAccess
+from database.statistic.five_point import FivePointAccess
+from database.statistic.pfa import PFAAccess
+from database.statistic.reminder import TaskReminderAccess
+from database.statistic.rescore import PFARescoreAccess
+from database.statistic.rollup import RollupAccess
+from database.statistic.task import TaskAccess
+from database.statistic.warrior import WarriorAccess
+from typing import Any, List
+import argparse
+import logging
+import sys
+
+# Logger of the index tooling
+logger = logging.getLogger(__name__)
+
+# Access classes whose INDEXES and QUERY_SHAPES make up the registry
+ACCESS_CLASSES = [
+    UserAccess,
+    UnitAccess,
+    EventAccess,
+    NotificationAccess,
+    OutboxAccess,
+    BlacklistAccess,
+    FeedbackAccess,
+    FivePointAccess,
+    PFAAccess,
+    PFARescoreAccess,
+    RollupAccess,
+    TaskAccess,
+    TaskReminderAccess,
+    WarriorAccess,
+]
+
+# Index options that have to match for an index to be considered unchanged
+COMPARED_OPTIONS = [
+    "unique",
+    "sparse",
+    "expireAfterSeconds",
+    "partialFilterExpression",
+]
+
+
+def registered_indexes() -> dict:
+    """Function to get the registered index models of every collection"""
+
+    # Group the index models by collection, dropping duplicate declarations
+    registry = {}
+    for access in ACCESS_CLASSES:
+        for collection, model in access.INDEXES:
+            entry = registry.setdefault(collection.name, (collection, {}))
+            entry[1][model.document["name"]] = model
+
+    # Return the registry
+    return registry
+
+
+def ensure_indexes(create: bool = True) -> List[str]:
+    """Function to create missing indexes and report index drift"""
+
+    # Compare every collection's indexes against the registry
+    report = []
+    for name, (collection, models) in registered_indexes().items():
+        existing = collection.index_information()
+        missing = []
+        for index_name, model in models.items():
+            keys = list(model.document["key"].items())
+
+            # Queue the index if no index with the same keys exists
+            found = [k for k, v in existing.items() if list(v["key"]) == keys]
+            if not found:
+                missing.append(model)
+                report.append(f"{name}: missing index {index_name}")
+                continue
+
+            # Report indexes whose options no longer match the registry
+            for option in COMPARED_OPTIONS:
+                wanted = model.document.get(option)
+                actual = existing[found[0]].get(option)
+                if wanted != actual:
+                    report.append(
+                        f"{name}: index {found[0]} has {option}={actual}"
+                        + f", expected {wanted}"
+                    )
+
+        # Report indexes that are not part of the registry
+        wanted_keys = [
+            list(m.document["key"].items()) for m in models.values()
+        ]
+        for index_name, info in existing.items():
+            if index_name != "_id_" and list(info["key"]) not in wanted_keys:
+                report.append(f"{name}: unregistered index {index_name}")
+
+        # Create the missing indexes
+        if create and missing:
+            collection.create_indexes(missing)
+
+    # Return the drift report
+    return report
+
+
+def _collection_scans(plan: Any) -> bool:
+    """Function to check if a query plan contains a collection scan"""
+
+    # Walk every stage of the plan
+    if isinstance(plan, dict):
+        return plan.get("stage") == "COLLSCAN" or any(
+            _collection_scans(v) for v in plan.values()
+        )
+    if isinstance(plan, list):
+        return any(_collection_scans(v) for v in plan)
+    return False
+
+
+def explain_queries() -> List[str]:
+    """Function to report scanning QUERY_SHAPES, not unregistered queries"""
+
+    # Explain every registered query shape. Only the QUERY_SHAPES declared
+    # by the access classes are checked, so a query missing from them is
+    # not covered
+    report = []
+    for access in ACCESS_CLASSES:
+        for collection, query in access.QUERY_SHAPES:
+            plan = collection.find(query).explain()["queryPlanner"]
+            if _collection_scans(plan["winningPlan"]):
+                report.append(
+                    f"{access.__name__}: {collection.name} {query} "
+                    + "uses a collection scan"
+                )
+
+    # Return the report
+    return report
+
+
+def main(argv: List[str] = None) -> int:
+    """Function to run the index tooling from the command line"""
+
+    # Parse the arguments
+    parser = argparse.ArgumentParser(
+        prog="python -m database.indexes",
+        description="Create missing indexes and report index drift",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only report drift, without creating missing indexes",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="fail if a query shape registered in QUERY_SHAPES uses a "
+        + "collection scan, which does not cover unregistered queries",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    # Report the index drift
+    report = ensure_indexes(create=not args.check)
+    for line in report:
+        logger.warning("Index drift: %s", line)
+    failed = args.check and any("unregistered" not in i for i in report)
+
+    # Report the query shapes that are not served by an index
+    if args.explain:
+        scans = explain_queries()
+        for line in scans:
+            logger.warning(line)
+        failed = failed or len(scans) != 0
+
+    # Return the exit code
+    logger.info("Indexes checked for %s", DataAccessBase.DB_SPECS.db)
+    return 1 if failed else 0
+
+
+# Run the index tooling when called as a module
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# Imports
+from database.base import DataAccessBase
+from database.blacklist import BlacklistAccess
+from database.indexes import ensure_indexes
+from database.unit import UnitAccess
+from database.statistic.reminder import TaskReminderAccess
+from database.statistic.task import TaskAccess
+from typing import List
+import argparse
+import datetime
+import logging
+import sys
+
+# Logger of the migrations
+logger = logging.getLogger(__name__)
+
+# One-time data migrations, run in order and each only once per database
+MIGRATIONS = [
+    # Make sure every unit carries an up to date ancestor path
+    ("unit_ancestors", UnitAccess.rebuild_hierarchy),
+    # Convert token blacklist entries saved in the old format
+    ("blacklist_jti_entries", BlacklistAccess.convert_legacy_entries),
+    # Add the indexed assignee lists to tasks saved without them
+    ("task_assignee_lists", TaskAccess.backfill_assignees),
+    # Schedule the pending reminders of tasks saved before the schedule
+    # existed
+    ("task_reminders", TaskReminderAccess.backfill),
+]
+
+
+def run_migrations() -> List[str]:
+    """Function to run the migrations no worker has claimed yet"""
+
+    # Run every migration, skipping the ones already claimed
+    ran = []
+    for name, migration in MIGRATIONS:
+        # Claim the migration, so that a single worker runs it
+        key = {"_id": f"migration:{name}"}
+        claim = DataAccessBase.META_COL.update_one(
+            key,
+            {"$setOnInsert": {"started_at": datetime.datetime.utcnow()}},
+            upsert=True,
+        )
+        if claim.upserted_id is None:
+            continue
+
+        # Run the migration, releasing the claim if it fails so that it
+        # is tried again on the next start
+        try:
+            result = migration()
+        except Exception:
+            DataAccessBase.META_COL.delete_one(key)
+            logger.exception("Migration %s failed", name)
+            raise
+
+        # Record that the migration finished
+        DataAccessBase.META_COL.update_one(
+            key, {"$set": {"finished_at": datetime.datetime.utcnow()}}
+        )
+        logger.info("Migration %s finished: %s", name, result)
+        ran.append(name)
+
+    # Return the migrations that ran
+    return ran
+
+
+def main(argv: List[str] = None) -> int:
+    """Function to create the missing indexes and run the migrations"""
+
+    # Parse the arguments
+    parser = argparse.ArgumentParser(
+        prog="python -m database.migrations",
+        description="Create missing indexes and run pending migrations",
+    )
+    parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    # Create the missing indexes and report the drift
+    for line in ensure_indexes():
+        logger.warning("Index drift: %s", line)
+
+    # Run the pending migrations
+    ran = run_migrations()
+    logger.info(
+        "Ran %d migrations on %s", len(ran), DataAccessBase.DB_SPECS.db
+    )
+
+    # Return the exit code
+    return 0
+
+
+# Run the migrations when called as a module
+if __name__ == "__main__":
+    sys.exit(main())
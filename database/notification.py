@@ -1,6 +1,7 @@
 # Imports
 from utils.dict_parse import DictParse
 from database.base import DataAccessBase
+from pymongo import ASCENDING, IndexModel
 from database.user import UserAccess
 from database.unit import UnitAccess
 from config.config import config
@@ -13,6 +14,22 @@ import time
 class NotificationAccess(DataAccessBase):
     """Class that handles notification information"""
 
+    # Indexes the class' queries rely on
+    INDEXES = [
+        (
+            DataAccessBase.NOTIFICATION_COL,
+            IndexModel([("unit", ASCENDING), ("created_datetime", ASCENDING)]),
+        ),
+    ]
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (
+            DataAccessBase.NOTIFICATION_COL,
+            {"unit": "", "created_datetime": {"$gte": 0, "$lte": 0}},
+        ),
+    ]
+
     @staticmethod
     @DataAccessBase.dict_wrap
     def create_notification(
@@ -0,0 +1,168 @@
+# Imports
+from database.base import DataAccessBase
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from typing import Dict, List, Tuple
+import uuid
+
+
+class OutboxAccess(DataAccessBase):
+    """Class that handles the outbox of rendered notifications"""
+
+    # Indexes the class' queries rely on
+    INDEXES = [
+        (
+            DataAccessBase.OUTBOX_COL,
+            IndexModel(
+                [("status", ASCENDING), ("next_attempt_at", ASCENDING)]
+            ),
+        ),
+        (
+            DataAccessBase.OUTBOX_COL,
+            IndexModel([("claimed_by", ASCENDING)]),
+        ),
+    ]
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (
+            DataAccessBase.OUTBOX_COL,
+            {"status": "pending", "next_attempt_at": {"$lte": 0}},
+        ),
+        (DataAccessBase.OUTBOX_COL, {"claimed_by": ""}),
+    ]
+
+    # Most messages claimed at once
+    BATCH_SIZE = 100
+
+    # Seconds before a claim that was never finished can be taken over
+    CLAIM_TIMEOUT = 300
+
+    # Attempts at sending a message before it is dead-lettered
+    MAX_ATTEMPTS = 5
+
+    # Seconds before the first retry, doubled on every later one
+    RETRY_DELAY = 30
+
+    # Most seconds between two retries
+    MAX_RETRY_DELAY = 3600
+
+    @staticmethod
+    def enqueue(messages: List[Tuple[str, dict]], now: int) -> int:
+        """Method to add rendered messages to the outbox in one write"""
+
+        # Return if there is nothing to add
+        if not messages:
+            return 0
+
+        # Add every message as pending, due right away
+        DataAccessBase.OUTBOX_COL.insert_many(
+            [
+                {
+                    "_id": uuid.uuid4().hex,
+                    "channel": channel,
+                    "payload": payload,
+                    "status": "pending",
+                    "attempts": 0,
+                    "created_at": now,
+                    "next_attempt_at": now,
+                    "claimed_by": None,
+                    "claimed_at": None,
+                    "last_error": None,
+                }
+                for channel, payload in messages
+            ],
+            ordered=False,
+        )
+
+        # Return the amount of messages added
+        return len(messages)
+
+    @staticmethod
+    def claim_due(now: int) -> Tuple[str, List[dict]]:
+        """Method to claim a batch of messages that are due"""
+
+        # Messages are due once their next attempt time passed, unless
+        # another worker claimed them and has not timed out yet
+        due = {
+            "status": "pending",
+            "next_attempt_at": {"$lte": now},
+            "$or": [
+                {"claimed_at": None},
+                {"claimed_at": {"$lt": now - OutboxAccess.CLAIM_TIMEOUT}},
+            ],
+        }
+
+        # Get the earliest due messages
+        claim = uuid.uuid4().hex
+        ids = [
+            i["_id"]
+            for i in DataAccessBase.OUTBOX_COL.find(due, ["_id"])
+            .sort("next_attempt_at", ASCENDING)
+            .limit(OutboxAccess.BATCH_SIZE)
+        ]
+        if not ids:
+            return claim, []
+
+        # Claim the ones that are still due, so that no two workers claim
+        # the same message
+        DataAccessBase.OUTBOX_COL.update_many(
+            {"_id": {"$in": ids}, **due},
+            {"$set": {"claimed_by": claim, "claimed_at": now}},
+        )
+
+        # Return the claim and the messages it holds
+        return claim, list(
+            DataAccessBase.OUTBOX_COL.find({"claimed_by": claim})
+        )
+
+    @staticmethod
+    def finish(
+        claim: str, messages: List[dict], errors: Dict[str, str], now: int
+    ) -> Tuple[int, int]:
+        """Method to settle a claim, scheduling retries for the failures"""
+
+        # Remove the messages that were sent, unless the claim was taken
+        # over in the meantime
+        sent = [i["_id"] for i in messages if i["_id"] not in errors]
+        removed = 0
+        if sent:
+            removed = DataAccessBase.OUTBOX_COL.delete_many(
+                {"_id": {"$in": sent}, "claimed_by": claim}
+            ).deleted_count
+
+        # Release the failed messages with a growing delay, dead-lettering
+        # the ones out of attempts
+        requests = []
+        dead = 0
+        for i in messages:
+            if i["_id"] not in errors:
+                continue
+            attempts = i["attempts"] + 1
+            delay = min(
+                OutboxAccess.RETRY_DELAY * 2 ** (attempts - 1),
+                OutboxAccess.MAX_RETRY_DELAY,
+            )
+            status = "pending"
+            if attempts >= OutboxAccess.MAX_ATTEMPTS:
+                status = "dead"
+                dead += 1
+            requests.append(
+                UpdateOne(
+                    {"_id": i["_id"], "claimed_by": claim},
+                    {
+                        "$set": {
+                            "status": status,
+                            "attempts": attempts,
+                            "next_attempt_at": now + delay,
+                            "claimed_by": None,
+                            "claimed_at": None,
+                            "last_error": errors[i["_id"]],
+                        }
+                    },
+                )
+            )
+        if requests:
+            DataAccessBase.OUTBOX_COL.bulk_write(requests, ordered=False)
+
+        # Return the amount of messages sent and dead-lettered
+        return removed, dead
@@ -1,6 +1,8 @@
 # Imports
 from utils.dict_parse import DictParse
 from database.base import DataAccessBase
+from database.counts import CountCache
+from pymongo import ASCENDING, IndexModel
 from database.user import UserAccess
 from models.statistic.feedback import Feedback
 from typing import Any
@@ -12,6 +14,44 @@ import time
 class FeedbackAccess(DataAccessBase):
     """Class that handles feedback information"""
 
+    # Indexes the class' queries rely on
+    INDEXES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            IndexModel(
+                [
+                    ("stat_type", ASCENDING),
+                    ("to_user", ASCENDING),
+                    ("datetime_created", ASCENDING),
+                    ("_id", ASCENDING),
+                ]
+            ),
+        ),
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            IndexModel(
+                [
+                    ("stat_type", ASCENDING),
+                    ("from_user", ASCENDING),
+                    ("datetime_created", ASCENDING),
+                    ("_id", ASCENDING),
+                ]
+            ),
+        ),
+    ]
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            {"stat_type": "feedback", "to_user": ""},
+        ),
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            {"stat_type": "feedback", "from_user": ""},
+        ),
+    ]
+
     @staticmethod
     @DataAccessBase.dict_wrap
     def create_feedback(
@@ -30,8 +70,9 @@ class FeedbackAccess(DataAccessBase):
         data["stat_type"] = "feedback"
         data["datetime_created"] = int(time.time())
 
-        # Insert into the collection
+        # Insert into the collection and count the document
         DataAccessBase.CURRENT_STATS_COL.insert_one(data)
+        CountCache.inserted(DataAccessBase.CURRENT_STATS_COL, data)
 
         # Return a statement
         return DataAccessBase.sendSuccess("Feedback created")
@@ -48,6 +89,7 @@ class FeedbackAccess(DataAccessBase):
 
         # Delete the document and return a success message
         DataAccessBase.CURRENT_STATS_COL.delete_one({"_id": id})
+        CountCache.deleted(DataAccessBase.CURRENT_STATS_COL, feedback)
         return DataAccessBase.sendSuccess("Feedback deleted")
 
     @staticmethod
@@ -60,13 +102,14 @@ class FeedbackAccess(DataAccessBase):
             return DataAccessBase.sendError("Feedback does not exist")
 
         # Disable the changing of time_created attribute
-        if ("datetime_created" in kwargs):
+        if "datetime_created" in kwargs:
             return DataAccessBase.sendError("Cannot change creation datetime")
 
         # Update the document and return a success message
         DataAccessBase.CURRENT_STATS_COL.update_one(
             {"_id": id}, {"$set": kwargs}
         )
+        CountCache.updated(DataAccessBase.CURRENT_STATS_COL, kwargs)
         return DataAccessBase.sendSuccess("Feedback updated")
 
     @staticmethod
@@ -92,7 +135,11 @@ class FeedbackAccess(DataAccessBase):
     @staticmethod
     @DataAccessBase.dict_wrap
     def get_own_feedback(
-        id: str, page_size: int, page_index: int, sent: bool
+        id: str,
+        page_size: int,
+        page_index: int,
+        sent: bool,
+        cursor: str = None,
     ) -> DictParse:
         """Method to retrieve a multiple feedback based on the receiver's ID"""
 
@@ -106,25 +153,43 @@ class FeedbackAccess(DataAccessBase):
         if page_size <= 0 or page_index < 0:
             return DataAccessBase.sendError("Invalid pagination size or index")
 
-        # Get the total amount of pages based on pagination size
-        pages = math.ceil(
-            (DataAccessBase.CURRENT_STATS_COL.count_documents(query))
-            / page_size
-        )
-
-        # Check if the page_index is outside the page range
-        if page_index >= pages:
-            return DataAccessBase.sendError("Pagination index out of bounds")
+        # Get the page after the cursor, without counting, if one was given
+        if cursor is not None:
+            result, paging = DataAccessBase.find_page(
+                DataAccessBase.CURRENT_STATS_COL,
+                query,
+                page_size,
+                cursor,
+                DataAccessBase.NEWEST_SORT,
+            )
+            if result is None:
+                return DataAccessBase.sendError("Invalid pagination cursor")
+
+        # Get the page at the page index otherwise
+        else:
+            # Get the total amount of pages based on pagination size
+            pages = math.ceil(
+                CountCache.count(DataAccessBase.CURRENT_STATS_COL, query)
+                / page_size
+            )
+
+            # Check if the page_index is outside the page range
+            if page_index >= pages:
+                return DataAccessBase.sendError(
+                    "Pagination index out of bounds"
+                )
 
-        # Calculate skip value
-        skips = page_size * (page_index)
+            # Calculate skip value
+            skips = page_size * (page_index)
 
-        # Search the collection based on id
-        result = (
-            DataAccessBase.CURRENT_STATS_COL.find(query)
-            .skip(skips)
-            .limit(page_size)
-        )
+            # Search the collection based on id
+            result = (
+                DataAccessBase.CURRENT_STATS_COL.find(query)
+                .sort(DataAccessBase.NEWEST_SORT)
+                .skip(skips)
+                .limit(page_size)
+            )
+            paging = {"pages": pages}
 
         # Return if the given feedback is not in the database
         if result is None:
@@ -151,4 +216,4 @@ class FeedbackAccess(DataAccessBase):
             i["formatted_from_user"] = memoize[i["from_user"]]
 
         # Return with a Feedback object
-        return DataAccessBase.sendSuccess(result, pages=pages)
+        return DataAccessBase.sendSuccess(result, **paging)
@@ -1,6 +1,9 @@
 # Imports
 from utils.dict_parse import DictParse
 from database.base import DataAccessBase
+from database.counts import CountCache
+from database.statistic.summary import StatSummaryAccess
+from pymongo import ASCENDING, IndexModel
 from models.statistic.five_point import FivePoint
 from typing import Any
 import uuid
@@ -11,6 +14,29 @@ import time
 class FivePointAccess(DataAccessBase):
     """Class that handles FivePoint information"""
 
+    # Indexes the class' queries rely on
+    INDEXES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            IndexModel(
+                [
+                    ("stat_type", ASCENDING),
+                    ("to_user", ASCENDING),
+                    ("datetime_created", ASCENDING),
+                    ("_id", ASCENDING),
+                ]
+            ),
+        ),
+    ]
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            {"stat_type": "five_point", "to_user": ""},
+        ),
+    ]
+
     @staticmethod
     @DataAccessBase.dict_wrap
     def create_five_point(
@@ -58,8 +84,12 @@ class FivePointAccess(DataAccessBase):
         # Get an object representation of the given info
         five_point_obj = FivePoint(**data)
 
-        # Insert into the collection
+        # Insert into the collection and count the document
         DataAccessBase.CURRENT_STATS_COL.insert_one(five_point_obj.info)
+        CountCache.inserted(
+            DataAccessBase.CURRENT_STATS_COL, five_point_obj.info
+        )
+        StatSummaryAccess.refresh_user(to_user, "five_point")
 
         # Return a statement
         return DataAccessBase.sendSuccess("Five point evaluation created")
@@ -85,7 +115,7 @@ class FivePointAccess(DataAccessBase):
     @staticmethod
     @DataAccessBase.dict_wrap
     def get_user_five_point(
-        id: str, page_size: int, page_index: int
+        id: str, page_size: int, page_index: int, cursor: str = None
     ) -> DictParse:
         """Method to retrieve a multiple five points based on the given ID"""
 
@@ -96,25 +126,43 @@ class FivePointAccess(DataAccessBase):
         # Set query
         query = {"stat_type": "five_point", "to_user": id}
 
-        # Get the total amount of pages based on pagination size
-        pages = math.ceil(
-            (DataAccessBase.CURRENT_STATS_COL.count_documents(query))
-            / page_size
-        )
-
-        # Check if the page_index is outside the page range
-        if page_index >= pages and pages != 0:
-            return DataAccessBase.sendError("Pagination index out of bounds")
-
-        # Calculate skip value
-        skips = page_size * (page_index)
+        # Get the page after the cursor, without counting, if one was given
+        if cursor is not None:
+            result, paging = DataAccessBase.find_page(
+                DataAccessBase.CURRENT_STATS_COL,
+                query,
+                page_size,
+                cursor,
+                DataAccessBase.NEWEST_SORT,
+            )
+            if result is None:
+                return DataAccessBase.sendError("Invalid pagination cursor")
+
+        # Get the page at the page index otherwise
+        else:
+            # Get the total amount of pages based on pagination size
+            pages = math.ceil(
+                CountCache.count(DataAccessBase.CURRENT_STATS_COL, query)
+                / page_size
+            )
 
-        # Search the collection based on id
-        result = (
-            DataAccessBase.CURRENT_STATS_COL.find(query)
-            .skip(skips)
-            .limit(page_size)
-        )
+            # Check if the page_index is outside the page range
+            if page_index >= pages and pages != 0:
+                return DataAccessBase.sendError(
+                    "Pagination index out of bounds"
+                )
+
+            # Calculate skip value
+            skips = page_size * (page_index)
+
+            # Search the collection based on id
+            result = (
+                DataAccessBase.CURRENT_STATS_COL.find(query)
+                .sort(DataAccessBase.NEWEST_SORT)
+                .skip(skips)
+                .limit(page_size)
+            )
+            paging = {"pages": pages}
 
         # Return if the given five point is not in the database
         if result is None:
@@ -127,7 +175,7 @@ class FivePointAccess(DataAccessBase):
         result = list(result)
 
         # Return with a five point object
-        return DataAccessBase.sendSuccess(result, pages=pages)
+        return DataAccessBase.sendSuccess(result, **paging)
 
     @staticmethod
     @DataAccessBase.dict_wrap
@@ -182,19 +230,24 @@ class FivePointAccess(DataAccessBase):
         """Method to update a five point"""
 
         # Check if the five point based on its id does exist
-        if DataAccessBase.CURRENT_STATS_COL.find_one({"_id": id}) is None:
+        five_point = DataAccessBase.CURRENT_STATS_COL.find_one({"_id": id})
+        if five_point is None:
             return DataAccessBase.sendError(
                 "Five point evaluation does not exist"
             )
 
         # Disable the changing of time_created attribute
-        if ("datetime_created" in kwargs):
+        if "datetime_created" in kwargs:
             return DataAccessBase.sendError("Cannot change creation datetime")
 
         # Update the document and return a success message
         DataAccessBase.CURRENT_STATS_COL.update_one(
             {"_id": id}, {"$set": kwargs}
         )
+        CountCache.updated(DataAccessBase.CURRENT_STATS_COL, kwargs)
+        StatSummaryAccess.refresh_user(five_point["to_user"], "five_point")
+        if "to_user" in kwargs:
+            StatSummaryAccess.refresh_user(kwargs["to_user"], "five_point")
         return DataAccessBase.sendSuccess("Five point updated")
 
     @staticmethod
@@ -211,4 +264,6 @@ class FivePointAccess(DataAccessBase):
 
         # Delete the document and return a success message
         DataAccessBase.CURRENT_STATS_COL.delete_one({"_id": id})
+        CountCache.deleted(DataAccessBase.CURRENT_STATS_COL, five_point)
+        StatSummaryAccess.refresh_user(five_point["to_user"], "five_point")
         return DataAccessBase.sendSuccess("Five point evaluation deleted")
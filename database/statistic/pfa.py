@@ -1,8 +1,12 @@
 # Imports
 from utils.dict_parse import DictParse
 from database.base import DataAccessBase
+from database.counts import CountCache
+from database.statistic.summary import StatSummaryAccess
+from pymongo import ASCENDING, IndexModel
 from models.statistic.pfa import PFA
-from typing import Any
+from utils.pfa.batch import calculate_pfa_batch
+from typing import Any, List
 import uuid
 import math
 import time
@@ -11,6 +15,32 @@ import time
 class PFAAccess(DataAccessBase):
     """Class that handles PFA information"""
 
+    # Indexes the class' queries rely on
+    INDEXES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            IndexModel(
+                [
+                    ("stat_type", ASCENDING),
+                    ("to_user", ASCENDING),
+                    ("datetime_created", ASCENDING),
+                    ("_id", ASCENDING),
+                ]
+            ),
+        ),
+    ]
+
+    # Most PFAs that can be scored in a single batch
+    MAX_BATCH_SIZE = 10000
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            {"stat_type": "pfa", "to_user": ""},
+        ),
+    ]
+
     @staticmethod
     @DataAccessBase.dict_wrap
     def create_pfa(
@@ -23,7 +53,7 @@ class PFAAccess(DataAccessBase):
         run: str,
         age: int,
         gender: str,
-        **kwargs: Any
+        **kwargs: Any,
     ) -> DictParse:
         """Method to create a PFA"""
 
@@ -63,8 +93,10 @@ class PFAAccess(DataAccessBase):
         # Get an object representation of the given info
         pfa_obj = PFA(**data)
 
-        # Insert into the collection
+        # Insert into the collection and count the document
         DataAccessBase.CURRENT_STATS_COL.insert_one(pfa_obj.info)
+        CountCache.inserted(DataAccessBase.CURRENT_STATS_COL, pfa_obj.info)
+        StatSummaryAccess.refresh_user(to_user, "pfa")
 
         # Return a statement
         return DataAccessBase.sendSuccess("PFA created")
@@ -89,7 +121,9 @@ class PFAAccess(DataAccessBase):
 
     @staticmethod
     @DataAccessBase.dict_wrap
-    def get_user_pfa(id: str, page_size: int, page_index: int) -> DictParse:
+    def get_user_pfa(
+        id: str, page_size: int, page_index: int, cursor: str = None
+    ) -> DictParse:
         """Method to retrieve a multiple pfa based on the receiver's ID"""
 
         # Check if the page_size or page_index is negative
@@ -99,25 +133,43 @@ class PFAAccess(DataAccessBase):
         # Set query
         query = {"stat_type": "pfa", "to_user": id}
 
-        # Get the total amount of pages based on pagination size
-        pages = math.ceil(
-            (DataAccessBase.CURRENT_STATS_COL.count_documents(query))
-            / page_size
-        )
-
-        # Check if the page_index is outside the page range
-        if page_index >= pages and pages != 0:
-            return DataAccessBase.sendError("Pagination index out of bounds")
-
-        # Calculate skip value
-        skips = page_size * (page_index)
-
-        # Search the collection based on id
-        result = (
-            DataAccessBase.CURRENT_STATS_COL.find(query)
-            .skip(skips)
-            .limit(page_size)
-        )
+        # Get the page after the cursor, without counting, if one was given
+        if cursor is not None:
+            result, paging = DataAccessBase.find_page(
+                DataAccessBase.CURRENT_STATS_COL,
+                query,
+                page_size,
+                cursor,
+                DataAccessBase.NEWEST_SORT,
+            )
+            if result is None:
+                return DataAccessBase.sendError("Invalid pagination cursor")
+
+        # Get the page at the page index otherwise
+        else:
+            # Get the total amount of pages based on pagination size
+            pages = math.ceil(
+                CountCache.count(DataAccessBase.CURRENT_STATS_COL, query)
+                / page_size
+            )
+
+            # Check if the page_index is outside the page range
+            if page_index >= pages and pages != 0:
+                return DataAccessBase.sendError(
+                    "Pagination index out of bounds"
+                )
+
+            # Calculate skip value
+            skips = page_size * (page_index)
+
+            # Search the collection based on id
+            result = (
+                DataAccessBase.CURRENT_STATS_COL.find(query)
+                .sort(DataAccessBase.NEWEST_SORT)
+                .skip(skips)
+                .limit(page_size)
+            )
+            paging = {"pages": pages}
 
         # Return if the given pfa is not in the database
         if result is None:
@@ -130,7 +182,7 @@ class PFAAccess(DataAccessBase):
         result = list(result)
 
         # Return with a PFA object
-        return DataAccessBase.sendSuccess(result, pages=pages)
+        return DataAccessBase.sendSuccess(result, **paging)
 
     @staticmethod
     @DataAccessBase.dict_wrap
@@ -177,13 +229,54 @@ class PFAAccess(DataAccessBase):
         # Return results
         return DataAccessBase.sendSuccess(pfa_obj.info.composite_score)
 
+    @staticmethod
+    @DataAccessBase.dict_wrap
+    def get_batch_test_pfa(
+        pushup: List[int],
+        situp: List[int],
+        run: List[str],
+        age: List[int],
+        gender: List[str],
+        **kwargs: Any,
+    ) -> DictParse:
+        """Calculate the test PFA information of many users at once"""
+
+        # Ensure that every input is a list of the same, bounded length
+        inputs = [pushup, situp, run, age, gender]
+        if not all(isinstance(i, list) for i in inputs):
+            return DataAccessBase.sendError("PFA inputs must be lists")
+        if len(set(len(i) for i in inputs)) != 1:
+            return DataAccessBase.sendError("PFA inputs differ in length")
+        if len(gender) > PFAAccess.MAX_BATCH_SIZE:
+            return DataAccessBase.sendError(
+                f"Cannot score more than {PFAAccess.MAX_BATCH_SIZE} PFAs"
+            )
+
+        # Ensure that every gender is either male or female
+        gender = [str(i).lower() for i in gender]
+        for index, item in enumerate(gender):
+            if item != "male" and item != "female":
+                return DataAccessBase.sendError(
+                    f"Incorrect gender at index {index}"
+                )
+
+        # Calculate every composite score, in the given order
+        try:
+            scores = calculate_pfa_batch(gender, age, pushup, situp, run)
+        except (TypeError, ValueError):
+            return DataAccessBase.sendError("Invalid PFA inputs")
+
+        # Return results
+        return DataAccessBase.sendSuccess(scores.tolist())
+
     @staticmethod
     @DataAccessBase.dict_wrap
     def update_pfa(id: str, **kwargs: Any) -> DictParse:
         """Method to update a PFA"""
 
         # Check if the PFA based on its id does exist
-        if DataAccessBase.CURRENT_STATS_COL.find_one({"_id": id}) is None:
+        pfa = DataAccessBase.CURRENT_STATS_COL.find_one({"_id": id})
+        if pfa is None:
             return DataAccessBase.sendError("PFA does not exist")
 
         # Ensure that the gender is either male or female
@@ -194,13 +287,17 @@ class PFAAccess(DataAccessBase):
             return DataAccessBase.sendError("Incorrect gender")
 
         # Disable the changing of time_created attribute
-        if ("datetime_created" in kwargs):
+        if "datetime_created" in kwargs:
             return DataAccessBase.sendError("Cannot change creation datetime")
 
         # Update the document and return a success message
         DataAccessBase.CURRENT_STATS_COL.update_one(
             {"_id": id}, {"$set": kwargs}
         )
+        CountCache.updated(DataAccessBase.CURRENT_STATS_COL, kwargs)
+        StatSummaryAccess.refresh_user(pfa["to_user"], "pfa")
+        if "to_user" in kwargs:
+            StatSummaryAccess.refresh_user(kwargs["to_user"], "pfa")
         return DataAccessBase.sendSuccess("PFA updated")
 
     @staticmethod
@@ -215,4 +312,6 @@ class PFAAccess(DataAccessBase):
 
         # Delete the document and return a success message
         DataAccessBase.CURRENT_STATS_COL.delete_one({"_id": id})
+        CountCache.deleted(DataAccessBase.CURRENT_STATS_COL, pfa)
+        StatSummaryAccess.refresh_user(pfa["to_user"], "pfa")
         return DataAccessBase.sendSuccess("PFA deleted")
@@ -0,0 +1,151 @@
+# Imports
+from database.base import DataAccessBase
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from typing import Iterable, List, Tuple
+import uuid
+
+
+class TaskReminderAccess(DataAccessBase):
+    """Class that handles the schedule of task reminders"""
+
+    # Indexes the class' queries rely on
+    INDEXES = [
+        (
+            DataAccessBase.TASK_REMINDER_COL,
+            IndexModel([("fire_at", ASCENDING)]),
+        ),
+        (
+            DataAccessBase.TASK_REMINDER_COL,
+            IndexModel([("task_id", ASCENDING)]),
+        ),
+        (
+            DataAccessBase.TASK_REMINDER_COL,
+            IndexModel([("claimed_by", ASCENDING)]),
+        ),
+    ]
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (DataAccessBase.TASK_REMINDER_COL, {"fire_at": {"$lte": 0}}),
+        (DataAccessBase.TASK_REMINDER_COL, {"task_id": ""}),
+        (DataAccessBase.TASK_REMINDER_COL, {"claimed_by": ""}),
+    ]
+
+    # Most reminders claimed at once
+    BATCH_SIZE = 500
+
+    # Seconds before a claim that was never completed can be taken over
+    CLAIM_TIMEOUT = 300
+
+    @staticmethod
+    def _entries(task_id: str, reminders: Iterable[int]) -> List[dict]:
+        """Method to build the schedule entries of a task's reminders"""
+        return [
+            {
+                "_id": f"{task_id}:{fire_at}",
+                "task_id": task_id,
+                "fire_at": fire_at,
+                "claimed_by": None,
+                "claimed_at": None,
+            }
+            for fire_at in set(reminders)
+        ]
+
+    @staticmethod
+    def schedule(task_id: str, reminders: Iterable[int]) -> None:
+        """Method to replace the unclaimed reminders of a task"""
+
+        # Remove the reminders that are not being dispatched right now
+        DataAccessBase.TASK_REMINDER_COL.delete_many(
+            {"task_id": task_id, "claimed_by": None}
+        )
+
+        # Add the given reminders, keeping the ones still being dispatched
+        entries = TaskReminderAccess._entries(task_id, reminders)
+        if entries:
+            DataAccessBase.TASK_REMINDER_COL.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": i["_id"]}, {"$setOnInsert": i}, upsert=True
+                    )
+                    for i in entries
+                ],
+                ordered=False,
+            )
+
+    @staticmethod
+    def unschedule(task_id: str) -> None:
+        """Method to remove every reminder of a task"""
+        DataAccessBase.TASK_REMINDER_COL.delete_many({"task_id": task_id})
+
+    @staticmethod
+    def backfill() -> int:
+        """Method to schedule the pending reminders saved on tasks"""
+
+        # Get every task that still has reminders to send
+        tasks = DataAccessBase.CURRENT_STATS_COL.find(
+            {"stat_type": "task", "reminders.0": {"$exists": True}},
+            ["reminders"],
+        )
+
+        # Add the reminders that are not scheduled yet
+        requests = [
+            UpdateOne({"_id": i["_id"]}, {"$setOnInsert": i}, upsert=True)
+            for task in tasks
+            for i in TaskReminderAccess._entries(
+                task["_id"], task["reminders"]
+            )
+        ]
+        if requests:
+            DataAccessBase.TASK_REMINDER_COL.bulk_write(
+                requests, ordered=False
+            )
+
+        # Return the amount of reminders that were checked
+        return len(requests)
+
+    @staticmethod
+    def claim_due(now: int) -> Tuple[str, List[dict]]:
+        """Method to claim a batch of reminders that are due"""
+
+        # Reminders are due once their time passed, unless another worker
+        # claimed them and has not timed out yet
+        due = {
+            "fire_at": {"$lte": now},
+            "$or": [
+                {"claimed_at": None},
+                {
+                    "claimed_at": {
+                        "$lt": now - TaskReminderAccess.CLAIM_TIMEOUT
+                    }
+                },
+            ],
+        }
+
+        # Get the earliest due reminders
+        claim = uuid.uuid4().hex
+        ids = [
+            i["_id"]
+            for i in DataAccessBase.TASK_REMINDER_COL.find(due, ["_id"])
+            .sort("fire_at", ASCENDING)
+            .limit(TaskReminderAccess.BATCH_SIZE)
+        ]
+        if not ids:
+            return claim, []
+
+        # Claim the ones that are still due, so that no two workers claim
+        # the same reminder
+        DataAccessBase.TASK_REMINDER_COL.update_many(
+            {"_id": {"$in": ids}, **due},
+            {"$set": {"claimed_by": claim, "claimed_at": now}},
+        )
+
+        # Return the claim and the reminders it holds
+        return claim, list(
+            DataAccessBase.TASK_REMINDER_COL.find({"claimed_by": claim})
+        )
+
+    @staticmethod
+    def complete(claim: str) -> None:
+        """Method to remove the reminders of a claim once they were sent"""
+        DataAccessBase.TASK_REMINDER_COL.delete_many({"claimed_by": claim})
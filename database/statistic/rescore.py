@@ -0,0 +1,218 @@
+# Imports
+from database.base import DataAccessBase
+from database.counts import CountCache
+from database.statistic.summary import StatSummaryAccess
+from utils.pfa.rescore import rescore_chunk
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from pymongo import ASCENDING, IndexModel, ReturnDocument, UpdateOne
+from typing import List
+import multiprocessing
+import argparse
+import time
+import sys
+import os
+
+
+class PFARescoreAccess(DataAccessBase):
+    """Class that recomputes the composite scores of stored PFAs"""
+
+    # Metadata document that holds the job's progress
+    CHECKPOINT_ID = "pfa_rescore"
+
+    # Amount of PFAs scored per chunk
+    CHUNK_SIZE = 1000
+
+    # Stored fields the scoring needs
+    PROJECTION = ["info", "subscores", "composite_score"]
+
+    # Indexes the class' queries rely on
+    INDEXES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            IndexModel([("stat_type", ASCENDING), ("_id", ASCENDING)]),
+        ),
+    ]
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            {"stat_type": "pfa", "_id": {"$gt": ""}},
+        ),
+    ]
+
+    @staticmethod
+    def _read_chunk(last_id: str, chunk_size: int) -> List[dict]:
+        """Method to read the next PFAs after the given ID, in ID order"""
+
+        # Build the query, starting from the first PFA without a last ID
+        query = {"stat_type": "pfa"}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        # Return the chunk
+        return list(
+            DataAccessBase.CURRENT_STATS_COL.find(
+                query, PFARescoreAccess.PROJECTION
+            )
+            .sort("_id", ASCENDING)
+            .limit(chunk_size)
+        )
+
+    @staticmethod
+    def _write_chunk(
+        last_id: str, scanned: int, changes: list, failures: list
+    ) -> int:
+        """Method to save a scored chunk's changes and checkpoint after it"""
+
+        # Update the scores that are still the ones the chunk was read with
+        updated = 0
+        if changes:
+            result = DataAccessBase.CURRENT_STATS_COL.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": id, "composite_score": old},
+                        {"$set": {"composite_score": new}},
+                    )
+                    for id, old, new in changes
+                ],
+                ordered=False,
+            )
+            updated = result.modified_count
+
+        # Move the checkpoint past the chunk
+        DataAccessBase.META_COL.update_one(
+            {"_id": PFARescoreAccess.CHECKPOINT_ID},
+            {
+                "$set": {"last_id": last_id, "checkpointed_at": time.time()},
+                "$inc": {
+                    "scanned": scanned,
+                    "updated": updated,
+                    "failed": len(failures),
+                },
+                "$push": {"failed_ids": {"$each": failures, "$slice": -100}},
+            },
+        )
+
+        # Return the amount of updated PFAs
+        return updated
+
+    @staticmethod
+    def rescore(
+        chunk_size: int = None, workers: int = None, restart: bool = False
+    ) -> dict:
+        """Method to recompute every stored PFA, resuming where it stopped"""
+
+        # Variable declaration
+        chunk_size = chunk_size or PFARescoreAccess.CHUNK_SIZE
+        workers = workers or os.cpu_count() or 1
+
+        # Resume the unfinished run, or start a new one
+        checkpoint = DataAccessBase.META_COL.find_one(
+            {"_id": PFARescoreAccess.CHECKPOINT_ID}
+        )
+        if restart or checkpoint is None or checkpoint.get("finished_at"):
+            checkpoint = {
+                "_id": PFARescoreAccess.CHECKPOINT_ID,
+                "last_id": None,
+                "scanned": 0,
+                "updated": 0,
+                "failed": 0,
+                "failed_ids": [],
+                "started_at": time.time(),
+                "finished_at": None,
+            }
+            DataAccessBase.META_COL.replace_one(
+                {"_id": checkpoint["_id"]}, checkpoint, upsert=True
+            )
+
+        # Score the chunks in worker processes, started fresh rather than
+        # forked so they never share the database client, and write them
+        # back in ID order so the checkpoint only moves past scored PFAs
+        last_id = checkpoint["last_id"]
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            pending = deque()
+            chunk = PFARescoreAccess._read_chunk(last_id, chunk_size)
+            while chunk or pending:
+                # Queue the chunk that was read
+                if chunk:
+                    last_id = chunk[-1]["_id"]
+                    future = pool.submit(rescore_chunk, chunk)
+                    pending.append((last_id, len(chunk), future))
+
+                # Write back the oldest chunk once every worker has work
+                # queued, or once there is nothing left to read
+                if not chunk or len(pending) >= workers * 2:
+                    chunk_id, scanned, future = pending.popleft()
+                    PFARescoreAccess._write_chunk(
+                        chunk_id, scanned, *future.result()
+                    )
+
+                # Read the next chunk
+                if chunk:
+                    chunk = PFARescoreAccess._read_chunk(last_id, chunk_size)
+
+        # Mark the run as finished
+        progress = DataAccessBase.META_COL.find_one_and_update(
+            {"_id": PFARescoreAccess.CHECKPOINT_ID},
+            {"$set": {"finished_at": time.time()}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+        # Refresh the cached counts and summaries that rely on the scores,
+        # including the ones changed by earlier, interrupted attempts
+        if progress["updated"]:
+            CountCache.updated(
+                DataAccessBase.CURRENT_STATS_COL, ["composite_score"]
+            )
+            StatSummaryAccess.rebuild()
+
+        # Return the run's progress
+        return progress
+
+
+def main(argv: List[str] = None) -> int:
+    """Function to run the PFA re-scoring from the command line"""
+
+    # Parse the arguments
+    parser = argparse.ArgumentParser(
+        prog="python -m database.statistic.rescore",
+        description="Recompute the composite scores of stored PFAs",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=PFARescoreAccess.CHUNK_SIZE,
+        help="amount of PFAs scored per chunk",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="amount of worker processes, one per CPU by default",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="start over instead of resuming an unfinished run",
+    )
+    args = parser.parse_args(argv)
+
+    # Run the re-scoring and report its progress
+    progress = PFARescoreAccess.rescore(
+        args.chunk_size, args.workers, args.restart
+    )
+    print(
+        f"Scanned {progress['scanned']} PFAs, updated {progress['updated']}"
+        + f", failed to score {progress['failed']}"
+    )
+
+    # Return the exit code
+    return 1 if progress["failed"] else 0
+
+
+# Run the re-scoring when called as a module
+if __name__ == "__main__":
+    sys.exit(main())
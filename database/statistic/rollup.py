@@ -0,0 +1,77 @@
+# Imports
+from utils.dict_parse import DictParse
+from database.base import DataAccessBase
+from models.user import User
+from typing import List
+
+
+class RollupAccess(DataAccessBase):
+    """Class that handles statistics gathered across units"""
+
+    # User fields the rollups need to format names
+    NAME_FIELDS = ["first_name", "last_name", "middle_initial", "rank"]
+
+    # Query shapes the statistic indexes have to serve
+    QUERY_SHAPES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            {"stat_type": "pfa", "to_user": {"$in": [""]}},
+        ),
+    ]
+
+    @staticmethod
+    @DataAccessBase.dict_wrap
+    def get_unit_rollup(stat_type: str, units: List[dict]) -> DictParse:
+        """Method to get the statistics of every unit member, per unit"""
+
+        # Map every user to the first given unit they are a member or an
+        # officer of, in the order they are listed
+        owner = {}
+        for unit in units:
+            for user in unit["members"] + unit["officers"]:
+                owner.setdefault(user, (unit["name"], len(owner)))
+
+        # Get every statistic of the users along with their names
+        results = DataAccessBase.CURRENT_STATS_COL.aggregate(
+            [
+                {
+                    "$match": {
+                        "stat_type": stat_type,
+                        "to_user": {"$in": list(owner)},
+                    }
+                },
+                {
+                    "$lookup": {
+                        "from": DataAccessBase.USER_COL.name,
+                        "localField": "to_user",
+                        "foreignField": "_id",
+                        "as": "user",
+                    }
+                },
+                {
+                    "$addFields": {
+                        "user": {
+                            k: {"$arrayElemAt": [f"$user.{k}", 0]}
+                            for k in RollupAccess.NAME_FIELDS
+                        }
+                    }
+                },
+            ]
+        )
+
+        # Group the statistics by unit, skipping users that no longer exist
+        mapper = {unit["name"]: [] for unit in units}
+        for item in results:
+            user = item.pop("user")
+            if "first_name" not in user:
+                continue
+            item["full_name"] = User.format_name(user)
+            mapper[owner[item["to_user"]][0]].append(item)
+
+        # Sort each unit's statistics by user order, then by best score
+        for name, track in mapper.items():
+            track.sort(key=lambda x: owner[x["to_user"]][1])
+            track.sort(key=lambda x: x["composite_score"], reverse=True)
+
+        # Return the statistics of each unit
+        return DataAccessBase.sendSuccess(mapper)
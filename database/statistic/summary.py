@@ -0,0 +1,204 @@
+# Imports
+from utils.dict_parse import DictParse
+from database.base import DataAccessBase
+from database.unit_tree import UnitTree, UnitTreeCache
+from typing import Iterable, List, Set, Tuple
+import hashlib
+
+
+class StatSummaryAccess(DataAccessBase):
+    """Class that handles per-unit statistic summaries"""
+
+    # Statistic types that are summarized
+    STAT_TYPES = ["pfa", "five_point", "warrior"]
+
+    # Composite scores that count as a pass, by statistic type
+    PASSING_SCORES = {"pfa": 75}
+
+    # Static variable declaration
+    _memberships = {}
+    _memberships_version = None
+
+    @staticmethod
+    def _entries(stat_type: str, users: Iterable[str]) -> dict:
+        """Method to compute the summary entry of each given user"""
+
+        # Total each user's composite scores and keep their latest one
+        group = {
+            "_id": "$to_user",
+            "count": {"$sum": 1},
+            "sum": {"$sum": "$composite_score"},
+            "min": {"$min": "$composite_score"},
+            "max": {"$max": "$composite_score"},
+            "latest": {
+                "$last": {
+                    "_id": "$_id",
+                    "name": "$name",
+                    "datetime_taken": "$datetime_taken",
+                    "composite_score": "$composite_score",
+                }
+            },
+        }
+
+        # Count the passes if the statistic type has a passing score
+        passing = StatSummaryAccess.PASSING_SCORES.get(stat_type)
+        if passing is not None:
+            group["passed"] = {
+                "$sum": {
+                    "$cond": [{"$gte": ["$composite_score", passing]}, 1, 0]
+                }
+            }
+
+        # Group the users' statistics by user, oldest to latest taken
+        results = DataAccessBase.CURRENT_STATS_COL.aggregate(
+            [
+                {
+                    "$match": {
+                        "stat_type": stat_type,
+                        "to_user": {"$in": list(users)},
+                    }
+                },
+                {"$sort": {"datetime_taken": 1, "datetime_created": 1}},
+                {"$group": group},
+            ]
+        )
+
+        # Return the entries by user
+        return {item.pop("_id"): item for item in results}
+
+    @staticmethod
+    def _membership(unit: str, tree: UnitTree) -> Tuple[Set[str], str]:
+        """Method to get the users counted in a unit and their digest"""
+
+        # Forget the memberships of an older tree
+        if StatSummaryAccess._memberships_version != tree.version:
+            StatSummaryAccess._memberships = {}
+            StatSummaryAccess._memberships_version = tree.version
+
+        # Get every member and officer of the unit and the units below it,
+        # along with a digest that only changes when they do
+        membership = StatSummaryAccess._memberships.get(unit)
+        if membership is None:
+            users = set()
+            for i in tree.below([unit]):
+                users.update(
+                    tree.nodes[i]["members"] + tree.nodes[i]["officers"]
+                )
+            digest = hashlib.sha1(
+                "\n".join(sorted(users)).encode("utf-8")
+            ).hexdigest()
+            membership = (users, digest)
+            StatSummaryAccess._memberships[unit] = membership
+
+        # Return the users and their digest
+        return membership
+
+    @staticmethod
+    def _build(unit: str, stat_type: str, tree: UnitTree) -> dict:
+        """Method to build a unit's summary from its users' statistics"""
+
+        # Get the users counted in the unit
+        users, digest = StatSummaryAccess._membership(unit, tree)
+
+        # Save the summary along with the membership it was built for
+        summary = {
+            "_id": f"{unit}:{stat_type}",
+            "unit": unit,
+            "stat_type": stat_type,
+            "membership": digest,
+            "users": StatSummaryAccess._entries(stat_type, users),
+        }
+        DataAccessBase.STAT_SUMMARY_COL.replace_one(
+            {"_id": summary["_id"]}, summary, upsert=True
+        )
+
+        # Return the summary
+        return summary
+
+    @staticmethod
+    @DataAccessBase.dict_wrap
+    def get_summary(unit: str, stat_type: str) -> DictParse:
+        """Method to get a unit's statistic summary"""
+
+        # Check if the statistic type is summarized
+        if stat_type not in StatSummaryAccess.STAT_TYPES:
+            return DataAccessBase.sendError("Invalid statistic type")
+
+        # Check if the unit exists
+        tree = UnitTreeCache.get()
+        if unit not in tree.nodes:
+            return DataAccessBase.sendError("Unit does not exist")
+
+        # Get the summary, rebuilding it only if the users counted in the
+        # unit changed since, so that other unit edits keep it
+        summary = DataAccessBase.STAT_SUMMARY_COL.find_one(
+            {"_id": f"{unit}:{stat_type}"}
+        )
+        _, digest = StatSummaryAccess._membership(unit, tree)
+        if summary is None or summary.get("membership") != digest:
+            summary = StatSummaryAccess._build(unit, stat_type, tree)
+
+        # Total the entries of every user
+        entries = summary["users"].values()
+        count = sum(i["count"] for i in entries)
+        totals = {
+            "unit": unit,
+            "stat_type": stat_type,
+            "users": len(entries),
+            "count": count,
+            "average": (
+                sum(i["sum"] for i in entries) / count if count else None
+            ),
+            "min": min((i["min"] for i in entries), default=None),
+            "max": max((i["max"] for i in entries), default=None),
+            "latest": {k: v["latest"] for k, v in summary["users"].items()},
+        }
+        if stat_type in StatSummaryAccess.PASSING_SCORES:
+            passed = sum(i["passed"] for i in entries)
+            totals["passed"] = passed
+            totals["pass_rate"] = passed / count if count else None
+
+        # Return the totals
+        return DataAccessBase.sendSuccess(totals)
+
+    @staticmethod
+    def refresh_user(user: str, stat_type: str) -> None:
+        """Method to update a user's entry in the summaries they count in"""
+
+        # Get the units the user is in and every unit above them
+        tree = UnitTreeCache.get()
+        units = tree.above(tree.memberships.get(user, ()))
+        if not units:
+            return
+
+        # Set or remove the user's entry in the units' summaries
+        entry = StatSummaryAccess._entries(stat_type, [user]).get(user)
+        DataAccessBase.STAT_SUMMARY_COL.update_many(
+            {"_id": {"$in": [f"{i}:{stat_type}" for i in units]}},
+            (
+                {"$set": {f"users.{user}": entry}}
+                if entry is not None
+                else {"$unset": {f"users.{user}": ""}}
+            ),
+        )
+
+    @staticmethod
+    def rebuild(units: List[str] = None) -> int:
+        """Method to rebuild the summaries of the given, or every, unit"""
+
+        # Build every summary of the units
+        tree = UnitTreeCache.get()
+        summaries = []
+        for unit in tree.order if units is None else units:
+            for stat_type in StatSummaryAccess.STAT_TYPES:
+                summaries.append(
+                    StatSummaryAccess._build(unit, stat_type, tree)
+                )
+
+        # Drop the summaries of units that no longer exist
+        DataAccessBase.STAT_SUMMARY_COL.delete_many(
+            {"unit": {"$nin": list(tree.order)}}
+        )
+
+        # Return the amount of summaries built
+        return len(summaries)
@@ -2,9 +2,12 @@
 from utils.time import seconds_to_largest_time_unit
 from utils.dict_parse import DictParse
 from database.base import DataAccessBase
+from database.counts import CountCache
+from database.statistic.reminder import TaskReminderAccess
+from pymongo import ASCENDING, IndexModel, UpdateOne
 from database.user import UserAccess
 from models.statistic.task import Task
-from typing import Any, List
+from typing import Any, List, Optional
 import uuid
 import math
 import time
@@ -13,6 +16,109 @@ import time
 class TaskAccess(DataAccessBase):
     """Class that handles task information"""
 
+    # Statuses an assignee can be in
+    STATUSES = ["incomplete", "pending", "complete"]
+
+    # Indexed assignee lists, which stay internal to the class
+    ASSIGNEE_LISTS = [f"{status}_users" for status in STATUSES]
+
+    # Fields that change when an assignee changes status
+    ASSIGNEE_FIELDS = STATUSES + ASSIGNEE_LISTS
+
+    # Status moves of every status change action, as (from, to) statuses
+    ACTIONS = {
+        "deny": ("complete", "incomplete"),
+        "reject": ("pending", "incomplete"),
+        "approve": ("pending", "complete"),
+    }
+
+    # Indexes the class' queries rely on
+    INDEXES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            IndexModel(
+                [
+                    ("stat_type", ASCENDING),
+                    ("from_user", ASCENDING),
+                    ("datetime_created", ASCENDING),
+                    ("_id", ASCENDING),
+                ]
+            ),
+        ),
+    ] + [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            IndexModel(
+                [
+                    (f"{status}_users", ASCENDING),
+                    ("datetime_created", ASCENDING),
+                    ("_id", ASCENDING),
+                ]
+            ),
+        )
+        for status in STATUSES
+    ]
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            {"stat_type": "task", "from_user": ""},
+        ),
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            {"stat_type": "task", "complete_users": ""},
+        ),
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            {
+                "stat_type": "task",
+                "$or": [{"pending_users": ""}, {"incomplete_users": ""}],
+            },
+        ),
+    ]
+
+    @staticmethod
+    def _assignees(task: dict) -> dict:
+        """Method to get the indexed assignee lists of a task's statuses"""
+        return {
+            f"{status}_users": list(task[status].keys())
+            for status in TaskAccess.STATUSES
+        }
+
+    @staticmethod
+    def _strip_assignees(task: dict) -> dict:
+        """Method to remove the indexed assignee lists from a read task"""
+        for field in TaskAccess.ASSIGNEE_LISTS:
+            task.pop(field, None)
+        return task
+
+    @staticmethod
+    def backfill_assignees() -> int:
+        """Method to add the assignee lists to tasks saved without them"""
+
+        # Get the statuses of every task without the assignee lists
+        tasks = DataAccessBase.CURRENT_STATS_COL.find(
+            {"stat_type": "task", "complete_users": {"$exists": False}},
+            TaskAccess.STATUSES,
+        )
+
+        # Save the assignee lists of every task at once
+        requests = [
+            UpdateOne({"_id": i["_id"]}, {"$set": TaskAccess._assignees(i)})
+            for i in tasks
+        ]
+        if requests:
+            DataAccessBase.CURRENT_STATS_COL.bulk_write(
+                requests, ordered=False
+            )
+            CountCache.updated(
+                DataAccessBase.CURRENT_STATS_COL, TaskAccess.ASSIGNEE_FIELDS
+            )
+
+        # Return the amount of tasks that were updated
+        return len(requests)
+
     @staticmethod
     @DataAccessBase.dict_wrap
     def create_task(
@@ -39,16 +145,26 @@ class TaskAccess(DataAccessBase):
         data["datetime_created"] = int(time.time())
         data["pending"] = {}
         data["complete"] = {}
+        data.update(TaskAccess._assignees(data))
 
-        # Insert into the collection
+        # Insert into the collection, count the document and schedule its
+        # reminders
         DataAccessBase.CURRENT_STATS_COL.insert_one(data)
+        CountCache.inserted(DataAccessBase.CURRENT_STATS_COL, data)
+        TaskReminderAccess.schedule(data["_id"], reminders)
 
         # Return a statement
         return DataAccessBase.sendSuccess("Task created")
 
     @staticmethod
     @DataAccessBase.dict_wrap
-    def get_task(id: str) -> DictParse:
+    def get_task(
+        id: str,
+        include_names: bool = True,
+        names_page_size: int = None,
+        names_page_index: int = 0,
+        **kwargs: Any,
+    ) -> DictParse:
         """Method to retrieve a single task based on ID"""
 
         # Search the collection based on id
@@ -62,6 +178,11 @@ class TaskAccess(DataAccessBase):
                 "status": "error",
                 "message": "Task not found",
             }
+        TaskAccess._strip_assignees(task)
+
+        # Return the task without names if they were not requested
+        if not include_names:
+            return DataAccessBase.sendSuccess(Task(**task))
 
         # Get a list of users from the incomplete, pending, complete areas
         users_in_task = (
@@ -70,69 +191,93 @@ class TaskAccess(DataAccessBase):
             + list(task["complete"].keys())
         )
 
-        # Get a mapping of their names
-        mapping = {}
-        for i in users_in_task:
-            # Get the user's object
-            user = UserAccess.get_user(i)
+        # Only name a page of the users if a page size was given
+        paging = {}
+        if names_page_size is not None:
+            # Check if the page size or page index is negative
+            if names_page_size <= 0 or names_page_index < 0:
+                return DataAccessBase.sendError(
+                    "Invalid pagination size or index"
+                )
 
-            # Save their name to mapping
-            mapping[i] = user.message.get_fullname(with_rank=True)
+            # Slice the users down to the page
+            paging["name_pages"] = math.ceil(
+                len(users_in_task) / names_page_size
+            )
+            skips = names_page_size * names_page_index
+            end = skips + names_page_size
+            users_in_task = users_in_task[skips:end]
 
-        # Add info to the task details
-        task["name_map"] = mapping
+        # Get a mapping of their names, all at once
+        task["name_map"] = UserAccess.get_display_names(users_in_task)
 
         # Return with a task object
-        return DataAccessBase.sendSuccess(Task(**task))
+        return DataAccessBase.sendSuccess(Task(**task), **paging)
 
     @staticmethod
     @DataAccessBase.dict_wrap
     def get_own_task(
-        id: str, page_size: int, page_index: int, get_completed: bool
+        id: str,
+        page_size: int,
+        page_index: int,
+        get_completed: bool,
+        cursor: str = None,
     ) -> DictParse:
         """Method to retrieve a multiple task based on the receiver's ID"""
 
-        # Generate query based on whether to return sent or received documents
-        incomplete = [
-            {f"pending.{id}": {"$exists": True}},
-            {f"incomplete.{id}": {"$exists": True}},
-        ]
-        query = {
-            "$and": [
-                {"stat_type": "task"},
-                {
-                    "$or": [{f"complete.{id}": {"$exists": get_completed}}]
-                    if get_completed
-                    else incomplete
-                },
-            ]
-        }
+        # Generate query based on whether to return completed tasks or the
+        # ones still incomplete or pending, using the assignee lists
+        if get_completed:
+            query = {"stat_type": "task", "complete_users": id}
+        else:
+            query = {
+                "stat_type": "task",
+                "$or": [{"pending_users": id}, {"incomplete_users": id}],
+            }
 
         # Check if the page_size or page_index is negative
         if page_size <= 0 or page_index < 0:
             return DataAccessBase.sendError("Invalid pagination size or index")
 
-        # Get the total amount of pages based on pagination size
-        pages = math.ceil(
-            (DataAccessBase.CURRENT_STATS_COL.count_documents(query))
-            / page_size
-        )
+        # Get the page after the cursor, without counting, if one was given
+        if cursor is not None:
+            result, paging = DataAccessBase.find_page(
+                DataAccessBase.CURRENT_STATS_COL,
+                query,
+                page_size,
+                cursor,
+                DataAccessBase.NEWEST_SORT,
+            )
+            if result is None:
+                return DataAccessBase.sendError("Invalid pagination cursor")
+
+        # Get the page at the page index otherwise
+        else:
+            # Get the total amount of pages based on pagination size
+            pages = math.ceil(
+                CountCache.count(DataAccessBase.CURRENT_STATS_COL, query)
+                / page_size
+            )
 
-        # Check if the page_index is outside the page range
-        if page_index >= pages:
-            return DataAccessBase.sendError("Pagination index out of bounds")
+            # Check if the page_index is outside the page range
+            if page_index >= pages:
+                return DataAccessBase.sendError(
+                    "Pagination index out of bounds"
+                )
 
-        # Calculate skip value
-        skips = page_size * (page_index)
+            # Calculate skip value
+            skips = page_size * (page_index)
 
-        # Search the collection based on id
-        result = (
-            DataAccessBase.CURRENT_STATS_COL.find(
-                query,
+            # Search the collection based on id
+            result = (
+                DataAccessBase.CURRENT_STATS_COL.find(
+                    query,
+                )
+                .sort(DataAccessBase.NEWEST_SORT)
+                .skip(skips)
+                .limit(page_size)
             )
-            .skip(skips)
-            .limit(page_size)
-        )
+            paging = {"pages": pages}
 
         # Return if the given task is not in the database
         if result is None:
@@ -142,18 +287,9 @@ class TaskAccess(DataAccessBase):
             }
 
         # Add a formatted from_user key for each task
-        memoize = DictParse({})
         result = list(result)
+        names = UserAccess.get_display_names(i["from_user"] for i in result)
         for i in result:
-            # Add key if the iterated from_user is not memoized
-            if i["from_user"] not in memoize:
-                # Add user's formatted name to the memoization
-                from_user = UserAccess.get_user(
-                    i["from_user"], check_former=True
-                ).message
-                memoize[i["from_user"]] = from_user.get_fullname(
-                    lastNameFirst=True, with_rank=True
-                )
 
             # Replace statuses with single status
             if id in i["incomplete"]:
@@ -167,20 +303,19 @@ class TaskAccess(DataAccessBase):
                 i["message"] = i["complete"][id]
 
             # Delete sensitive content
-            del i["incomplete"]
-            del i["pending"]
-            del i["complete"]
+            for field in TaskAccess.ASSIGNEE_FIELDS:
+                i.pop(field, None)
 
             # Add formatted key
-            i["formatted_from_user"] = memoize[i["from_user"]]
+            i["formatted_from_user"] = names.get(i["from_user"], "")
 
         # Return with a Feedback object
-        return DataAccessBase.sendSuccess(result, pages=pages)
+        return DataAccessBase.sendSuccess(result, **paging)
 
     @staticmethod
     @DataAccessBase.dict_wrap
     def get_dispatched_tasks(
-        id: str, page_size: int, page_index: int
+        id: str, page_size: int, page_index: int, cursor: str = None
     ) -> DictParse:
         """Method to retrieve a multiple task based on the receiver's ID"""
 
@@ -196,27 +331,45 @@ class TaskAccess(DataAccessBase):
         if page_size <= 0 or page_index < 0:
             return DataAccessBase.sendError("Invalid pagination size or index")
 
-        # Get the total amount of pages based on pagination size
-        pages = math.ceil(
-            (DataAccessBase.CURRENT_STATS_COL.count_documents(query))
-            / page_size
-        )
+        # Get the page after the cursor, without counting, if one was given
+        if cursor is not None:
+            result, paging = DataAccessBase.find_page(
+                DataAccessBase.CURRENT_STATS_COL,
+                query,
+                page_size,
+                cursor,
+                DataAccessBase.NEWEST_SORT,
+            )
+            if result is None:
+                return DataAccessBase.sendError("Invalid pagination cursor")
+
+        # Get the page at the page index otherwise
+        else:
+            # Get the total amount of pages based on pagination size
+            pages = math.ceil(
+                CountCache.count(DataAccessBase.CURRENT_STATS_COL, query)
+                / page_size
+            )
 
-        # Check if the page_index is outside the page range
-        if page_index >= pages:
-            return DataAccessBase.sendError("Pagination index out of bounds")
+            # Check if the page_index is outside the page range
+            if page_index >= pages:
+                return DataAccessBase.sendError(
+                    "Pagination index out of bounds"
+                )
 
-        # Calculate skip value
-        skips = page_size * (page_index)
+            # Calculate skip value
+            skips = page_size * (page_index)
 
-        # Search the collection based on id
-        result = (
-            DataAccessBase.CURRENT_STATS_COL.find(
-                query,
+            # Search the collection based on id
+            result = (
+                DataAccessBase.CURRENT_STATS_COL.find(
+                    query,
+                )
+                .sort(DataAccessBase.NEWEST_SORT)
+                .skip(skips)
+                .limit(page_size)
             )
-            .skip(skips)
-            .limit(page_size)
-        )
+            paging = {"pages": pages}
 
         # Return if the given task is not in the database
         if result is None:
@@ -226,10 +379,10 @@ class TaskAccess(DataAccessBase):
             }
 
         # Add a formatted from_user key for each task
-        result = list(result)
+        result = [TaskAccess._strip_assignees(i) for i in result]
 
         # Return with a Feedback object
-        return DataAccessBase.sendSuccess(result, pages=pages)
+        return DataAccessBase.sendSuccess(result, **paging)
 
     @staticmethod
     @DataAccessBase.dict_wrap
@@ -239,31 +392,29 @@ class TaskAccess(DataAccessBase):
         # Get the current timestamp in seconds
         current_timestamp = int(time.time())
 
-        # Search the collection based on id
-        tasks = DataAccessBase.CURRENT_STATS_COL.find(
-            {"reminders": {"$elemMatch": {"$lte": current_timestamp}}}
-        )
-        tasks = list(tasks)
-
-        # Return if the given event is not in the database
-        if tasks is None:
-            return {
-                "status": "error",
-                "message": "No events happening right now at the moment",
-            }
-
-        # Update resulting items
-        DataAccessBase.CURRENT_STATS_COL.update_many(
-            {
-                "reminders": {"$elemMatch": {"$lte": current_timestamp}},
-                "stat_type": "task",
-            },
-            {"$pull": {"reminders": {"$lte": current_timestamp}}},
-        )
+        # Claim a batch of the reminders that are due
+        claim, reminders = TaskReminderAccess.claim_due(current_timestamp)
+        task_ids = list({i["task_id"] for i in reminders})
+
+        # Get the tasks of the reminders and remove the sent reminders from
+        # them
+        tasks = []
+        if task_ids:
+            tasks = list(
+                DataAccessBase.CURRENT_STATS_COL.find(
+                    {"stat_type": "task", "_id": {"$in": task_ids}}
+                )
+            )
+            DataAccessBase.CURRENT_STATS_COL.update_many(
+                {"stat_type": "task", "_id": {"$in": task_ids}},
+                {"$pull": {"reminders": {"$lte": current_timestamp}}},
+            )
+            CountCache.updated(DataAccessBase.CURRENT_STATS_COL, ["reminders"])
 
         # Add a parsed time remaining value
         tasks_temp = []
         for item in tasks:
+            TaskAccess._strip_assignees(item)
             item["formatted_time_remain"] = seconds_to_largest_time_unit(
                 item["suspense"] - current_timestamp
             )
@@ -272,8 +423,11 @@ class TaskAccess(DataAccessBase):
         # Cast every event into an event object
         tasks = [Task(**item) for item in tasks_temp]
 
-        # Return with a Event object
-        return DataAccessBase.sendSuccess(tasks)
+        # Return with a Event object, along with the claim to complete once
+        # the reminders were sent
+        return DataAccessBase.sendSuccess(
+            tasks, claim=claim, claimed=len(reminders)
+        )
 
     @staticmethod
     @DataAccessBase.dict_wrap
@@ -291,6 +445,9 @@ class TaskAccess(DataAccessBase):
             "incomplete",
             "pending",
             "complete",
+            "incomplete_users",
+            "pending_users",
+            "complete_users",
         ]
         if any(i in kwargs for i in immutable):
             return DataAccessBase.sendError(
@@ -302,22 +459,78 @@ class TaskAccess(DataAccessBase):
         DataAccessBase.CURRENT_STATS_COL.update_one(
             {"_id": id}, {"$set": kwargs}
         )
+        CountCache.updated(DataAccessBase.CURRENT_STATS_COL, kwargs)
+        if "reminders" in kwargs:
+            TaskReminderAccess.schedule(id, kwargs["reminders"])
         return DataAccessBase.sendSuccess("Task updated")
 
+    @staticmethod
+    def _assignee(task_id: str, user_id: str) -> Optional[dict]:
+        """Method to get a task with only the given assignee's entries"""
+
+        # Project the task down to the assignee's entry in every status
+        projection = {f"{i}.{user_id}": 1 for i in TaskAccess.STATUSES}
+        projection["auto_accept_requests"] = 1
+        task = DataAccessBase.CURRENT_STATS_COL.find_one(
+            {"stat_type": "task", "_id": task_id}, projection
+        )
+
+        # Return the task along with the assignee's current status
+        if task is not None:
+            task["status"] = next(
+                (i for i in TaskAccess.STATUSES if user_id in task.get(i, {})),
+                None,
+            )
+        return task
+
+    @staticmethod
+    def _move(
+        task_id: str, user_id: str, source: str, target: str, msg: str
+    ) -> bool:
+        """Method to move an assignee out of a status they are still in"""
+
+        # Move the assignee's entry and list membership in one update
+        result = DataAccessBase.CURRENT_STATS_COL.update_one(
+            {"_id": task_id, f"{source}.{user_id}": {"$exists": True}},
+            {
+                "$unset": {f"{source}.{user_id}": ""},
+                "$set": {f"{target}.{user_id}": msg},
+                "$pull": {f"{source}_users": user_id},
+                "$addToSet": {f"{target}_users": user_id},
+            },
+        )
+        CountCache.updated(
+            DataAccessBase.CURRENT_STATS_COL, TaskAccess.ASSIGNEE_FIELDS
+        )
+
+        # Return whether the assignee was moved
+        return result.matched_count == 1
+
+    @staticmethod
+    def _conflict(task_id: str, user_id: str) -> dict:
+        """Method to report an assignee that changed status mid-request"""
+
+        # Get the status the other request left the assignee in
+        task = TaskAccess._assignee(task_id, user_id)
+        return DataAccessBase.sendError(
+            "The task was changed by another request, please try again",
+            task_status=task["status"] if task is not None else None,
+        )
+
     @staticmethod
     @DataAccessBase.dict_wrap
     def request_completion(task_id: str, user_id: str, msg: str) -> DictParse:
         """Method to handle the user's completion request"""
 
         # Check if the task based on its id does not exist
-        task = DataAccessBase.CURRENT_STATS_COL.find_one({"_id": task_id})
+        task = TaskAccess._assignee(task_id, user_id)
         if task is None:
             return DataAccessBase.sendError("Task does not exist")
 
         # Check if the user is part of the task's incomplete list
-        if user_id not in task["incomplete"]:
+        if task["status"] != "incomplete":
             # If the user is pending approval, send a message about that
-            if user_id in task["pending"]:
+            if task["status"] == "pending":
                 return DataAccessBase.sendError(
                     "You are pending approval for completing this task"
                 )
@@ -328,17 +541,17 @@ class TaskAccess(DataAccessBase):
                 )
 
         # Automatically approve user if requesting
-        del task["incomplete"][user_id]
         if task["auto_accept_requests"]:
-            task["complete"][user_id] = msg
+            target = "complete"
             result_message = "Task completed"
         else:
-            task["pending"][user_id] = msg
+            target = "pending"
             result_message = "Request filed"
 
-        # Update database and return message
-        DataAccessBase.CURRENT_STATS_COL.replace_one({"_id": task_id}, task)
-        return DataAccessBase.sendSuccess(result_message)
+        # Move the user, unless another request moved them first
+        if not TaskAccess._move(task_id, user_id, "incomplete", target, msg):
+            return TaskAccess._conflict(task_id, user_id)
+        return DataAccessBase.sendSuccess(result_message, task_status=target)
 
     @staticmethod
     @DataAccessBase.dict_wrap
@@ -348,44 +561,27 @@ class TaskAccess(DataAccessBase):
         """Method to handle the placement of users to different statuses"""
 
         # Check if the task based on its id does not exist
-        task = DataAccessBase.CURRENT_STATS_COL.find_one({"_id": task_id})
+        task = TaskAccess._assignee(task_id, user_id)
         if task is None:
             return DataAccessBase.sendError("Task does not exist")
 
         # Check if the user is incomplete status
-        if user_id in task["incomplete"]:
+        if task["status"] == "incomplete":
             return DataAccessBase.sendError(
                 "This user is in incomplete stage. You cannot do anything."
             )
 
-        # Check if the request is to deny
-        if action == "deny" and user_id in task["complete"]:
-            # Move the user from complete to incomplete stage
-            del task["complete"][user_id]
-            task["incomplete"][user_id] = msg
-            result_message = "User moved to incomplete stage"
-
-        # Check if the request is to reject
-        elif action == "reject" and user_id in task["pending"]:
-            # Move the user from complete to incomplete stage
-            del task["pending"][user_id]
-            task["incomplete"][user_id] = msg
-            result_message = "User moved to incomplete stage"
-
-        # Check if the request is to approve
-        elif action == "approve" and user_id in task["pending"]:
-            # Move the user from complete to incomplete stage
-            del task["pending"][user_id]
-            task["complete"][user_id] = msg
-            result_message = "User moved to complete stage"
-
-        # If anything else, return an error
-        else:
+        # Check if the action can move the user from their current status
+        source, target = TaskAccess.ACTIONS.get(action, (None, None))
+        if source is None or task["status"] != source:
             return DataAccessBase.sendError("Invalid option configuration")
 
-        # Update database and return message
-        DataAccessBase.CURRENT_STATS_COL.replace_one({"_id": task_id}, task)
-        return DataAccessBase.sendSuccess(result_message)
+        # Move the user, unless another request moved them first
+        if not TaskAccess._move(task_id, user_id, source, target, msg):
+            return TaskAccess._conflict(task_id, user_id)
+        return DataAccessBase.sendSuccess(
+            f"User moved to {target} stage", task_status=target
+        )
 
     @staticmethod
     @DataAccessBase.dict_wrap
@@ -397,6 +593,8 @@ class TaskAccess(DataAccessBase):
         if task is None:
             return DataAccessBase.sendError("Task does not exist")
 
-        # Delete the document and return a success message
+        # Delete the document and its reminders and return a success message
         DataAccessBase.CURRENT_STATS_COL.delete_one({"_id": id})
+        CountCache.deleted(DataAccessBase.CURRENT_STATS_COL, task)
+        TaskReminderAccess.unschedule(id)
         return DataAccessBase.sendSuccess("Task deleted")
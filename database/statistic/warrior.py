@@ -1,6 +1,9 @@
 # Imports
 from utils.dict_parse import DictParse
 from database.base import DataAccessBase
+from database.counts import CountCache
+from database.statistic.summary import StatSummaryAccess
+from pymongo import ASCENDING, IndexModel
 from models.statistic.warrior import Warrior
 from typing import Any
 import uuid
@@ -11,6 +14,29 @@ import time
 class WarriorAccess(DataAccessBase):
     """Class that handles Warrior information"""
 
+    # Indexes the class' queries rely on
+    INDEXES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            IndexModel(
+                [
+                    ("stat_type", ASCENDING),
+                    ("to_user", ASCENDING),
+                    ("datetime_created", ASCENDING),
+                    ("_id", ASCENDING),
+                ]
+            ),
+        ),
+    ]
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (
+            DataAccessBase.CURRENT_STATS_COL,
+            {"stat_type": "warrior", "to_user": ""},
+        ),
+    ]
+
     @staticmethod
     @DataAccessBase.dict_wrap
     def create_warrior(
@@ -49,8 +75,10 @@ class WarriorAccess(DataAccessBase):
         # Get an object representation of the given info
         warrior = Warrior(**data)
 
-        # Insert into the collection
+        # Insert into the collection and count the document
         DataAccessBase.CURRENT_STATS_COL.insert_one(warrior.info)
+        CountCache.inserted(DataAccessBase.CURRENT_STATS_COL, warrior.info)
+        StatSummaryAccess.refresh_user(to_user, "warrior")
 
         # Return a statement
         return DataAccessBase.sendSuccess("Warrior knowledge created")
@@ -74,7 +102,7 @@ class WarriorAccess(DataAccessBase):
     @staticmethod
     @DataAccessBase.dict_wrap
     def get_user_warrior(
-        id: str, page_size: int, page_index: int
+        id: str, page_size: int, page_index: int, cursor: str = None
     ) -> DictParse:
         """
         Method to retrieve a multiple warrior knowledge based on the
@@ -88,25 +116,43 @@ class WarriorAccess(DataAccessBase):
         # Set query
         query = {"stat_type": "warrior", "to_user": id}
 
-        # Get the total amount of pages based on pagination size
-        pages = math.ceil(
-            (DataAccessBase.CURRENT_STATS_COL.count_documents(query))
-            / page_size
-        )
-
-        # Check if the page_index is outside the page range
-        if page_index >= pages and pages != 0:
-            return DataAccessBase.sendError("Pagination index out of bounds")
-
-        # Calculate skip value
-        skips = page_size * (page_index)
-
-        # Search the collection based on id
-        result = (
-            DataAccessBase.CURRENT_STATS_COL.find(query)
-            .skip(skips)
-            .limit(page_size)
-        )
+        # Get the page after the cursor, without counting, if one was given
+        if cursor is not None:
+            result, paging = DataAccessBase.find_page(
+                DataAccessBase.CURRENT_STATS_COL,
+                query,
+                page_size,
+                cursor,
+                DataAccessBase.NEWEST_SORT,
+            )
+            if result is None:
+                return DataAccessBase.sendError("Invalid pagination cursor")
+
+        # Get the page at the page index otherwise
+        else:
+            # Get the total amount of pages based on pagination size
+            pages = math.ceil(
+                CountCache.count(DataAccessBase.CURRENT_STATS_COL, query)
+                / page_size
+            )
+
+            # Check if the page_index is outside the page range
+            if page_index >= pages and pages != 0:
+                return DataAccessBase.sendError(
+                    "Pagination index out of bounds"
+                )
+
+            # Calculate skip value
+            skips = page_size * (page_index)
+
+            # Search the collection based on id
+            result = (
+                DataAccessBase.CURRENT_STATS_COL.find(query)
+                .sort(DataAccessBase.NEWEST_SORT)
+                .skip(skips)
+                .limit(page_size)
+            )
+            paging = {"pages": pages}
 
         # Return if the given warrior knowledge is not in the database
         if result is None:
@@ -119,7 +165,7 @@ class WarriorAccess(DataAccessBase):
         result = list(result)
 
         # Return with a warrior knowledge object
-        return DataAccessBase.sendSuccess(result, pages=pages)
+        return DataAccessBase.sendSuccess(result, **paging)
 
     @staticmethod
     @DataAccessBase.dict_wrap
@@ -161,7 +207,8 @@ class WarriorAccess(DataAccessBase):
         """Method to delete a warrior"""
 
         # Check if the warrior based on its id does exist
-        if DataAccessBase.CURRENT_STATS_COL.find_one({"_id": id}) is None:
+        warrior = DataAccessBase.CURRENT_STATS_COL.find_one({"_id": id})
+        if warrior is None:
             return DataAccessBase.sendError("Warrior knowledge does not exist")
 
         # Disable the changing of time_created attribute
@@ -172,6 +219,10 @@ class WarriorAccess(DataAccessBase):
         DataAccessBase.CURRENT_STATS_COL.update_one(
             {"_id": id}, {"$set": kwargs}
         )
+        CountCache.updated(DataAccessBase.CURRENT_STATS_COL, kwargs)
+        StatSummaryAccess.refresh_user(warrior["to_user"], "warrior")
+        if "to_user" in kwargs:
+            StatSummaryAccess.refresh_user(kwargs["to_user"], "warrior")
         return DataAccessBase.sendSuccess("Warrior knowledge updated")
 
     @staticmethod
@@ -186,4 +237,6 @@ class WarriorAccess(DataAccessBase):
 
         # Delete the document and return a success message
         DataAccessBase.CURRENT_STATS_COL.delete_one({"_id": id})
+        CountCache.deleted(DataAccessBase.CURRENT_STATS_COL, warrior)
+        StatSummaryAccess.refresh_user(warrior["to_user"], "warrior")
         return DataAccessBase.sendSuccess("Warrior knowledge deleted")
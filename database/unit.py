@@ -3,9 +3,13 @@ from utils.dict_parse import DictParse
 from config.config import config
 from .base import DataAccessBase
 from typing import Any, List
+from database.counts import CountCache
+from database.identity_map import IdentityMap
 from database.user import UserAccess
+from database.unit_tree import UnitTree, UnitTreeCache
 from models.unit import Unit
 from models.user import User
+from pymongo import ASCENDING, IndexModel, UpdateOne
 import uuid
 import math
 
@@ -13,6 +17,16 @@ import math
 class UnitAccess(DataAccessBase):
     """Class that handles unit information"""
 
+    # Indexes the class' queries rely on
+    INDEXES = [
+        (DataAccessBase.UNIT_COL, IndexModel([("ancestors", ASCENDING)])),
+    ]
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (DataAccessBase.UNIT_COL, {"ancestors": ""}),
+    ]
+
     @staticmethod
     @DataAccessBase.dict_wrap
     def create_unit(
@@ -44,8 +58,12 @@ class UnitAccess(DataAccessBase):
         data["_id"] = uuid.uuid4().hex
         data["frontpage"] = ""
 
-        # Insert into the collection
+        # Materialize the unit's ancestor path from its parent
+        data["ancestors"] = UnitAccess._get_ancestors(parent)
+
+        # Insert into the collection and count the document
         DataAccessBase.UNIT_COL.insert_one(data)
+        CountCache.inserted(DataAccessBase.UNIT_COL, data)
 
         # Add the inputted officers and members into the unit
         for item in officers + members:
@@ -68,7 +86,7 @@ class UnitAccess(DataAccessBase):
             unit = UnitAccess.get_unit(item).message
 
             # Continue if the iterated unit is not a Unit
-            if type(user) is not Unit:
+            if type(unit) is not Unit:
                 continue
 
             # Update their parent pointer
@@ -88,6 +106,9 @@ class UnitAccess(DataAccessBase):
             # Update child unit
             UnitAccess.update_unit(unit.info._id, **unit.info)
 
+        # Invalidate the cached unit tree
+        UnitTreeCache.bump()
+
         # Send success message after successful operation
         return DataAccessBase.sendSuccess("Unit added")
 
@@ -145,8 +166,13 @@ class UnitAccess(DataAccessBase):
             # Update child unit
             UnitAccess.update_unit(iter_unit.info._id, **iter_unit.info)
 
-        # Delete the document and return a success message
+        # Delete the document and invalidate the cached unit tree
         DataAccessBase.UNIT_COL.delete_one({"_id": id})
+        IdentityMap.evict(DataAccessBase.UNIT_COL, id)
+        CountCache.deleted(DataAccessBase.UNIT_COL, unit.info)
+        UnitTreeCache.bump()
+
+        # Return a success message
         return DataAccessBase.sendSuccess("Unit deleted")
 
     @staticmethod
@@ -155,9 +181,13 @@ class UnitAccess(DataAccessBase):
         """Method to delete a unit"""
 
         # Check if the unit based on its id does exist
-        if DataAccessBase.UNIT_COL.find_one({"_id": id}) is None:
+        unit = DataAccessBase.UNIT_COL.find_one({"_id": id})
+        if unit is None:
             return DataAccessBase.sendError("Unit does not exist")
 
+        # The ancestor path is maintained by this class, never by callers
+        kwargs.pop("ancestors", None)
+
         # If the kwargs include the changing of a unit type, check for its
         # validity
         if (
@@ -169,8 +199,31 @@ class UnitAccess(DataAccessBase):
                 + ", ".join(config.unit_types)
             )
 
-        # Update the document and return a success message
+        # If the parent pointer changes, make sure the unit is not being
+        # placed underneath itself
+        reparent = "parent" in kwargs and kwargs["parent"] != unit.get(
+            "parent", ""
+        )
+        if reparent:
+            ancestors = UnitAccess._get_ancestors(kwargs["parent"])
+            if id in ancestors or kwargs["parent"] == id:
+                return DataAccessBase.sendError(
+                    "Unit cannot be placed below itself"
+                )
+
+        # Update the document and forget the request's stale copy
         DataAccessBase.UNIT_COL.update_one({"_id": id}, {"$set": kwargs})
+        IdentityMap.evict(DataAccessBase.UNIT_COL, id)
+        CountCache.updated(DataAccessBase.UNIT_COL, kwargs)
+
+        # Refresh the ancestor paths of the unit and everything below it
+        if reparent:
+            UnitAccess._set_ancestors(id, ancestors)
+
+        # Invalidate the cached unit tree
+        UnitTreeCache.bump()
+
+        # Return a success message
         return DataAccessBase.sendSuccess("Unit updated")
 
     @staticmethod
@@ -178,8 +231,11 @@ class UnitAccess(DataAccessBase):
     def get_unit(id: str) -> DictParse:
         """Method to get a unit by ID"""
 
-        # Search the collection based on id
-        unit = DataAccessBase.UNIT_COL.find_one({"_id": id})
+        # Search the request's identity map or the collection based on id
+        unit = IdentityMap.get(DataAccessBase.UNIT_COL, id)
+        if unit is None:
+            unit = DataAccessBase.UNIT_COL.find_one({"_id": id})
+            IdentityMap.put(DataAccessBase.UNIT_COL, unit)
 
         # Return if the given unit is not in the database
         if unit is None:
@@ -193,35 +249,70 @@ class UnitAccess(DataAccessBase):
 
     @staticmethod
     @DataAccessBase.dict_wrap
-    def get_all_units(page_size: int, page_index: int) -> DictParse:
+    def get_all_units(
+        page_size: int, page_index: int, cursor: str = None
+    ) -> DictParse:
         """Get a list of units based on the page size and the index"""
 
         # Check if the page_size or page_index is negative
         if page_size <= 0 or page_index < 0:
             return DataAccessBase.sendError("Invalid pagination size or index")
 
-        # Get the total amount of pages based on pagination size
-        pages = math.ceil(
-            DataAccessBase.UNIT_COL.count_documents({}) / page_size
-        )
-
-        # Check if the page_index is outside the page range
-        if page_index >= pages:
-            return DataAccessBase.sendError(
-                [], additional_error="Pagination index out of bounds"
+        # Get the page after the cursor, without counting, if one was given
+        if cursor is not None:
+            results, paging = DataAccessBase.find_page(
+                DataAccessBase.UNIT_COL,
+                {},
+                page_size,
+                cursor,
+                DataAccessBase.ID_SORT,
             )
+            if results is None:
+                return DataAccessBase.sendError("Invalid pagination cursor")
+
+        # Get the page at the page index otherwise
+        else:
+            # Get the total amount of pages based on pagination size
+            pages = math.ceil(
+                CountCache.count(DataAccessBase.UNIT_COL, {}, estimated=True)
+                / page_size
+            )
+
+            # Check if the page_index is outside the page range
+            if page_index >= pages:
+                return DataAccessBase.sendError(
+                    [], additional_error="Pagination index out of bounds"
+                )
 
-        # Calculate skip value
-        skips = page_size * (page_index)
+            # Calculate skip value
+            skips = page_size * (page_index)
 
-        # Get the list of units based on the given page size and index
-        results = DataAccessBase.UNIT_COL.find().skip(skips).limit(page_size)
+            # Get the list of units based on the given page size and index
+            results = (
+                DataAccessBase.UNIT_COL.find()
+                .sort(DataAccessBase.ID_SORT)
+                .skip(skips)
+                .limit(page_size)
+            )
+            paging = {"pages": pages}
 
         # Turn each document into a Unit object
         results = [Unit(**item) for item in list(results)]
 
         # Return the results and the page size
-        return DataAccessBase.sendSuccess(results, pages=pages)
+        return DataAccessBase.sendSuccess(results, **paging)
+
+    @staticmethod
+    def _snapshot_unit(tree: UnitTree, id: str) -> DictParse:
+        """Method to get a snapshot's unit without its internal fields"""
+        unit = tree.get(id)
+        unit.pop("ancestors", None)
+        return Unit(**unit).info
+
+    @staticmethod
+    def get_unit_tree() -> UnitTree:
+        """Method to get the cached snapshot of the whole unit tree"""
+        return UnitTreeCache.get()
 
     @staticmethod
     @DataAccessBase.dict_wrap
@@ -230,55 +321,23 @@ class UnitAccess(DataAccessBase):
     ) -> DictParse:
         """Method to get the units below the user's units"""
 
-        # Iterate through the user's units and get their event information
-        tracked = set(tracked)
-        units = set()
-        stack = list(user_units)
-        while stack:
-            # Get the top of the stack
-            node = stack.pop()
-
-            # Set ptr on start of given ID
-            ptr = UnitAccess.get_unit(node)
-
-            # Return error if one occurs
-            if ptr.status == "error":
-                units_message = ", ".join(user_units)
-                return DataAccessBase.sendError(
-                    f"Error processing one of the units in: {units_message} "
-                )
-
-            # Extract Unit object's attributes
-            ptr = ptr.message.info
-
-            # Skip if the pointer ID has been tracked
-            if ptr._id in tracked:
-                continue
-            tracked.add(ptr._id)
-
-            # Add child ID to tracker
-            units.add(ptr._id)
+        # Get the current unit tree snapshot
+        tree = UnitTreeCache.get_with(user_units)
 
-            # Pass if the length of children is 1
-            if len(ptr.children) > 2:
-                pass
-
-            # Iterate through each children and append to stack
-            for child in reversed(ptr.children):
-                # Append to stack if the child node is not in the stack
-                if child not in units:
-                    stack.append(child)
+        # Return error if one of the given units does not exist
+        if any(unit not in tree.nodes for unit in user_units):
+            units_message = ", ".join(user_units)
+            return DataAccessBase.sendError(
+                f"Error processing one of the units in: {units_message} "
+            )
 
         # Process unit information
-        units = [UnitAccess.get_unit(unit).message.info for unit in units]
         units = sorted(
-            units,
-            key=lambda x: (
-                config.unit_types.index(x["unit_type"]),
-                x["name"],
-            ),
+            tree.below(user_units, tracked),
+            key=lambda x: tree.rank[x],
             reverse=True,
         )
+        units = [UnitAccess._snapshot_unit(tree, unit) for unit in units]
 
         # Return the units
         return DataAccessBase.sendSuccess(units)
@@ -286,24 +345,94 @@ class UnitAccess(DataAccessBase):
     @staticmethod
     @DataAccessBase.dict_wrap
     def get_units_above(user_units: List[str]) -> DictParse:
-        """Method to get the units below the user's units"""
+        """Method to get the units above the user's units"""
 
-        # Iterate through the user's units and get their event information
-        units = set()
-        for root in user_units:
-            # Set ptr on start of given ID
-            ptr = UnitAccess.get_unit(root)
-
-            # Iterate through the stack to reverse upwards
-            while ptr.status == "success":
-                # Add iterate unit id to the units set
-                units.add(ptr.message.info._id)
-
-                # Iterate upwards
-                ptr = UnitAccess.get_unit(ptr.message.info.parent)
+        # Get the current unit tree snapshot
+        tree = UnitTreeCache.get_with(user_units)
 
         # Process unit information
-        units = [UnitAccess.get_unit(unit).message.info for unit in units]
+        units = [
+            UnitAccess._snapshot_unit(tree, unit)
+            for unit in tree.above(user_units)
+        ]
 
         # Return the units
         return DataAccessBase.sendSuccess(units)
+
+    @staticmethod
+    def rebuild_hierarchy() -> int:
+        """Method to rebuild every unit's ancestor path from parent pointers"""
+
+        # Get the parent pointers of every unit
+        units = {
+            item["_id"]: item
+            for item in DataAccessBase.UNIT_COL.find(
+                {}, {"parent": 1, "ancestors": 1}
+            )
+        }
+
+        # Walk up each unit's parent pointers and queue stale paths
+        operations = []
+        for id, item in units.items():
+            ancestors = []
+            ptr = item.get("parent", "")
+            while ptr in units and ptr not in ancestors and ptr != id:
+                ancestors.insert(0, ptr)
+                ptr = units[ptr].get("parent", "")
+            if item.get("ancestors") != ancestors:
+                operations.append(
+                    UpdateOne({"_id": id}, {"$set": {"ancestors": ancestors}})
+                )
+
+        # Apply the changes and invalidate the cached unit tree
+        if operations:
+            DataAccessBase.UNIT_COL.bulk_write(operations, ordered=False)
+            IdentityMap.evict(DataAccessBase.UNIT_COL)
+            UnitTreeCache.bump()
+
+        # Return the amount of units that were repaired
+        return len(operations)
+
+    @staticmethod
+    def _get_ancestors(parent: str) -> List[str]:
+        """Method to get the ancestor path of a unit placed under parent"""
+
+        # Units without a parent are at the top of the tree
+        if parent == "":
+            return []
+
+        # Return empty if the parent does not exist
+        parent_unit = DataAccessBase.UNIT_COL.find_one(
+            {"_id": parent}, {"ancestors": 1}
+        )
+        if parent_unit is None:
+            return []
+
+        # Return the parent's path plus the parent itself
+        return parent_unit.get("ancestors", []) + [parent]
+
+    @staticmethod
+    def _set_ancestors(id: str, ancestors: List[str]) -> None:
+        """Method to set a unit's ancestor path and fix its descendants"""
+
+        # Set the ancestor path of the unit itself
+        operations = [
+            UpdateOne({"_id": id}, {"$set": {"ancestors": ancestors}})
+        ]
+
+        # Replace the part of every descendant's path that is above the unit
+        for item in DataAccessBase.UNIT_COL.find(
+            {"ancestors": id}, {"ancestors": 1}
+        ):
+            start = item["ancestors"].index(id)
+            below = item["ancestors"][start:]
+            operations.append(
+                UpdateOne(
+                    {"_id": item["_id"]},
+                    {"$set": {"ancestors": ancestors + below}},
+                )
+            )
+
+        # Apply the changes and forget the request's stale copies
+        DataAccessBase.UNIT_COL.bulk_write(operations, ordered=False)
+        IdentityMap.evict(DataAccessBase.UNIT_COL)
@@ -0,0 +1,170 @@
+# Imports
+from config.config import config
+from .base import DataAccessBase
+from types import MappingProxyType
+from typing import Iterable, List
+import threading
+import copy
+import time
+
+
+class UnitTree:
+    """Immutable, in-memory snapshot of the whole unit collection"""
+
+    def __init__(self: "UnitTree", version: int, units: List[dict]) -> None:
+        """Constructor that indexes the given unit documents"""
+
+        # Sort the units by unit type order and then by name
+        units = sorted(
+            units,
+            key=lambda x: (
+                config.unit_types.index(x["unit_type"]),
+                x["name"],
+            ),
+        )
+
+        # Build the parent to children adjacency from the parent pointers
+        nodes = {item["_id"]: item for item in units}
+        children = {item["_id"]: [] for item in units}
+        for item in units:
+            if item.get("parent", "") in children:
+                children[item["parent"]].append(item["_id"])
+
+        # Save the read-only views of the snapshot
+        self.version = version
+        self.nodes = MappingProxyType(nodes)
+        self.children = MappingProxyType(
+            {k: tuple(v) for k, v in children.items()}
+        )
+        self.order = tuple(nodes)
+        self.rank = MappingProxyType({k: i for i, k in enumerate(nodes)})
+
+        # Index the units every officer commands, including every unit
+        # below the ones they are an officer of
+        commanded = {}
+        for item in units:
+            below = None
+            for officer in item["officers"]:
+                below = below or self.below([item["_id"]])
+                commanded.setdefault(officer, set()).update(below)
+        self.commanded = MappingProxyType(
+            {k: frozenset(v) for k, v in commanded.items()}
+        )
+
+        # Index the units every user is a member or an officer of
+        memberships = {}
+        for item in units:
+            for user in item["members"] + item["officers"]:
+                memberships.setdefault(user, []).append(item["_id"])
+        self.memberships = MappingProxyType(
+            {k: tuple(v) for k, v in memberships.items()}
+        )
+
+    def get(self: "UnitTree", id: str) -> dict:
+        """Method to get a private copy of a unit document"""
+        return copy.deepcopy(self.nodes[id])
+
+    def below(
+        self: "UnitTree", ids: Iterable[str], tracked: Iterable[str] = ()
+    ) -> List[str]:
+        """Method to get the given units and every unit beneath them"""
+
+        # Walk down the children adjacency, skipping tracked units
+        tracked = set(tracked)
+        units = []
+        stack = [i for i in reversed(list(ids)) if i in self.nodes]
+        while stack:
+            # Get the top of the stack and skip it if it has been tracked
+            node = stack.pop()
+            if node in tracked:
+                continue
+            tracked.add(node)
+            units.append(node)
+
+            # Append the children to the stack
+            stack += reversed(self.children[node])
+
+        # Return the unit IDs
+        return units
+
+    def above(self: "UnitTree", ids: Iterable[str]) -> List[str]:
+        """Method to get the given units and every unit above them"""
+
+        # Add the ancestor path of each given unit
+        units = {}
+        for i in ids:
+            if i not in self.nodes:
+                continue
+            for j in self.nodes[i].get("ancestors", []) + [i]:
+                units[j] = True
+
+        # Return the unit IDs
+        return [i for i in units if i in self.nodes]
+
+
+class UnitTreeCache:
+    """Per-process holder of the current unit tree snapshot"""
+
+    # Seconds between checks of the shared tree version stamp
+    VERSION_CHECK_INTERVAL = 2
+
+    # Static variable declaration
+    _tree = None
+    _checked = float("-inf")
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(refresh: bool = False) -> UnitTree:
+        """Method to get the current unit tree snapshot"""
+
+        # Return the held snapshot if the version was checked recently,
+        # unless a check is forced
+        tree = UnitTreeCache._tree
+        now = time.monotonic()
+        if (
+            not refresh
+            and tree is not None
+            and now - UnitTreeCache._checked
+            < UnitTreeCache.VERSION_CHECK_INTERVAL
+        ):
+            return tree
+
+        # Rebuild the snapshot if the version stamp has moved
+        with UnitTreeCache._lock:
+            stamp = DataAccessBase.META_COL.find_one({"_id": "unit_tree"})
+            version = stamp["version"] if stamp is not None else 0
+            tree = UnitTreeCache._tree
+            if tree is None or tree.version != version:
+                tree = UnitTree(
+                    version, list(DataAccessBase.UNIT_COL.find({}))
+                )
+                UnitTreeCache._tree = tree
+            UnitTreeCache._checked = now
+
+        # Return the snapshot
+        return tree
+
+    @staticmethod
+    def get_with(ids: Iterable[str]) -> UnitTree:
+        """Method to get the snapshot, checking the version if it misses"""
+
+        # Check the version stamp if one of the units is not in the held
+        # snapshot, since another process may have just created it
+        tree = UnitTreeCache.get()
+        if any(i not in tree.nodes for i in ids):
+            tree = UnitTreeCache.get(refresh=True)
+
+        # Return the snapshot
+        return tree
+
+    @staticmethod
+    def bump() -> None:
+        """Method to mark every process' unit tree snapshot as stale"""
+
+        # Increment the shared version stamp
+        DataAccessBase.META_COL.update_one(
+            {"_id": "unit_tree"}, {"$inc": {"version": 1}}, upsert=True
+        )
+
+        # Force this process to check the stamp on its next read
+        UnitTreeCache._checked = float("-inf")
@@ -1,18 +1,57 @@
 # Imports
-from flask_jwt_extended import decode_token
 from utils.dict_parse import DictParse
 from .base import DataAccessBase
-from typing import Union, Any, List
+from .counts import CountCache
+from pymongo import ASCENDING, IndexModel
+from .blacklist import BlacklistAccess
+from .identity_map import IdentityMap
+from .unit_tree import UnitTreeCache
+from typing import Union, Any, Dict, FrozenSet, Iterable, List
 from utils.hash import sha256
 from models.user import User
 import datetime
 import uuid
 import math
+import time
 
 
 class UserAccess(DataAccessBase):
     """Class that handles user information"""
 
+    # Indexes the class' queries rely on
+    INDEXES = [
+        (DataAccessBase.USER_COL, IndexModel([("email", ASCENDING)])),
+        (DataAccessBase.REGISTER_COL, IndexModel([("email", ASCENDING)])),
+        (DataAccessBase.FORMER_USERS_COL, IndexModel([("email", ASCENDING)])),
+    ]
+
+    # Query shapes the indexes have to serve
+    QUERY_SHAPES = [
+        (DataAccessBase.USER_COL, {"email": ""}),
+        (DataAccessBase.USER_COL, {"email": "", "password": ""}),
+        (DataAccessBase.REGISTER_COL, {"email": ""}),
+        (DataAccessBase.FORMER_USERS_COL, {"email": ""}),
+    ]
+
+    # Seconds a resolved permission set is reused before being refetched
+    PERMISSIONS_TTL = 10
+
+    # Seconds between checks of the shared permissions version stamp, which
+    # bounds how long another worker keeps a changed permission set
+    PERMISSIONS_CHECK_INTERVAL = 1
+
+    # Seconds a resolved display name is reused before being refetched
+    NAMES_TTL = 60
+
+    # User fields display names are formatted from
+    NAME_FIELDS = ["first_name", "last_name", "middle_initial", "rank"]
+
+    # Static variable declaration
+    _permissions = {}
+    _permissions_version = None
+    _permissions_checked = float("-inf")
+    _names = {}
+
     @staticmethod
     @DataAccessBase.dict_wrap
     def register_user(
@@ -73,6 +112,7 @@ class UserAccess(DataAccessBase):
             # Insert user into the database, remove from REGISTER_COL and
             # return success
             DataAccessBase.USER_COL.insert_one(user)
+            CountCache.inserted(DataAccessBase.USER_COL, user)
             DataAccessBase.REGISTER_COL.delete_one({"_id": id})
             return DataAccessBase.sendSuccess(
                 "User added to system", user_info=user
@@ -111,11 +151,14 @@ class UserAccess(DataAccessBase):
     def get_user(id: str, **kwargs) -> DictParse:
         """Base method for get_user methods"""
 
-        # Get the results from the query
+        # Get the results from the request's identity map or the query
         if id == "_email" and "email" in kwargs:
             user = DataAccessBase.USER_COL.find_one({"email": kwargs["email"]})
         else:
-            user = DataAccessBase.USER_COL.find_one({"_id": id})
+            user = IdentityMap.get(DataAccessBase.USER_COL, id)
+            if user is None:
+                user = DataAccessBase.USER_COL.find_one({"_id": id})
+        IdentityMap.put(DataAccessBase.USER_COL, user)
 
         # Return if the given user is not in the database
         # If an call also looks into the former users, return the user
@@ -123,15 +166,18 @@ class UserAccess(DataAccessBase):
         if user is None:
             # Check former database if the call specifies
             if kwargs.get("check_former", False):
-                # Get the results from the query
+                # Get the results from the identity map or the query
                 if id == "_email" and "email" in kwargs:
                     user = DataAccessBase.FORMER_USERS_COL.find_one(
                         {"email": kwargs["email"]}
                     )
                 else:
-                    user = DataAccessBase.FORMER_USERS_COL.find_one(
-                        {"_id": id}
-                    )
+                    user = IdentityMap.get(DataAccessBase.FORMER_USERS_COL, id)
+                    if user is None:
+                        user = DataAccessBase.FORMER_USERS_COL.find_one(
+                            {"_id": id}
+                        )
+                IdentityMap.put(DataAccessBase.FORMER_USERS_COL, user)
 
             # Return error if else
             else:
@@ -140,56 +186,185 @@ class UserAccess(DataAccessBase):
         # Return results based on types of representation
         return DataAccessBase.sendSuccess(User(**user))
 
+    @staticmethod
+    def get_permissions(id: str) -> FrozenSet[str]:
+        """Method to get a user's permissions through a short-lived cache"""
+
+        # Drop every cached permission set if any worker changed one since
+        # the last check
+        now = time.monotonic()
+        if (
+            now - UserAccess._permissions_checked
+            >= UserAccess.PERMISSIONS_CHECK_INTERVAL
+        ):
+            stamp = DataAccessBase.META_COL.find_one({"_id": "permissions"})
+            version = stamp["version"] if stamp is not None else 0
+            if version != UserAccess._permissions_version:
+                UserAccess._permissions = {}
+                UserAccess._permissions_version = version
+            UserAccess._permissions_checked = now
+
+        # Return the cached permissions if they have not expired
+        cached = UserAccess._permissions.get(id)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        # Fetch only the permissions field of the user
+        user = DataAccessBase.USER_COL.find_one(
+            {"_id": id}, {"permissions": 1}
+        )
+        permissions = frozenset(user["permissions"] if user else [])
+
+        # Cache and return the permissions
+        UserAccess._permissions[id] = (
+            now + UserAccess.PERMISSIONS_TTL,
+            permissions,
+        )
+        return permissions
+
+    @staticmethod
+    def invalidate_permissions(id: str) -> None:
+        """Method to drop a user's cached permissions in every worker"""
+
+        # Drop the permissions cached by this worker
+        UserAccess._permissions.pop(id, None)
+
+        # Move the shared version stamp so other workers drop theirs
+        DataAccessBase.META_COL.update_one(
+            {"_id": "permissions"}, {"$inc": {"version": 1}}, upsert=True
+        )
+
+    @staticmethod
+    def get_display_names(ids: Iterable[str]) -> Dict[str, str]:
+        """Method to get the ranked names of many users through a cache"""
+
+        # Take the names that have not expired from the cache
+        now = time.monotonic()
+        names = {}
+        missing = []
+        for i in dict.fromkeys(ids):
+            cached = UserAccess._names.get(i)
+            if cached is not None and cached[0] > now:
+                names[i] = cached[1]
+            else:
+                missing.append(i)
+
+        # Fetch only the name fields of the rest, falling back to the
+        # former users, with a single query per collection
+        for collection in [
+            DataAccessBase.USER_COL,
+            DataAccessBase.FORMER_USERS_COL,
+        ]:
+            if not missing:
+                break
+            for user in collection.find(
+                {"_id": {"$in": missing}}, UserAccess.NAME_FIELDS
+            ):
+                name = User.format_name(user, with_rank=True)
+                UserAccess._names[user["_id"]] = (
+                    now + UserAccess.NAMES_TTL,
+                    name,
+                )
+                names[user["_id"]] = name
+            missing = [i for i in missing if i not in names]
+
+        # Return the names of the users that were found
+        return names
+
+    @staticmethod
+    def invalidate_names(id: str) -> None:
+        """Method to drop a user's cached display name"""
+        UserAccess._names.pop(id, None)
+
     @staticmethod
     @DataAccessBase.dict_wrap
     def get_users(ids: List[str], **kwargs) -> DictParse:
         """Get a list of users that the given IDs are pertaining to"""
 
-        # Get all users that are in the user collection and the ID list
-        res = DataAccessBase.USER_COL.find({"_id": {"$in": ids}})
-        users = list(res)
-
-        # If the kwargs also want to look into the former user collection,
-        # into that as well
-        res = []
+        # Get the collections to look into
+        collections = [DataAccessBase.USER_COL]
         if kwargs.get("check_former", False):
-            res = DataAccessBase.FORMER_USERS_COL.find({"_id": {"$in": ids}})
+            collections.append(DataAccessBase.FORMER_USERS_COL)
+
+        # Get the users the request already fetched, then query the rest
+        users = []
+        missing = list(ids)
+        for collection in collections:
+            # Take the documents that are in the identity map
+            remaining = []
+            for i in missing:
+                user = IdentityMap.get(collection, i)
+                if user is None:
+                    remaining.append(i)
+                else:
+                    users.append(user)
 
-        # Combine the two operations
-        users += res
+            # Query the remaining documents and remember them
+            found = set()
+            if remaining:
+                for user in collection.find({"_id": {"$in": remaining}}):
+                    IdentityMap.put(collection, user)
+                    found.add(user["_id"])
+                    users.append(user)
+            missing = [i for i in remaining if i not in found]
 
         # Return result
         return DataAccessBase.sendSuccess([User(**i) for i in users])
 
     @staticmethod
     @DataAccessBase.dict_wrap
-    def get_all_users(page_size: int, page_index: int) -> DictParse:
+    def get_all_users(
+        page_size: int, page_index: int, cursor: str = None
+    ) -> DictParse:
         """Get a list of users based on the page size and the index"""
 
         # Check if the page_size or page_index is negative
         if page_size <= 0 or page_index < 0:
             return DataAccessBase.sendError("Invalid pagination size or index")
 
-        # Get the total amount of pages based on pagination size
-        pages = math.ceil(
-            DataAccessBase.USER_COL.count_documents({}) / page_size
-        )
-
-        # Check if the page_index is outside the page range
-        if page_index >= pages:
-            return DataAccessBase.sendError("Pagination index out of bounds")
+        # Get the page after the cursor, without counting, if one was given
+        if cursor is not None:
+            results, paging = DataAccessBase.find_page(
+                DataAccessBase.USER_COL,
+                {},
+                page_size,
+                cursor,
+                DataAccessBase.ID_SORT,
+            )
+            if results is None:
+                return DataAccessBase.sendError("Invalid pagination cursor")
 
-        # Calculate skip value
-        skips = page_size * (page_index)
+        # Get the page at the page index otherwise
+        else:
+            # Get the total amount of pages based on pagination size
+            pages = math.ceil(
+                CountCache.count(DataAccessBase.USER_COL, {}, estimated=True)
+                / page_size
+            )
 
-        # Get the list of users based on the given page size and index
-        results = DataAccessBase.USER_COL.find().skip(skips).limit(page_size)
+            # Check if the page_index is outside the page range
+            if page_index >= pages:
+                return DataAccessBase.sendError(
+                    "Pagination index out of bounds"
+                )
+
+            # Calculate skip value
+            skips = page_size * (page_index)
+
+            # Get the list of users based on the given page size and index
+            results = (
+                DataAccessBase.USER_COL.find()
+                .sort(DataAccessBase.ID_SORT)
+                .skip(skips)
+                .limit(page_size)
+            )
+            paging = {"pages": pages}
 
         # Turn each document into a Unit object
         results = [User(**item) for item in list(results)]
 
         # Return the results and the page size
-        return DataAccessBase.sendSuccess(results, pages=pages)
+        return DataAccessBase.sendSuccess(results, **paging)
 
     @staticmethod
     @DataAccessBase.dict_wrap
@@ -233,6 +408,7 @@ class UserAccess(DataAccessBase):
         user = DataAccessBase.USER_COL.find_one({"_id": id})
         if user is None:
             return DataAccessBase.sendError("User does not exist")
+        permissions = user.get("permissions")
         user = User(**user)
 
         # Update full_name if any of the names is different
@@ -244,8 +420,18 @@ class UserAccess(DataAccessBase):
             user.info.last_name = kwargs["last_name"]
         kwargs["full_name"] = user.get_fullname()
 
-        # Update the document and return a success message
+        # Update the document and forget the request's stale copy
         DataAccessBase.USER_COL.update_one({"_id": id}, {"$set": kwargs})
+        IdentityMap.evict(DataAccessBase.USER_COL, id)
+        CountCache.updated(DataAccessBase.USER_COL, kwargs)
+
+        # Drop the cached permissions and name if they were changed
+        if kwargs.get("permissions", permissions) != permissions:
+            UserAccess.invalidate_permissions(id)
+        if any(i in kwargs for i in UserAccess.NAME_FIELDS):
+            UserAccess.invalidate_names(id)
+
+        # Return a success message
         return DataAccessBase.sendSuccess("User updated")
 
     @staticmethod
@@ -264,6 +450,7 @@ class UserAccess(DataAccessBase):
                 "$unset": {"reset_token": 1, "token_expiry": 1},
             },
         )
+        IdentityMap.evict(DataAccessBase.USER_COL, id)
 
         # Return message
         return DataAccessBase.sendSuccess("Password updated")
@@ -273,22 +460,8 @@ class UserAccess(DataAccessBase):
     def handle_jwt_blacklisting(refresh: str, access: str) -> DictParse:
         """Handles the blacklisting of JWT tokens"""
 
-        # Get the JTI from the tokens
-        refresh_jti = decode_token(refresh)["jti"]
-        access_jti = decode_token(access)["jti"]
-
-        # Place tokens to blacklist collection
-        DataAccessBase.BLACKLIST_COL.insert_one(
-            {
-                "refresh": refresh,
-                "access": access,
-                "refresh_jti": refresh_jti,
-                "access_jti": access_jti,
-            }
-        )
-
-        # Return message
-        return DataAccessBase.sendSuccess("Signed out")
+        # Revoke both tokens through the blacklist
+        return BlacklistAccess.revoke(refresh, access)
 
     @staticmethod
     @DataAccessBase.dict_wrap
@@ -335,9 +508,19 @@ class UserAccess(DataAccessBase):
 
                 # Replace the unit information
                 DataAccessBase.UNIT_COL.replace_one({"_id": unit["_id"]}, unit)
+                IdentityMap.evict(DataAccessBase.UNIT_COL, unit["_id"])
+                CountCache.updated(
+                    DataAccessBase.UNIT_COL, ["officers", "members"]
+                )
+
+            # Invalidate the cached unit tree
+            UnitTreeCache.bump()
 
             # If the user exists delete their record
             DataAccessBase.USER_COL.delete_one({"_id": id})
+            IdentityMap.evict(DataAccessBase.USER_COL, id)
+            CountCache.deleted(DataAccessBase.USER_COL, user)
+            UserAccess.invalidate_permissions(id)
 
             # Return
             return DataAccessBase.sendSuccess("User kicked out")
@@ -50,8 +50,7 @@ def is_root(func: object) -> object:
 
         # Get user's permissions based on the user's given ID
         id = get_jwt_identity()["_id"]
-        user = UserAccess.get_user(id)
-        user_permissions = set(user.message.info.permissions)
+        user_permissions = UserAccess.get_permissions(id)
 
         # Check if the user has root key
         root = config.root_permission_string in user_permissions
@@ -79,8 +78,7 @@ def permissions_required(required_permissions: List[str]) -> object:
 
             # Get user's permissions based on the user's given ID
             id = get_jwt_identity()["_id"]
-            user = UserAccess.get_user(id)
-            user_permissions = set(user.message.info.permissions)
+            user_permissions = UserAccess.get_permissions(id)
 
             # IF the user does not have sufficient permissions, deny the user
             if not user_permissions.intersection(required_permissions):
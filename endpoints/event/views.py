@@ -14,14 +14,16 @@ from . import (
     update_event,
     delete_event,
 )
-from utils.communications.email import send_email_by_units
-from utils.communications.discord import send_discord_message_by_units
+from utils.communications.outbox import (
+    discord_messages_by_units,
+    email_messages_by_units,
+    queue_messages,
+)
 from utils.html import strip_html
 from utils.permissions import isOfficerFromAbove
 from database.event import EventAccess
 from database.unit import UnitAccess
 from config.config import config
-from threading import Thread
 from flask_jwt_extended import jwt_required
 from flask import request
 
@@ -58,6 +60,7 @@ def create_event_endpoint(**kwargs):
 
         # Get and prep metadata for the message
         event = EventAccess.get_event_by_id(result.id).message
+        messages = []
 
         # Check if the user wants to notify the people under this unit
         if result.status == "success" and data["notify_email"]:
@@ -71,49 +74,42 @@ def create_event_endpoint(**kwargs):
                 "event_link": f"{config.wingsuite_dashboard_link}/events",
             }
 
-            # Send emails
-            thread = Thread(
-                target=send_email_by_units,
-                args=(
-                    unit.info._id,
-                    msg_content,
-                    "New Event",
-                    config.message_emoji.event,
-                ),
+            # Queue the emails
+            messages += email_messages_by_units(
+                unit.info._id,
+                msg_content,
+                "New Event",
+                config.message_emoji.event,
             )
-            thread.start()
 
         # Check if the user wants to notify the people under this unit
         if result.status == "success" and data["notify_discord"]:
             # Strip the text
             strip_text = strip_html(event.info.description)
 
-            # Send Discord messages
-            thread = Thread(
-                target=send_discord_message_by_units,
-                args=(
-                    unit.info._id,
-                    strip_text,
-                    "NEW EVENT // " + event.info.name,
-                    [
-                        {
-                            "name": "Event Duration",
-                            "value": event.get_formatted_duration(
-                                time_only=False
-                            ),
-                        },
-                        {
-                            "name": "For Units Under",
-                            "value": unit.info.name,
-                        },
-                        {
-                            "name": "Location",
-                            "value": event.info.location,
-                        },
-                    ],
-                ),
+            # Queue the Discord messages
+            messages += discord_messages_by_units(
+                unit.info._id,
+                strip_text,
+                "NEW EVENT // " + event.info.name,
+                [
+                    {
+                        "name": "Event Duration",
+                        "value": event.get_formatted_duration(time_only=False),
+                    },
+                    {
+                        "name": "For Units Under",
+                        "value": unit.info.name,
+                    },
+                    {
+                        "name": "Location",
+                        "value": event.info.location,
+                    },
+                ],
             )
-            thread.start()
+
+        # Store the messages in the outbox, to be sent in the background
+        queue_messages(messages)
 
         # Return response data
         return result, (200 if result.status == "success" else 400)
@@ -195,43 +191,39 @@ def event_dispatch(**kwargs):
             "event_link": f"{config.wingsuite_dashboard_link}/events",
         }
 
-        # Send emails
-        thread = Thread(
-            target=send_email_by_units,
-            args=(
-                i.info.unit,
-                msg_content,
-                f"{i.info.name} Starting in {config.heads_up} Minutes",
-                config.message_emoji.event,
-            ),
+        # Queue the emails
+        messages = email_messages_by_units(
+            i.info.unit,
+            msg_content,
+            f"{i.info.name} Starting in {config.heads_up} Minutes",
+            config.message_emoji.event,
         )
-        thread.start()
 
-        # Send Discord messages
+        # Queue the Discord messages
         strip_text = strip_html(i.info.description)
-        thread = Thread(
-            target=send_discord_message_by_units,
-            args=(
-                i.info.unit,
-                f"HAPPENING IN {config.heads_up} MINUTES:\n" + strip_text,
-                "EVENT // " + i.info.name,
-                [
-                    {
-                        "name": "Event Duration",
-                        "value": i.get_formatted_duration(),
-                    },
-                    {
-                        "name": "For Units Under",
-                        "value": target_unit,
-                    },
-                    {
-                        "name": "Location",
-                        "value": i.info.location,
-                    },
-                ],
-            ),
+        messages += discord_messages_by_units(
+            i.info.unit,
+            f"HAPPENING IN {config.heads_up} MINUTES:\n" + strip_text,
+            "EVENT // " + i.info.name,
+            [
+                {
+                    "name": "Event Duration",
+                    "value": i.get_formatted_duration(),
+                },
+                {
+                    "name": "For Units Under",
+                    "value": target_unit,
+                },
+                {
+                    "name": "Location",
+                    "value": i.info.location,
+                },
+            ],
         )
-        thread.start()
+
+        # Store the messages in the outbox before marking the event as
+        # tracked, so that a crash in between cannot lose them
+        queue_messages(messages)
 
         # Update the event so  that it has been tracked
         EventAccess.update_event(id=i.info._id, heads_up_dispatched=True)
@@ -14,15 +14,17 @@ from . import (
     update_notification,
     delete_notification,
 )
-from utils.communications.email import send_email_by_units
-from utils.communications.discord import send_discord_message_by_units
+from utils.communications.outbox import (
+    discord_messages_by_units,
+    email_messages_by_units,
+    queue_messages,
+)
 from utils.permissions import isOfficerFromAbove
 from utils.html import strip_html
 from database.notification import NotificationAccess
 from database.unit import UnitAccess
 from database.user import UserAccess
 from config.config import config
-from threading import Thread
 from flask_jwt_extended import jwt_required
 from flask import request
 
@@ -66,6 +68,7 @@ def create_notification_endpoint(**kwargs):
         result = NotificationAccess.create_notification(
             **data, author=kwargs["id"]
         )
+        messages = []
 
         # Check if the user wants to notify the units via email
         if result.status == "success" and data["notify_email"]:
@@ -79,43 +82,38 @@ def create_notification_endpoint(**kwargs):
                 + "/notifications",
             }
 
-            # Send emails
-            thread = Thread(
-                target=send_email_by_units,
-                args=(
-                    unit._id,
-                    msg_content,
-                    "New Notification!",
-                    config.message_emoji.notification,
-                ),
+            # Queue the emails
+            messages += email_messages_by_units(
+                unit._id,
+                msg_content,
+                "New Notification!",
+                config.message_emoji.notification,
             )
-            thread.start()
 
         # Check if the user wants to notify the people under this unit
         if result.status == "success" and data["notify_discord"]:
             # Strip the text
             strip_text = strip_html(data["notification"])
 
-            # Send Discord messages
-            thread = Thread(
-                target=send_discord_message_by_units,
-                args=(
-                    unit._id,
-                    strip_text,
-                    "NOTIFICATION // " + data["name"],
-                    [
-                        {
-                            "name": "From",
-                            "value": from_user_name,
-                        },
-                        {
-                            "name": "For Units Under",
-                            "value": unit.name,
-                        },
-                    ],
-                ),
+            # Queue the Discord messages
+            messages += discord_messages_by_units(
+                unit._id,
+                strip_text,
+                "NOTIFICATION // " + data["name"],
+                [
+                    {
+                        "name": "From",
+                        "value": from_user_name,
+                    },
+                    {
+                        "name": "For Units Under",
+                        "value": unit.name,
+                    },
+                ],
             )
-            thread.start()
+
+        # Store the messages in the outbox, to be sent in the background
+        queue_messages(messages)
 
         # Return response data
         return result, (200 if result.status == "success" else 400)
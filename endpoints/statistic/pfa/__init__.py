@@ -7,6 +7,8 @@ get_pfa_info = Blueprint("get_pfa_info", __name__)
 get_user_pfa_info = Blueprint("get_user_pfa_info", __name__)
 get_pfa_format_info = Blueprint("get_pfa_format_info", __name__)
 get_test_pfa_score = Blueprint("get_test_pfa_score", __name__)
+get_batch_pfa_score = Blueprint("get_batch_pfa_score", __name__)
+get_pfa_score_grid = Blueprint("get_pfa_score_grid", __name__)
 update_pfa = Blueprint("update_pfa", __name__)
 delete_pfa = Blueprint("delete_pfa", __name__)
 
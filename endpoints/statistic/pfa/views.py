@@ -14,15 +14,18 @@ from . import (
     get_user_pfa_info,
     get_pfa_format_info,
     get_test_pfa_score,
+    get_batch_pfa_score,
+    get_pfa_score_grid,
     update_pfa,
     delete_pfa,
 )
 from utils.permissions import isOfficerFromAbove
 from flask_jwt_extended import jwt_required
-from flask import request
+from flask import request, make_response
 from database.statistic.pfa import PFAAccess
 from database.user import UserAccess
 from models.statistic.pfa import PFA
+from utils.pfa import grid
 
 
 #
@@ -163,6 +166,55 @@ def get_test_pfa_score_endpoint(**kwargs):
     return result, (200 if result.status == "success" else 400)
 
 
+@get_batch_pfa_score.route("/get_batch_pfa_score/", methods=["POST"])
+@jwt_required()
+@param_check(ARGS.statistic.pfa.get_batch_pfa_score)
+@error_handler
+def get_batch_pfa_score_endpoint(**kwargs):
+    """Return the test results of many sets of given inputs"""
+
+    # Parse information from the call's body
+    data = request.get_json()
+
+    # Calculate the PFA scorings
+    result = PFAAccess.get_batch_test_pfa(**data)
+
+    # Return response data
+    return result, (200 if result.status == "success" else 400)
+
+
+@get_pfa_score_grid.route("/get_pfa_score_grid/", methods=["GET"])
+@jwt_required()
+@error_handler
+def get_pfa_score_grid_endpoint(**kwargs):
+    """Return the PFA scoring grids so clients can score locally"""
+
+    # Parse the optional gender and age from the query string, so that the
+    # URL alone identifies the cached grid
+    gender = request.args.get("gender")
+    age = request.args.get("age")
+    try:
+        age = float(age) if age is not None else None
+    except ValueError:
+        return client_error_response("Invalid age")
+
+    # Get the serialized grids
+    result = grid.get_score_grid(
+        gender.lower() if gender is not None else None, age
+    )
+    if result is None:
+        return client_error_response("Incorrect gender")
+
+    # Return the grids, or no content if the client's copy is current
+    body, etag = result
+    response = make_response(body)
+    response.mimetype = "application/json"
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = grid.MAX_AGE
+    return response.make_conditional(request)
+
+
 #   endregion
 
 
@@ -17,13 +17,13 @@ from . import (
     delete_task,
 )
 from flask import request
-from utils.communications.email import send_email
+from utils.communications.outbox import email_message, queue_messages
 from utils.html import read_html_file
 from database.statistic.task import TaskAccess
+from database.statistic.reminder import TaskReminderAccess
 from database.user import UserAccess
 from config.config import config
 from datetime import datetime
-from threading import Thread
 
 #
 #   CREATE OPERATIONS
@@ -55,6 +55,7 @@ def create_task_endpoint(**kwargs):
 
     # Send an email to each recipient if success in creating task
     if result.status == "success" and data["notify_email"]:
+        emails = []
         for i in to_users:
             # Get task HTML content
             content = read_html_file(
@@ -69,17 +70,18 @@ def create_task_endpoint(**kwargs):
                 task_link=f"{config.wingsuite_dashboard_link}/tasks",
             )
 
-            # Send an email with the HTML content
-            thread = Thread(
-                target=send_email,
-                args=(
+            # Queue an email with the HTML content
+            emails.append(
+                email_message(
                     i.info.email,
                     "New Task",
                     content,
                     config.message_emoji.statistic.task,
-                ),
+                )
             )
-            thread.start()
+
+        # Store every email in the outbox, to be sent in the background
+        queue_messages(emails)
 
     # Return response data
     return result, (200 if result.status == "success" else 400)
@@ -106,8 +108,9 @@ def get_task_info_endpoint(**kwargs):
     # Get the id of the target task
     id = data.pop("id")
 
-    # Get the task's information from the database
-    result = TaskAccess.get_task(id)
+    # Get the task's information from the database, with the optional name
+    # map options
+    result = TaskAccess.get_task(id, **data)
 
     # Return error if no task was provided
     if result.status == "error":
@@ -145,14 +148,31 @@ def get_dispatched_tasks_endpoint(**kwargs):
 def task_dispatch(**kwargs):
     """Function to dispatch task notifications"""
 
-    # Get tasks that have reminders
-    tasks = TaskAccess.get_upcoming_tasks().message
+    # Dispatch batches of due reminders until none are left
+    memoize = {}
+    while True:
+        # Claim the due reminders and get the tasks they belong to
+        result = TaskAccess.get_upcoming_tasks()
+        tasks = result.message
+
+        # Print debug
+        print(f"Found {len(tasks)} tasks to dispatch")
+
+        # Queue the reminders, then complete the claim so they are not
+        # queued again
+        _dispatch_tasks(tasks, memoize)
+        TaskReminderAccess.complete(result.claim)
 
-    # Print debug
-    print(f"Found {len(tasks)} tasks to dispatch")
+        # Stop once a batch came back smaller than the batch size
+        if result.claimed < TaskReminderAccess.BATCH_SIZE:
+            break
+
+
+def _dispatch_tasks(tasks, memoize):
+    """Function to send the reminders of the given tasks"""
 
     # Iterate through each event]
-    memoize = {}
+    emails = []
     for i in tasks:
         # Get suspense time for the iterate task
         suspense_str = datetime.fromtimestamp(i.info.suspense).strftime(
@@ -186,17 +206,18 @@ def task_dispatch(**kwargs):
                 "task_link": f"{config.wingsuite_dashboard_link}/tasks",
             }
 
-            # Send emails
-            thread = Thread(
-                target=send_email,
-                args=(
+            # Queue the email
+            emails.append(
+                email_message(
                     email,
                     "Task Reminder",
                     read_html_file(**msg_content),
                     config.message_emoji.statistic.task,
-                ),
+                )
             )
-            thread.start()
+
+    # Store every email in the outbox, to be sent in the background
+    queue_messages(emails)
 
 
 #   endregion
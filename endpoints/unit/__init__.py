@@ -20,6 +20,7 @@ is_superior_officer = Blueprint("is_superior_officer", __name__)
 get_all_five_point_data = Blueprint("get_all_five_point_data", __name__)
 get_all_pfa_data = Blueprint("get_all_pfa_data", __name__)
 get_all_warrior_data = Blueprint("get_all_warrior_data", __name__)
+get_unit_summary = Blueprint("get_unit_summary", __name__)
 delete_unit = Blueprint("delete_unit", __name__)
 delete_members = Blueprint("delete_members", __name__)
 delete_officers = Blueprint("delete_officers", __name__)
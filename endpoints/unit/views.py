@@ -25,19 +25,19 @@ from . import (
     get_all_five_point_data,
     get_all_pfa_data,
     get_all_warrior_data,
+    get_unit_summary,
     delete_unit,
     delete_members,
     delete_officers,
 )
-from utils.communications.email import send_email
+from utils.communications.outbox import email_message, queue_messages
 from utils.permissions import isOfficerFromAbove
 from utils.html import read_html_file
 from config.config import config
 from flask_jwt_extended import jwt_required
 from flask import request
-from database.statistic.five_point import FivePointAccess
-from database.statistic.warrior import WarriorAccess
-from database.statistic.pfa import PFAAccess
+from database.statistic.rollup import RollupAccess
+from database.statistic.summary import StatSummaryAccess
 from database.unit import UnitAccess
 from database.user import UserAccess
 from urllib.parse import quote
@@ -63,6 +63,7 @@ def _update_personnel_helper(id, users, operation, participation):
 
     # Iterate through the list of members
     results = {}
+    emails = []
     for user in users:
         # Get the user object of the iterated person
         user_obj = UserAccess.get_user(user)
@@ -122,12 +123,14 @@ def _update_personnel_helper(id, users, operation, participation):
                 + f"{quote(unit.info.name)}/frontpage",
             )
 
-            # Send an email with the HTML content
-            send_email(
-                receiver=user_obj.info.email,
-                subject=f"Added to {unit.info.name}",
-                content=content,
-                emoji=config.message_emoji.unit.added,
+            # Queue an email with the HTML content
+            emails.append(
+                email_message(
+                    user_obj.info.email,
+                    f"Added to {unit.info.name}",
+                    content,
+                    config.message_emoji.unit.added,
+                )
             )
 
         # Send added email if the user was successfully added
@@ -137,17 +140,22 @@ def _update_personnel_helper(id, users, operation, participation):
                 "unit.kicked", to_user=to_user_name, unit_name=unit.info.name
             )
 
-            # Send an email with the HTML content
-            send_email(
-                receiver=user_obj.info.email,
-                subject=f"Kicked from {unit.info.name}",
-                content=content,
-                emoji=config.message_emoji.unit.kicked,
+            # Queue an email with the HTML content
+            emails.append(
+                email_message(
+                    user_obj.info.email,
+                    f"Kicked from {unit.info.name}",
+                    content,
+                    config.message_emoji.unit.kicked,
+                )
             )
 
     # Push unit changes
     UnitAccess.update_unit(id, **unit.info)
 
+    # Store every email in the outbox, to be sent in the background
+    queue_messages(emails)
+
     # Make the message
     message = {
         "status": "success",
@@ -635,28 +643,8 @@ def get_all_five_point_data_endpoint(**kwargs):
     # Get a list of all units and their members below
     below = UnitAccess.get_units_below([unit._id]).message
 
-    # Get all of the users' five point info and the mapping for the unit they
-    # are in
-    mapper = {}
-    memoize = set()
-    for item in below:
-        track = []
-        for user in item.members + item.officers:
-            if user in memoize:
-                continue
-            res = FivePointAccess.get_user_five_point(user, 10000, 0).message
-            for i in res:
-                i["full_name"] = UserAccess.get_user(
-                    i["to_user"]
-                ).message.info.full_name
-            memoize.add(user)
-            track += res
-        track = sorted(
-            track,
-            key=lambda x: x["composite_score"],
-            reverse=True,
-        )
-        mapper[item.name] = track
+    # Get all of the users' five point info, grouped by the unit they are in
+    mapper = RollupAccess.get_unit_rollup("five_point", below).message
 
     # Success return
     return success_response(mapper)
@@ -696,27 +684,8 @@ def get_all_pfa_data_endpoint(**kwargs):
     # Get a list of all units and their members below
     below = UnitAccess.get_units_below([unit._id]).message
 
-    # Get all of the users' PFA info and the mapping for the unit they are in
-    mapper = {}
-    memoize = set()
-    for item in below:
-        track = []
-        for user in item.members + item.officers:
-            if user in memoize:
-                continue
-            res = PFAAccess.get_user_pfa(user, 10000, 0).message
-            for i in res:
-                i["full_name"] = UserAccess.get_user(
-                    i["to_user"]
-                ).message.info.full_name
-            memoize.add(user)
-            track += res
-        track = sorted(
-            track,
-            key=lambda x: x["composite_score"],
-            reverse=True,
-        )
-        mapper[item.name] = track
+    # Get all of the users' PFA info, grouped by the unit they are in
+    mapper = RollupAccess.get_unit_rollup("pfa", below).message
 
     # Success return
     return success_response(mapper)
@@ -756,32 +725,56 @@ def get_all_warrior_data_endpoint(**kwargs):
     # Get a list of all units and their members below
     below = UnitAccess.get_units_below([unit._id]).message
 
-    # Get all of the users' WK info and the mapping for the unit they are in
-    mapper = {}
-    memoize = set()
-    for item in below:
-        track = []
-        for user in item.members + item.officers:
-            if user in memoize:
-                continue
-            res = WarriorAccess.get_user_warrior(user, 10000, 0).message
-            for i in res:
-                i["full_name"] = UserAccess.get_user(
-                    i["to_user"]
-                ).message.info.full_name
-            memoize.add(user)
-            track += res
-        track = sorted(
-            track,
-            key=lambda x: x["composite_score"],
-            reverse=True,
-        )
-        mapper[item.name] = track
+    # Get all of the users' WK info, grouped by the unit they are in
+    mapper = RollupAccess.get_unit_rollup("warrior", below).message
 
     # Success return
     return success_response(mapper)
 
 
+@get_unit_summary.route("/get_unit_summary/", methods=["POST"])
+@is_root
+@permissions_required(["unit.get_unit_summary"])
+@param_check(ARGS.unit.get_unit_summary)
+@error_handler
+def get_unit_summary_endpoint(**kwargs):
+    """
+    Respond with the summary of a statistic type for a given unit and every
+    unit below it
+    """
+
+    # Parse information from the call's body
+    data = request.get_json()
+
+    # Get the unit object of the target unit and return if error
+    unit = UnitAccess.get_unit(data["id"])
+    if unit.status == "error":
+        return client_error_response(unit.message)
+    unit = unit.message.info
+
+    # Check if the user is an officer of a superior unit
+    is_superior_officer = isOfficerFromAbove(data["id"], kwargs["id"])
+
+    # If the user is not rooted nor is officer of the unit, return error
+    if not (
+        kwargs["isRoot"]
+        or kwargs["id"] in unit.officers
+        or is_superior_officer
+    ):
+        # Return error if not
+        return client_error_response(
+            "You don't have access to this information"
+        )
+
+    # Get the unit's summary and return if error
+    summary = StatSummaryAccess.get_summary(unit._id, data["stat_type"])
+    if summary.status == "error":
+        return client_error_response(summary.message)
+
+    # Success return
+    return success_response(summary.message)
+
+
 #   endregion
 
 #
@@ -808,6 +801,13 @@ def update_unit_endpoint(**kwargs):
 
     # Check if the user specified the parent class
     if "parent" in data:
+        # Prevent the unit from being placed below itself
+        below = UnitAccess.get_units_below([unit._id]).message
+        if data["parent"] in [item._id for item in below]:
+            return client_error_response(
+                "The new parent unit cannot be below the unit itself"
+            )
+
         # Get the old parent unit and update it
         old_unit = UnitAccess.get_unit(unit.parent)
         if old_unit.status == "success":
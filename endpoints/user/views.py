@@ -36,6 +36,7 @@ from database.notification import NotificationAccess
 from database.event import EventAccess
 from database.user import UserAccess
 from database.unit import UnitAccess
+from utils.permissions import getCommandedUnits
 from config.config import permissions, config
 import json
 
@@ -135,7 +136,7 @@ def everyone_endpoint(**kwargs):
     data = request.get_json()
 
     # Get the user and their permissions
-    perms = UserAccess.get_user(id=kwargs["id"]).message.info.permissions
+    perms = UserAccess.get_permissions(kwargs["id"])
 
     # Create protections for the result
     protections = ["phone_number", "permissions"]
@@ -225,9 +226,6 @@ def get_feedback_endpoint(**kwargs):
     # Get feedbacks from database
     results = FeedbackAccess.get_own_feedback(id, **data)
 
-    # Reverse feedback order
-    results.message = results.message[::-1]
-
     # If the resulting information is in error, respond with error
     if results.status == "error":
         return client_error_response(results.message)
@@ -264,28 +262,19 @@ def get_events_endpoint(**kwargs):
     # If the user is an admin, get all of the unit IDs
     units = result.units
     if isAdmin:
-        units = UnitAccess.get_all_units(page_size=2000, page_index=0).message
-        units = [item.info._id for item in units]
+        units = list(UnitAccess.get_unit_tree().order)
 
-    # Setup information for iteration
+    # Setup information for iteration, covering the units above the user's
+    # units and every unit the user commands
     user_events = {}
-    iterable_units = []
-    units_above = UnitAccess.get_units_above(units).message
-    for i in units_above:
-        # Check if the user is an officer for the iterated unit
-        if id in i.officers:
-            # Get the units below
-            temp_below = UnitAccess.get_units_below([i._id]).message
-
-            # Append to iterable_units
-            iterable_units += temp_below
-    iterable_units += units_above
+    iterable_units = set(UnitAccess.get_unit_tree().above(units))
+    iterable_units |= getCommandedUnits(id)
 
     # Iterate through the user's units and get their event information
     for i in iterable_units:
         # Get event info
         events = EventAccess.get_event_by_unit_id(
-            i._id, data["start_datetime"], data["end_datetime"]
+            i, data["start_datetime"], data["end_datetime"]
         )
 
         # If the queried event(s) is not None add em
@@ -331,28 +320,19 @@ def get_notifications_endpoint(**kwargs):
     # If the user is an admin, get all of the unit IDs
     units = result.units
     if isAdmin:
-        units = UnitAccess.get_all_units(page_size=2000, page_index=0).message
-        units = [item.info._id for item in units]
+        units = list(UnitAccess.get_unit_tree().order)
 
-    # Setup information for iteration
+    # Setup information for iteration, covering the units above the user's
+    # units and every unit the user commands
     user_notifications = {}
-    iterable_units = []
-    units_above = UnitAccess.get_units_above(units).message
-    for i in units_above:
-        # Check if the user is an officer for the iterated unit
-        if id in i.officers:
-            # Get the units below
-            temp_below = UnitAccess.get_units_below([i._id]).message
-
-            # Append to iterable_units
-            iterable_units += temp_below
-    iterable_units += units_above
+    iterable_units = set(UnitAccess.get_unit_tree().above(units))
+    iterable_units |= getCommandedUnits(id)
 
     # Iterate through the user's units and get their event information
     for i in iterable_units:
         # Get event info
         notifications = NotificationAccess.get_notification_by_unit_id(
-            i._id, data["start_datetime"], data["end_datetime"]
+            i, data["start_datetime"], data["end_datetime"]
         )
 
         # If the queried event(s) is not None add em
@@ -479,77 +459,42 @@ def get_users_units_endpoint(**kwargs):
     # Get the user's information from the database
     user = UserAccess.get_user(id).message.info
 
+    # Get the current unit tree snapshot
+    tree = UnitAccess.get_unit_tree()
+
     # Check if the user is a root user
     if config.root_permission_string in user.permissions:
-        # Get all of the units
-        results = UnitAccess.get_all_units(page_size=3000, page_index=0)
-
-        # If the resulting information is in error, respond with error
-        if results.status == "error":
-            return client_error_response(results.message)
-
-        # Sort and Format message
-        results = [item.info for item in results.message]
-        results = sorted(
-            results,
-            key=lambda x: (
-                config.unit_types.index(x["unit_type"]),
-                x["name"],
-            ),
+        # Return every unit, already sorted by unit type and name
+        return success_response(
+            [UnitAccess._snapshot_unit(tree, i) for i in tree.order]
         )
 
-        # Return results
-        return success_response(results)
-
     # Iterate through the units that the user is in
-    units = []
+    units = {}
     for i in user.units:
-        # If the user is an officer in the unit, get all units beneath
-        if id in UnitAccess.get_unit(i).message.info.officers:
-            # Get the units below
-            units_below = UnitAccess.get_units_below([i]).message
-
-            # Iterate through every unit and add a tag for superiority
-            for idx, j in enumerate(units_below):
-                # Tag the unit
-                j.is_superior = True
+        # Continue if the unit no longer exists
+        if i not in tree.nodes:
+            continue
 
-                # Apply changes
-                units_below[idx] = j
+        # If the user is an officer in the unit, get all units beneath and
+        # tag them for superiority
+        if id in tree.nodes[i]["officers"]:
+            for j in tree.below([i]):
+                units[j] = True
 
-            # Update units list
-            units += units_below
         # If not, just add the unit iterated
         else:
-            # Get the unit
-            unit = UnitAccess.get_unit(i).message.info
-
-            # Update unit's information
-            unit.is_superior = False
-
-            # Update units list
-            units.append(unit)
-
-    # Filter data
-    temp = set()
-    filtered = []
-    for i in units:
-        # Add unit ID to set if not in the set and track the unit
-        if i._id not in temp:
-            temp.add(i._id)
-            filtered.append(i)
-        # If not, continue
-        else:
-            continue
+            units.setdefault(i, False)
 
     # Sort and Format message
-    results = sorted(
-        list(filtered),
-        key=lambda x: (
-            config.unit_types.index(x["unit_type"]),
-            x["name"],
-        ),
-    )
+    results = []
+    for i in sorted(units, key=lambda x: tree.rank[x]):
+        # Get the unit and update its information
+        unit = UnitAccess._snapshot_unit(tree, i)
+        unit["is_superior"] = units[i]
+
+        # Add to the results
+        results.append(unit)
 
     # Return results
     return success_response(results)
@@ -6,7 +6,9 @@ from flask_cors import CORS
 from flask import Flask
 
 # Data Import
-from database.base import DataAccessBase
+from database.blacklist import BlacklistAccess
+from database.identity_map import IdentityMap
+from database.migrations import run_migrations
 
 # Endpoint Imports
 from endpoints.authentication import (
@@ -60,6 +62,7 @@ from endpoints.unit import (
     get_all_five_point_data,
     get_all_pfa_data,
     get_all_warrior_data,
+    get_unit_summary,
     delete_unit,
     delete_members,
     delete_officers,
@@ -100,6 +103,8 @@ from endpoints.statistic.pfa import (
     get_user_pfa_info,
     get_pfa_format_info,
     get_test_pfa_score,
+    get_batch_pfa_score,
+    get_pfa_score_grid,
     update_pfa,
     delete_pfa,
 )
@@ -128,6 +133,8 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 # Miscellaneous Imports
+from utils.communications.outbox import dispatch_outbox
+from utils.background import BackgroundExecutor
 from config.config import config
 from datetime import timedelta
 import atexit
@@ -172,11 +179,8 @@ def check_if_token_in_blacklist(jwt_header, jwt_payload):
     # Get the JWT token information
     jti = jwt_payload["jti"]
 
-    # Check if the token is blacklisted
-    query = DataAccessBase.BLACKLIST_COL.find_one({"access_jti": jti})
-
-    # Return true if it is, false if not
-    return query is not None
+    # Return true if the token is blacklisted, false if not
+    return BlacklistAccess.is_revoked(jti)
 
 
 # Customize expired token message
@@ -191,6 +195,19 @@ def my_expired_token_callback(*kwargs):
     }, 401
 
 
+# Report the request's identity map savings while debugging
+@app.after_request
+def report_identity_map_hits(response):
+    """Function to expose how many fetches the identity map saved"""
+
+    # Add the counter as a header in debug mode
+    if app.debug:
+        response.headers["X-Identity-Map-Hits"] = str(IdentityMap.hits())
+
+    # Return the response
+    return response
+
+
 # Dry landing page
 @app.route("/")
 def home():
@@ -274,6 +291,7 @@ app.register_blueprint(is_superior_officer, url_prefix="/unit/")
 app.register_blueprint(get_all_five_point_data, url_prefix="/unit/")
 app.register_blueprint(get_all_pfa_data, url_prefix="/unit/")
 app.register_blueprint(get_all_warrior_data, url_prefix="/unit/")
+app.register_blueprint(get_unit_summary, url_prefix="/unit/")
 app.register_blueprint(update_unit, url_prefix="/unit/")
 app.register_blueprint(update_frontpage, url_prefix="/unit/")
 app.register_blueprint(update_communication_settings, url_prefix="/unit/")
@@ -334,6 +352,8 @@ app.register_blueprint(get_pfa_info, url_prefix="/statistic/pfa/")
 app.register_blueprint(get_user_pfa_info, url_prefix="/statistic/pfa/")
 app.register_blueprint(get_pfa_format_info, url_prefix="/statistic/pfa/")
 app.register_blueprint(get_test_pfa_score, url_prefix="/statistic/pfa/")
+app.register_blueprint(get_batch_pfa_score, url_prefix="/statistic/pfa/")
+app.register_blueprint(get_pfa_score_grid, url_prefix="/statistic/pfa/")
 app.register_blueprint(update_pfa, url_prefix="/statistic/pfa/")
 app.register_blueprint(delete_pfa, url_prefix="/statistic/pfa/")
 # endregion
@@ -368,6 +388,15 @@ app.register_blueprint(delete_warrior, url_prefix="/statistic/warrior/")
 APP RUNTIME HANDLING
 """
 
+# Run the data migrations that have not run on this database yet, which
+# only the first worker to claim each one does. Indexes are created by
+# `python -m database.migrations` before the server starts
+run_migrations()
+
+# Let the queued notifications finish when exiting the app, after the
+# scheduler stopped adding new ones
+atexit.register(BackgroundExecutor.shutdown)
+
 # Scheduler functionalities
 if os.environ.get(
     "WERKZEUG_RUN_MAIN"
@@ -391,6 +420,12 @@ if os.environ.get(
         id="check_tasks_notification_job",
         replace_existing=True,
     )
+    scheduler.add_job(
+        func=dispatch_outbox,
+        trigger=trigger,
+        id="dispatch_outbox_job",
+        replace_existing=True,
+    )
 
     # Shut down the scheduler when exiting the app
     atexit.register(lambda: scheduler.shutdown())
@@ -50,14 +50,21 @@ class User:
         self: "User", lastNameFirst: bool = True, with_rank: bool = False
     ) -> str:
         """Returns the user's full name"""
+        return User.format_name(self.info, lastNameFirst, with_rank)
+
+    @staticmethod
+    def format_name(
+        info: dict, lastNameFirst: bool = True, with_rank: bool = False
+    ) -> str:
+        """Returns the full name held by the given user information"""
 
         # Get the user's names
-        first_name = self.info.first_name
-        last_name = self.info.last_name
-        rank = self.info.rank + " " if "rank" in self.info else ""
+        first_name = info["first_name"]
+        last_name = info["last_name"]
+        rank = info["rank"] + " " if "rank" in info else ""
         middle_initial = ""
-        if "middle_initial" in self.info:
-            middle_initial = " " + self.info.middle_initial
+        if "middle_initial" in info:
+            middle_initial = " " + info["middle_initial"]
 
         # Get the name in different styles based on given options
         if lastNameFirst:
@@ -1,4 +1,5 @@
 export RUN_MODE=0
+python -m database.migrations
 flask --app main.py --debug run
 echo
 echo "Unsetting RUN_MODE"
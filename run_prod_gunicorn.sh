@@ -1,4 +1,5 @@
 export RUN_MODE=1
+python -m database.migrations
 gunicorn --bind "0.0.0.0:5000" wsgi:app
 echo
 echo "Unsetting RUN_MODE"
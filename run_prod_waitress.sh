@@ -1,4 +1,5 @@
 export RUN_MODE=1
+python -m database.migrations
 python main.py
 echo
 echo "Unsetting RUN_MODE"
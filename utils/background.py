@@ -0,0 +1,160 @@
+# Imports
+from typing import Any, Callable, Dict
+import traceback
+import threading
+import queue
+import time
+import os
+
+
+class BackgroundExecutor:
+    """Bounded pool of worker threads shared by background jobs"""
+
+    # Amount of worker threads
+    WORKERS = 4
+
+    # Most jobs waiting at once before submitting applies backpressure
+    MAX_QUEUED = 1000
+
+    # Seconds a submit waits for room in a full queue before rejecting
+    SUBMIT_TIMEOUT = 5
+
+    # Seconds shutdown waits for the queued jobs to finish
+    DRAIN_TIMEOUT = 30
+
+    # Static variable declaration
+    _queue = None
+    _threads = []
+    _pid = None
+    _accepting = True
+    _lock = threading.Lock()
+    _counts = {
+        "queued": 0,
+        "in_flight": 0,
+        "completed": 0,
+        "failed": 0,
+        "rejected": 0,
+    }
+
+    @staticmethod
+    def _count(name: str, delta: int) -> None:
+        """Method to move one of the job counters"""
+        with BackgroundExecutor._lock:
+            BackgroundExecutor._counts[name] += delta
+
+    @staticmethod
+    def _start() -> None:
+        """Method to start the workers of this process if needed"""
+
+        # Start the workers on first use in every process, since threads
+        # do not survive the forks of the server's workers
+        with BackgroundExecutor._lock:
+            if BackgroundExecutor._pid == os.getpid():
+                return
+            BackgroundExecutor._queue = queue.Queue(
+                BackgroundExecutor.MAX_QUEUED
+            )
+            BackgroundExecutor._threads = [
+                threading.Thread(
+                    target=BackgroundExecutor._work,
+                    name=f"background-{i}",
+                    daemon=True,
+                )
+                for i in range(BackgroundExecutor.WORKERS)
+            ]
+            for thread in BackgroundExecutor._threads:
+                thread.start()
+            BackgroundExecutor._pid = os.getpid()
+            BackgroundExecutor._accepting = True
+
+    @staticmethod
+    def _work() -> None:
+        """Method run by every worker to execute the queued jobs"""
+
+        # Run jobs until the stop marker is received
+        jobs = BackgroundExecutor._queue
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            BackgroundExecutor._count("queued", -1)
+            BackgroundExecutor._count("in_flight", 1)
+
+            # Run the job, counting it as failed if it raises
+            func, args, kwargs = job
+            try:
+                func(*args, **kwargs)
+                BackgroundExecutor._count("completed", 1)
+            except Exception:
+                BackgroundExecutor._count("failed", 1)
+                print(f"Caught an exception in background {func.__name__}():")
+                traceback.print_exc()
+            finally:
+                BackgroundExecutor._count("in_flight", -1)
+
+    @staticmethod
+    def submit(func: Callable, *args: Any, **kwargs: Any) -> bool:
+        """Method to queue a job, returning whether it was accepted"""
+
+        # Start the workers and refuse jobs once shutting down
+        BackgroundExecutor._start()
+        if not BackgroundExecutor._accepting:
+            BackgroundExecutor._count("rejected", 1)
+            return False
+
+        # Queue the job, waiting a bit for room if the queue is full
+        BackgroundExecutor._count("queued", 1)
+        try:
+            BackgroundExecutor._queue.put(
+                (func, args, kwargs), timeout=BackgroundExecutor.SUBMIT_TIMEOUT
+            )
+        except queue.Full:
+            BackgroundExecutor._count("queued", -1)
+            BackgroundExecutor._count("rejected", 1)
+            print(f"Background queue is full, dropped {func.__name__}()")
+            return False
+
+        # Return that the job was accepted
+        return True
+
+    @staticmethod
+    def stats() -> Dict[str, int]:
+        """Method to get the job counters"""
+        with BackgroundExecutor._lock:
+            return dict(BackgroundExecutor._counts)
+
+    @staticmethod
+    def shutdown(timeout: float = None) -> bool:
+        """Method to stop taking jobs and let the queued ones finish"""
+
+        # Return if the workers were never started in this process or were
+        # already shut down
+        if (
+            BackgroundExecutor._pid != os.getpid()
+            or not BackgroundExecutor._accepting
+        ):
+            return True
+        if timeout is None:
+            timeout = BackgroundExecutor.DRAIN_TIMEOUT
+
+        # Stop taking jobs and wait for the queued and running ones
+        BackgroundExecutor._accepting = False
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            stats = BackgroundExecutor.stats()
+            if stats["queued"] == 0 and stats["in_flight"] == 0:
+                break
+            time.sleep(0.05)
+
+        # Stop the workers, leaving any stuck ones behind as daemons
+        stats = BackgroundExecutor.stats()
+        drained = stats["queued"] == 0 and stats["in_flight"] == 0
+        if drained:
+            for _ in BackgroundExecutor._threads:
+                BackgroundExecutor._queue.put(None)
+            for thread in BackgroundExecutor._threads:
+                thread.join(max(deadline - time.monotonic(), 0))
+
+        # Return whether every job finished
+        print(f"Background jobs drained: {drained} - {stats}")
+        return drained
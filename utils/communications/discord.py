@@ -1,7 +1,204 @@
 # Imports
 from database.unit import UnitAccess
-from typing import List, Any
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import List, Tuple
+import threading
 import requests
+import time
+import os
+
+
+class DiscordClient:
+    """Webhook client that shares connections and follows rate limits"""
+
+    # Seconds to wait for a connection and for a response
+    TIMEOUT = (3.05, 10)
+
+    # Most webhooks posted to at once
+    WORKERS = 8
+
+    # Attempts at posting again after being rate limited
+    RETRIES = 2
+
+    # Most seconds to wait for a rate limit to reset before giving up, so
+    # that a worker is never held for long
+    MAX_WAIT = 5
+
+    # Bucket key of the rate limit shared by every webhook
+    GLOBAL = "*"
+
+    # Static variable declaration
+    _session = None
+    _executor = None
+    _pid = None
+    _buckets = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _start() -> None:
+        """Method to create the session and threads of this process"""
+
+        # Create the session and threads on first use in every process,
+        # since pooled connections and threads do not survive the forks of
+        # the server's workers
+        with DiscordClient._lock:
+            if DiscordClient._pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=DiscordClient.WORKERS,
+                    pool_maxsize=DiscordClient.WORKERS,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                DiscordClient._session = session
+                DiscordClient._executor = ThreadPoolExecutor(
+                    DiscordClient.WORKERS, thread_name_prefix="discord"
+                )
+                DiscordClient._pid = os.getpid()
+
+    @staticmethod
+    def _get_session() -> requests.Session:
+        """Method to get the session of this process"""
+        DiscordClient._start()
+        return DiscordClient._session
+
+    @staticmethod
+    def _get_executor() -> ThreadPoolExecutor:
+        """Method to get the threads that post for this process"""
+        DiscordClient._start()
+        return DiscordClient._executor
+
+    @staticmethod
+    def _wait_time(url: str) -> float:
+        """Method to get the seconds until a webhook can be posted to"""
+
+        # Wait for the webhook's and the global bucket if they are empty
+        wait = 0
+        now = time.monotonic()
+        with DiscordClient._lock:
+            for key in (url, DiscordClient.GLOBAL):
+                remaining, reset_at = DiscordClient._buckets.get(key, (1, 0))
+                if remaining <= 0:
+                    wait = max(wait, reset_at - now)
+
+        # Return the longest wait
+        return wait
+
+    @staticmethod
+    def _update_bucket(url: str, response: requests.Response) -> None:
+        """Method to remember the rate limit a response reported"""
+
+        # Get the remaining requests and when the bucket resets
+        headers = response.headers
+        now = time.monotonic()
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        key = url
+
+        # A rate limited response empties the bucket until the retry time,
+        # which may be the limit shared by every webhook
+        if response.status_code == 429:
+            remaining = 0
+            reset_after = headers.get("Retry-After", reset_after)
+            if headers.get("X-RateLimit-Global") or (
+                headers.get("X-RateLimit-Scope") == "global"
+            ):
+                key = DiscordClient.GLOBAL
+
+        # Save the bucket if the response reported one
+        if remaining is None or reset_after is None:
+            return
+        with DiscordClient._lock:
+            DiscordClient._buckets[key] = (
+                int(remaining),
+                now + float(reset_after),
+            )
+
+    @staticmethod
+    def post(url: str, data: dict) -> bool:
+        """Method to post to a webhook, waiting out short rate limits"""
+
+        # Try again after being rate limited, unless the wait is too long
+        for _ in range(DiscordClient.RETRIES + 1):
+            wait = DiscordClient._wait_time(url)
+            if wait > DiscordClient.MAX_WAIT:
+                print(f"Discord rate limited for {wait:.1f}s -", url)
+                return False
+            if wait > 0:
+                time.sleep(wait)
+
+            # Post the message, giving up on an unreachable webhook
+            try:
+                response = DiscordClient._get_session().post(
+                    url, json=data, timeout=DiscordClient.TIMEOUT
+                )
+            except requests.RequestException as e:
+                print(f"Discord message failed - {url}: {e!r}")
+                return False
+
+            # Remember the rate limit and return whether the post worked
+            DiscordClient._update_bucket(url, response)
+            if response.status_code != 429:
+                return response.ok
+
+        # Return false if still rate limited
+        print("Discord rate limited -", url)
+        return False
+
+    @staticmethod
+    def post_many(posts: List[Tuple[str, dict]]) -> List[bool]:
+        """Method to post to many webhooks at once"""
+
+        # Post the single message in this thread
+        if len(posts) <= 1:
+            return [DiscordClient.post(*i) for i in posts]
+
+        # Post to every webhook concurrently on the process' threads,
+        # returning each result
+        return list(
+            DiscordClient._get_executor().map(
+                lambda i: DiscordClient.post(*i), posts
+            )
+        )
+
+
+def _build_payload(
+    title: str,
+    message: str,
+    emoji: str = "🔔",
+    at_everyone: bool = False,
+    fields: List[dict] = {},
+) -> dict:
+    """Helper function to build a Discord embedded message"""
+
+    # Define image url
+    image = "https://avatars.githubusercontent.com/u/134102646?s=200&v=4"
+
+    # Define bot name
+    emoji = emoji + " " if emoji else ""
+
+    # Define the content of the embedded message
+    embed = {
+        "title": title,
+        "description": message,
+        "color": 0x54C0FF,
+        "fields": fields,
+    }
+
+    # Set a custom username and avatar for the webhook
+    data = {
+        "username": f"{emoji}WingSuite",
+        "avatar_url": image,
+        "embeds": [embed],
+    }
+
+    # Include @everyone if the at_everyone is provided
+    if at_everyone:
+        data["content"] = "@everyone"
+
+    # Return the message
+    return data
 
 
 def send_discord_message(
@@ -16,79 +213,64 @@ def send_discord_message(
 
     # Try
     try:
-        # Define image url
-        image = "https://avatars.githubusercontent.com/u/134102646?s=200&v=4"
-
-        # Define bot name
-        emoji = emoji + " " if emoji else ""
-
-        # Define the content of the embedded message
-        embed = {
-            "title": title,
-            "description": message,
-            "color": 0x54C0FF,
-            "fields": fields,
-        }
-
-        # Set a custom username and avatar for the webhook
-        data = {
-            "username": f"{emoji}WingSuite",
-            "avatar_url": image,
-            "embeds": [embed],
-        }
-
-        # Include @everyone if the at_everyone is provided
-        if at_everyone:
-            data["content"] = "@everyone"
-
         # Send the message with the defined content
-        requests.post(url, json=data)
-
-        # Return
-        return True
+        return DiscordClient.post(
+            url, _build_payload(title, message, emoji, at_everyone, fields)
+        )
 
     # Return false on error
     except Exception:
         return False
 
 
-def send_discord_message_by_units(
-    unit: str,
-    message: dict,
-    title: str,
-    fields: List[dict] = {},
-    **kwargs: Any,
-) -> bool:
-    """Helper function to send discord message by units"""
+def send_discord_messages(messages: List[dict]) -> List[bool]:
+    """Sends many Discord embedded messages at once"""
 
-    # Try
-    try:
-        # Get units below the current unit
-        units = UnitAccess.get_units_below([unit]).message
-
-        # Iterate through the unit list and send discord messages if they
-        # have a proper discord embed link
-        for i in units:
-            # If there is no communication field in the unit's info, continue
-            if "communications" not in i:
-                continue
-
-            # If there is no proper discord link, continue
-            if "discord" not in i.communications:
-                continue
-
-            # Send an email with the HTML content
-            send_discord_message(
-                url=i.communications.discord.channel,
-                title=title,
-                message=message,
-                fields=fields,
-                at_everyone=i.communications.discord.ping_everyone
+    # Build every message, then post them concurrently
+    return DiscordClient.post_many(
+        [
+            (
+                i["url"],
+                _build_payload(
+                    i["title"],
+                    i["message"],
+                    i.get("emoji", "🔔"),
+                    i.get("at_everyone", False),
+                    i.get("fields", {}),
+                ),
             )
+            for i in messages
+        ]
+    )
 
-        # Return true
-        return True
 
-    # Return false on error
-    except Exception:
-        return False
+def get_unit_webhooks(unit: str) -> List[Tuple[str, bool]]:
+    """Helper function to get the Discord webhooks of the units under a unit"""
+
+    # Get units below the current unit, returning none if it was not found
+    units = UnitAccess.get_units_below([unit])
+    if units.status != "success":
+        return []
+
+    # Iterate through the unit list and keep the units that have a proper
+    # discord embed link
+    webhooks = []
+    for i in units.message:
+        # If there is no communication field in the unit's info, continue
+        if "communications" not in i:
+            continue
+
+        # If there is no proper discord link, continue
+        if "discord" not in i.communications:
+            continue
+
+        # Add the webhook and whether to ping everyone
+        webhooks.append(
+            (
+                i.communications.discord.channel,
+                i.communications.discord.ping_everyone,
+            )
+        )
+
+    # Return the webhooks
+    return webhooks
@@ -1,90 +1,192 @@
 # Imports
-from utils.html import read_html_file
 from database.unit import UnitAccess
 from database.user import UserAccess
 from email.message import EmailMessage
 from config.config import config
-from typing import Any, Union
+from typing import List, Tuple, Union
+import threading
 import smtplib
+import time
 
 
-def send_email(
-    receiver: Union[str, list], subject: str, content: str, emoji: str = "🔔"
-) -> bool:
-    """Helper function to send an email to a user"""
+class SMTPPool:
+    """Pool of authenticated SMTP connections shared by the process"""
+
+    # Most connections open at once
+    SIZE = 3
+
+    # Seconds an idle connection is kept before the server may drop it
+    IDLE_TIMEOUT = 60
+
+    # Attempts at sending a message over a fresh connection after the
+    # previous one failed
+    RETRIES = 2
+
+    # Static variable declaration
+    _idle = []
+    _lock = threading.Lock()
+    _slots = threading.BoundedSemaphore(SIZE)
+
+    @staticmethod
+    def _connect() -> smtplib.SMTP_SSL:
+        """Method to open and authenticate a new connection"""
+        server = smtplib.SMTP_SSL(
+            config.email.smtp_server, config.email.smtp_port
+        )
+        server.login(config.email.sender_email, config.email.password)
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP_SSL) -> None:
+        """Method to close a connection, ignoring already broken ones"""
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    @staticmethod
+    def _acquire() -> smtplib.SMTP_SSL:
+        """Method to take an idle connection, or open one if there is none"""
+
+        # Take the most recently used idle connection, closing the ones
+        # that sat idle for too long
+        now = time.monotonic()
+        with SMTPPool._lock:
+            while SMTPPool._idle:
+                server, used = SMTPPool._idle.pop()
+                if now - used < SMTPPool.IDLE_TIMEOUT:
+                    return server
+                SMTPPool._close(server)
+
+        # Open a new connection otherwise
+        return SMTPPool._connect()
+
+    @staticmethod
+    def _release(server: smtplib.SMTP_SSL) -> None:
+        """Method to return a working connection to the pool"""
+        with SMTPPool._lock:
+            SMTPPool._idle.append((server, time.monotonic()))
+
+    @staticmethod
+    def send(messages: List[EmailMessage]) -> List[bool]:
+        """Method to send messages over a single pooled connection"""
+
+        # Wait for a free connection slot
+        sent = [False] * len(messages)
+        with SMTPPool._slots:
+            server = None
+            try:
+                for index, message in enumerate(messages):
+                    for attempt in range(SMTPPool.RETRIES + 1):
+                        try:
+                            # Connect if the previous connection failed
+                            if server is None:
+                                server = SMTPPool._acquire()
+
+                            # Send the message over the connection
+                            server.send_message(message)
+                            sent[index] = True
+                            break
+
+                        # Skip a message the server refused, keeping the
+                        # connection
+                        except (
+                            smtplib.SMTPRecipientsRefused,
+                            smtplib.SMTPDataError,
+                            smtplib.SMTPSenderRefused,
+                        ):
+                            print("Email refused -", message["BCC"])
+                            break
+
+                        # Drop a broken connection and retry the message
+                        # over a new one
+                        except (smtplib.SMTPException, OSError):
+                            if server is not None:
+                                SMTPPool._close(server)
+                                server = None
+                            if attempt == SMTPPool.RETRIES:
+                                print("Email failed -", message["BCC"])
+
+                        # Skip a message that cannot be sent at all
+                        except Exception:
+                            print("Email failed -", message["BCC"])
+                            break
+
+            # Return the connection to the pool if it still works
+            finally:
+                if server is not None:
+                    SMTPPool._release(server)
+
+        # Return whether each message was sent
+        return sent
+
+
+def _build_message(
+    receiver: Union[str, list], subject: str, content: str, emoji: str
+) -> EmailMessage:
+    """Helper function to build the message of an email"""
 
     # Convert receivers to a list if it is a single string
     if isinstance(receiver, str):
         receiver = [receiver]
 
-    # Create a new SMTP connection
-    with smtplib.SMTP_SSL(
-        config.email.smtp_server, config.email.smtp_port
-    ) as server:
-        # Try
-        try:
-            # Login to the SMTP server
-            server.login(config.email.sender_email, config.email.password)
-
-            # Create the message
-            emoji = emoji + " " if emoji else ""
-            message = EmailMessage()
-            message["Subject"] = "NOTIFICATION // " + subject
-            message[
-                "From"
-            ] = f"{emoji}‎ WingSuite <{config.email.sender_email}>"
-            message["BCC"] = receiver
-            message.set_content(content)
-
-            # Add the HTML content as an alternative to plain text content
-            message.add_alternative(content, subtype="html")
-
-            # Send message
-            server.send_message(message)
-
-            # Return true
-            print("Email sent -", receiver)
-            return True
-
-        # Return false on error
-        except Exception:
-            print("Error occurred")
-            return False
+    # Create the message
+    emoji = emoji + " " if emoji else ""
+    message = EmailMessage()
+    message["Subject"] = "NOTIFICATION // " + subject
+    message["From"] = f"{emoji}‎ WingSuite <{config.email.sender_email}>"
+    message["BCC"] = receiver
+    message.set_content(content)
 
+    # Add the HTML content as an alternative to plain text content
+    message.add_alternative(content, subtype="html")
 
-def send_email_by_units(
-    unit: str, msg_content: dict, subject: str, emoji: str, **kwargs: Any
+    # Return the message
+    return message
+
+
+def send_email(
+    receiver: Union[str, list], subject: str, content: str, emoji: str = "🔔"
 ) -> bool:
-    """Helper function to send email by units"""
-
-    # Try
-    try:
-        # Get units below the current unit
-        units = UnitAccess.get_units_below([unit]).message
-
-        # Iterate through the units and add the members and officers into
-        # a set for message dispatch
-        personnel = set()
-        for i in units:
-            personnel = personnel.union(i.members)
-            personnel = personnel.union(i.officers)
-        personnel = [UserAccess.get_user(i).message.info for i in personnel]
-        personnel = [i.email for i in personnel]
-
-        # Get feedback HTML content
-        content = read_html_file(**msg_content)
-
-        # Send an email with the HTML content
-        send_email(
-            receiver=personnel,
-            subject=subject,
-            content=content,
-            emoji=emoji,
-        )
+    """Helper function to send an email to a user"""
+
+    # Send the message over a pooled connection
+    [sent] = SMTPPool.send([_build_message(receiver, subject, content, emoji)])
+
+    # Return whether the message was sent
+    if sent:
+        print("Email sent -", receiver)
+    return sent
+
+
+def send_emails(
+    emails: List[Tuple[Union[str, list], str, str, str]],
+) -> List[bool]:
+    """Helper function to send many emails over one pooled connection"""
+
+    # Build every message, then send them one after another
+    sent = SMTPPool.send([_build_message(*i) for i in emails])
+
+    # Return whether each email was sent
+    print(f"Emails sent - {sum(sent)} of {len(emails)}")
+    return sent
+
+
+def get_unit_emails(unit: str) -> List[str]:
+    """Helper function to get the emails of the personnel under a unit"""
+
+    # Get units below the current unit, returning no one if it was not found
+    units = UnitAccess.get_units_below([unit])
+    if units.status != "success":
+        return []
 
-        # Return true
-        return True
+    # Iterate through the units and add the members and officers into a set
+    # for message dispatch
+    personnel = set()
+    for i in units.message:
+        personnel = personnel.union(i.members)
+        personnel = personnel.union(i.officers)
 
-    # Return false on error
-    except Exception:
-        return False
+    # Return the emails, fetching every user in one query
+    users = UserAccess.get_users(list(personnel)).message
+    return [i.info.email for i in users]
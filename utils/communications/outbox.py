@@ -0,0 +1,149 @@
+# Imports
+from utils.communications.discord import (
+    get_unit_webhooks,
+    send_discord_messages,
+)
+from utils.communications.email import get_unit_emails, send_emails
+from utils.background import BackgroundExecutor
+from utils.html import read_html_file
+from database.outbox import OutboxAccess
+from typing import List, Tuple, Union
+import threading
+import time
+
+
+def _send_emails(payloads: List[dict]) -> List[bool]:
+    """Helper function to send outbox emails over one pooled connection"""
+    return send_emails(
+        [
+            (i["receiver"], i["subject"], i["content"], i["emoji"])
+            for i in payloads
+        ]
+    )
+
+
+# Functions that send the payloads of each outbox channel, returning
+# whether each one was sent
+SENDERS = {
+    "email": _send_emails,
+    "discord": send_discord_messages,
+}
+
+# Whether a dispatch was nudged and has not started yet
+_nudged = threading.Event()
+
+
+def email_message(
+    receiver: Union[str, list], subject: str, content: str, emoji: str = "🔔"
+) -> Tuple[str, dict]:
+    """Helper function to build the outbox message of an email"""
+    return (
+        "email",
+        {
+            "receiver": receiver,
+            "subject": subject,
+            "content": content,
+            "emoji": emoji,
+        },
+    )
+
+
+def email_messages_by_units(
+    unit: str, msg_content: dict, subject: str, emoji: str
+) -> List[Tuple[str, dict]]:
+    """Helper function to build the outbox email to the personnel of units"""
+
+    # Return no message if nobody is under the unit
+    personnel = get_unit_emails(unit)
+    if not personnel:
+        return []
+
+    # Return one email to every person, rendered once
+    return [
+        email_message(personnel, subject, read_html_file(**msg_content), emoji)
+    ]
+
+
+def discord_messages_by_units(
+    unit: str, message: str, title: str, fields: List[dict] = []
+) -> List[Tuple[str, dict]]:
+    """Helper function to build the outbox Discord messages of units"""
+    return [
+        (
+            "discord",
+            {
+                "url": url,
+                "title": title,
+                "message": message,
+                "fields": fields,
+                "at_everyone": at_everyone,
+            },
+        )
+        for url, at_everyone in get_unit_webhooks(unit)
+    ]
+
+
+def queue_messages(messages: List[Tuple[str, dict]]) -> int:
+    """Helper function to store messages in the outbox and send them soon"""
+
+    # Store every message in a single write
+    queued = OutboxAccess.enqueue(messages, int(time.time()))
+
+    # Start a dispatch in the background rather than waiting for the
+    # scheduler
+    if queued:
+        nudge()
+
+    # Return the amount of messages queued
+    return queued
+
+
+def nudge() -> None:
+    """Helper function to start a background dispatch unless one is waiting"""
+    if not _nudged.is_set():
+        _nudged.set()
+        if not BackgroundExecutor.submit(dispatch_outbox):
+            _nudged.clear()
+
+
+def dispatch_outbox(**kwargs) -> None:
+    """Function to send the due messages of the outbox"""
+
+    # Let later messages nudge another dispatch
+    _nudged.clear()
+
+    # Dispatch batches of due messages until none are left
+    while True:
+        # Claim the due messages
+        now = int(time.time())
+        claim, messages = OutboxAccess.claim_due(now)
+
+        # Group the messages by channel
+        channels = {}
+        for i in messages:
+            channels.setdefault(i["channel"], []).append(i)
+
+        # Send each channel's messages, keeping the reason of every failure
+        errors = {}
+        for channel, group in channels.items():
+            try:
+                results = SENDERS[channel]([i["payload"] for i in group])
+            except Exception as e:
+                results = [repr(e)] * len(group)
+            for i, result in zip(group, results):
+                if result is not True:
+                    errors[i["_id"]] = result or f"{channel} was not sent"
+
+        # Remove the sent messages and schedule retries for the others
+        sent, dead = OutboxAccess.finish(claim, messages, errors, now)
+
+        # Print debug
+        if messages:
+            print(
+                f"Outbox sent {sent} of {len(messages)} messages, "
+                + f"{dead} dead-lettered"
+            )
+
+        # Stop once a batch came back smaller than the batch size
+        if len(messages) < OutboxAccess.BATCH_SIZE:
+            break
@@ -1,5 +1,59 @@
 # Imports
-from typing import Any
+from typing import Any, ItemsView, ValuesView
+
+
+class ConfigObject(dict):
+    """
+    Represents configuration options' group, works like a dict. Nested
+    dictionaries are converted the first time they are accessed.
+    """
+
+    # Keep every item in the dictionary itself
+    __slots__ = ()
+
+    def __getitem__(self: "ConfigObject", key: Any) -> Any:
+        """Get item, converting a nested dictionary in place"""
+        value = dict.__getitem__(self, key)
+        if type(value) is dict:
+            value = ConfigObject(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self: "ConfigObject", key: Any, default: Any = None) -> Any:
+        """Get item or the default value"""
+        return self[key] if key in self else default
+
+    def _convert_values(self: "ConfigObject") -> None:
+        """Convert every nested dictionary in place"""
+        for key, value in list(dict.items(self)):
+            if type(value) is dict:
+                dict.__setitem__(self, key, ConfigObject(value))
+
+    def values(self: "ConfigObject") -> ValuesView:
+        """Get a view of the converted values"""
+        self._convert_values()
+        return dict.values(self)
+
+    def items(self: "ConfigObject") -> ItemsView:
+        """Get a view of the keys and converted values"""
+        self._convert_values()
+        return dict.items(self)
+
+    def __getattr__(self: "ConfigObject", name: str) -> Any:
+        """Get attribute"""
+
+        # Leave special names to the default lookups, such as copy's
+        if name.startswith("__") and name.endswith("__"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __setattr__(self: "ConfigObject", name: str, val: Any) -> Any:
+        """Set attribute"""
+        self[name] = val
+
+    def __delattr__(self: "ConfigObject", name: str) -> Any:
+        """Delete attribute"""
+        del self[name]
 
 
 def DictParse(config: dict):
@@ -8,32 +62,10 @@ def DictParse(config: dict):
     dot notation (attributes).
     """
 
-    class ConfigObject(dict):
-        """
-        Represents configuration options' group, works like a dict
-        """
-
-        def __init__(self: "ConfigObject", *args: Any, **kwargs: Any) -> None:
-            """Initialization of the parsed dictionary"""
-            dict.__init__(self, *args, **kwargs)
-
-        def __getattr__(self: "ConfigObject", name: str) -> Any:
-            """Get attribute"""
-            return self[name]
-
-        def __setattr__(self: "ConfigObject", name: str, val: Any) -> Any:
-            """Set attribute"""
-            self[name] = val
-
-        def __delattr__(self: "ConfigObject", name: str) -> Any:
-            """Delete attribute"""
-            del self[name]
-
-    # Return requested information
-    if isinstance(config, dict):
-        result = ConfigObject()
-        for key in config:
-            result[key] = DictParse(config[key])
-        return result
+    # Return requested information, reusing converted dictionaries as is
+    if isinstance(config, ConfigObject):
+        return config
+    elif isinstance(config, dict):
+        return ConfigObject(config)
     else:
         return config
@@ -0,0 +1,142 @@
+# Imports
+from utils.dict_parse import DictParse
+from database.base import DataAccessBase
+from models.user import User
+from typing import Any, Callable, List
+import database.base
+import models.user
+import argparse
+import timeit
+import sys
+
+# User document the benchmark parses, with one nested dictionary
+USER_DOC = {
+    "_id": "0123456789abcdef0123456789abcdef",
+    "email": "john.doe@example.com",
+    "first_name": "John",
+    "last_name": "Doe",
+    "middle_initial": "Q",
+    "rank": "Capt",
+    "phone_number": "5555555555",
+    "password": "$2b$12$" + "x" * 53,
+    "permissions": ["user.get_user", "unit.get_unit_info"],
+    "units": ["fedcba9876543210fedcba9876543210"],
+    "feedback_history": [],
+    "datetime_created": 1700000000,
+    "settings": {"theme": "dark", "notify_email": True},
+}
+
+
+def previous_dict_parse(config: dict):
+    """Function to parse dictionaries the way DictParse did before"""
+
+    class ConfigObject(dict):
+        """Class defined on every call, as before"""
+
+        def __init__(self: "ConfigObject", *args: Any, **kwargs: Any) -> None:
+            """Initialization of the parsed dictionary"""
+            dict.__init__(self, *args, **kwargs)
+
+        def __getattr__(self: "ConfigObject", name: str) -> Any:
+            """Get attribute"""
+            return self[name]
+
+        def __setattr__(self: "ConfigObject", name: str, val: Any) -> Any:
+            """Set attribute"""
+            self[name] = val
+
+        def __delattr__(self: "ConfigObject", name: str) -> Any:
+            """Delete attribute"""
+            del self[name]
+
+    # Convert every nested dictionary right away
+    if isinstance(config, dict):
+        result = ConfigObject()
+        for key in config:
+            result[key] = previous_dict_parse(config[key])
+        return result
+    else:
+        return config
+
+
+def _cases(parse: Callable) -> List[tuple]:
+    """Function to build the named cases timed with the given parser"""
+
+    # Wrap a function the way the data access layer does
+    def dict_wrap(func: Callable) -> Callable:
+        """Stand-in for DataAccessBase.dict_wrap using the given parser"""
+        return lambda: parse(func())
+
+    # Return every case, the user documents being copied per run
+    users = [dict(USER_DOC) for _ in range(20)]
+    return [
+        ("DictParse(user doc)", lambda: parse(dict(USER_DOC))),
+        ("User(**doc)", lambda: User(**USER_DOC)),
+        (
+            "dict_wrap(sendSuccess(User))",
+            dict_wrap(
+                lambda: DataAccessBase.sendSuccess(User(**USER_DOC).info)
+            ),
+        ),
+        (
+            "dict_wrap(list of 20 user infos)",
+            dict_wrap(
+                lambda: DataAccessBase.sendSuccess(
+                    [User(**i).info for i in users]
+                )
+            ),
+        ),
+        (
+            "dict_wrap(sendSuccess(raw doc))",
+            dict_wrap(lambda: DataAccessBase.sendSuccess(dict(USER_DOC))),
+        ),
+    ]
+
+
+def _time(parse: Callable, number: int) -> List[float]:
+    """Function to time every case in microseconds per document"""
+
+    # Make the models and the data access layer use the given parser
+    models.user.DictParse = parse
+    database.base.DictParse = parse
+    try:
+        results = []
+        for name, case in _cases(parse):
+            per_call = min(timeit.repeat(case, number=number, repeat=3))
+            documents = 20 if "20" in name else 1
+            results.append(per_call / number / documents * 1e6)
+        return results
+
+    # Restore the current parser
+    finally:
+        models.user.DictParse = DictParse
+        database.base.DictParse = DictParse
+
+
+def main(argv: List[str] = None) -> int:
+    """Function to compare DictParse with its previous implementation"""
+
+    # Parse the arguments
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.dict_parse_benchmark",
+        description="Time DictParse against the previous implementation",
+    )
+    parser.add_argument(
+        "--number", type=int, default=2000, help="runs of every case"
+    )
+    args = parser.parse_args(argv)
+
+    # Time both implementations and print them side by side
+    before = _time(previous_dict_parse, args.number)
+    after = _time(DictParse, args.number)
+    print(f"{'microseconds per document':<38}{'before':>8}{'after':>8}")
+    for (name, _), old, new in zip(_cases(DictParse), before, after):
+        print(f"{name:<38}{old:>8.2f}{new:>8.2f}")
+
+    # Return the exit code
+    return 0
+
+
+# Run the benchmark when called as a module
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,51 @@
 # Imports
 from config.config import html_map, config
 from bs4 import BeautifulSoup
-from typing import Any
+from typing import Any, List
+import threading
 import re
+import os
+
+
+class TemplateCache:
+    """Cache of HTML templates split around their placeholders"""
+
+    # Pattern of a placeholder, capturing its key
+    PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+    # Whether to reload templates changed on disk, as in development mode
+    RELOAD = os.environ.get("RUN_MODE") == "0"
+
+    # Static variable declaration
+    _templates = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _load(path: str) -> List[str]:
+        """Method to read a template and split it around its placeholders"""
+
+        # Split the content so that the odd parts are the placeholder keys
+        with open(path, "r", encoding="utf-8") as file:
+            return TemplateCache.PLACEHOLDER.split(file.read())
+
+    @staticmethod
+    def get(template: str) -> List[str]:
+        """Method to get the split content of a template"""
+
+        # Get the cached template, unless it changed on disk in development
+        path = html_map[template]
+        mtime = os.path.getmtime(path) if TemplateCache.RELOAD else None
+        cached = TemplateCache._templates.get(template)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        # Load the template and cache it
+        parts = TemplateCache._load(path)
+        with TemplateCache._lock:
+            TemplateCache._templates[template] = (mtime, parts)
+
+        # Return the split content
+        return parts
 
 
 def read_html_file(template: str, **kwargs: Any) -> str:
@@ -11,16 +54,15 @@ def read_html_file(template: str, **kwargs: Any) -> str:
     # Insert organization's name to kwargs
     kwargs["org_name"] = config.organization_name
 
-    # Get the content of the file
-    with open(html_map[template], "r", encoding="utf-8") as file:
-        content = file.read()
-
-    # Iterate over the dictionary and replace the placeholders
-    for key, value in kwargs.items():
-        content = re.sub(r"\{" + key + r"\}", value, content)
+    # Fill every placeholder in a single pass, leaving the ones without a
+    # value as they are
+    content = TemplateCache.get(template)[:]
+    for i in range(1, len(content), 2):
+        key = content[i]
+        content[i] = kwargs[key] if key in kwargs else "{" + key + "}"
 
     # Return the contents of the file
-    return content
+    return "".join(content)
 
 
 def strip_html(content: str) -> str:
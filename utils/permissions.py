@@ -1,6 +1,11 @@
 # Imports
 from database.unit import UnitAccess
-from typing import List
+from typing import Dict, FrozenSet, List
+
+
+def getCommandedUnits(user: str) -> FrozenSet[str]:
+    """Get every unit the given user commands directly or from above"""
+    return UnitAccess.get_unit_tree().commanded.get(user, frozenset())
 
 
 def isOfficerFromAbove(units: List[dict], user: str) -> str:
@@ -10,13 +15,15 @@ def isOfficerFromAbove(units: List[dict], user: str) -> str:
     if type(units) is not list:
         units = [units]
 
-    # Get the list of officers from superior units of the given units
-    superior_officers = [
-        i.officers for i in UnitAccess.get_units_above(units).message
-    ]
-    superior_officers = set(
-        element for sublist in superior_officers for element in sublist
-    )
+    # Return true if any of the units is commanded by the user
+    return not getCommandedUnits(user).isdisjoint(units)
+
+
+def isOfficerFromAboveBulk(units: List[str], user: str) -> Dict[str, bool]:
+    """Check which of the given units the user is a superior officer of"""
+
+    # Get the units the user commands
+    commanded = getCommandedUnits(user)
 
-    # Return true if the user's ID is in the list
-    return user in superior_officers
+    # Return the result for each unit
+    return {unit: unit in commanded for unit in units}
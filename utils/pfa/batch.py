@@ -0,0 +1,100 @@
+# Imports
+from utils.pfa.calculator import (
+    BRACKET_AGES,
+    COMPILED_TABLES,
+    FAILING_SCORE,
+    _seconds,
+)
+from typing import Sequence
+import numpy as np
+
+# Genders with score tables, in the order their tables are stacked
+GENDERS = list(COMPILED_TABLES)
+
+# Amount of age brackets of every gender
+BRACKETS = len(BRACKET_AGES) + 1
+
+
+def _stack_reps(index: int) -> np.ndarray:
+    """Function to stack a repetition subscore of every table by count"""
+
+    # Every table scores from no repetitions up to the highest maxing count
+    compiled = [t[index] for v in COMPILED_TABLES.values() for t in v]
+    stacked = np.full((len(compiled), max(c[0] for c in compiled) + 1), 20.0)
+
+    # Fail counts below the minimum, then fill in the scored ones
+    for row, (top, bottom, scores) in enumerate(compiled):
+        stacked[row, :bottom] = FAILING_SCORE
+        stacked[row, bottom:top] = scores
+
+    # Return the stacked scores
+    return stacked
+
+
+def _stack_run() -> np.ndarray:
+    """Function to stack the run subscore of every table by second"""
+
+    # Every table scores up to its slowest time, with a failing last column
+    compiled = [t[2] for v in COMPILED_TABLES.values() for t in v]
+    stacked = np.full(
+        (len(compiled), max(len(c[1]) for c in compiled) + 1),
+        float(FAILING_SCORE),
+    )
+
+    # Fill in the scored times, maxing anything at or under the maxing time
+    for row, (maxing, scores) in enumerate(compiled):
+        slowest, maxed = len(scores), maxing + 1
+        stacked[row, :slowest] = scores
+        stacked[row, 1:maxed] = 60
+
+    # Return the stacked scores
+    return stacked
+
+
+# Stacked subscores of every table, ordered like the compiled tables
+PUSHUP_SCORES = _stack_reps(0)
+SITUP_SCORES = _stack_reps(1)
+RUN_SCORES = _stack_run()
+
+
+def calculate_pfa_batch(
+    genders: Sequence[str],
+    ages: Sequence[int],
+    pushups: Sequence[int],
+    situps: Sequence[int],
+    run_times: Sequence[str],
+) -> np.ndarray:
+    """Function to calculate the composite scores of many PFAs at once"""
+
+    # Find the table of every entry, from its gender and age bracket
+    gender = np.array(
+        [GENDERS.index(i) if i in GENDERS else -1 for i in genders],
+        dtype=np.int64,
+    )
+    table = gender * BRACKETS + np.searchsorted(
+        BRACKET_AGES, np.asarray(ages, dtype=float), side="right"
+    )
+    table[gender < 0] = 0
+
+    # Look up every subscore, clamping the counts and times to the tables
+    pushup_idx = np.trunc(np.asarray(pushups, dtype=float))
+    situp_idx = np.trunc(np.asarray(situps, dtype=float))
+    run_idx = np.array([_seconds(i) for i in run_times], dtype=np.int64)
+    composite = (
+        PUSHUP_SCORES[
+            table,
+            np.clip(pushup_idx, 0, PUSHUP_SCORES.shape[1] - 1).astype(int),
+        ]
+        + SITUP_SCORES[
+            table,
+            np.clip(situp_idx, 0, SITUP_SCORES.shape[1] - 1).astype(int),
+        ]
+        + RUN_SCORES[table, np.clip(run_idx, 0, RUN_SCORES.shape[1] - 1)]
+    )
+
+    # Failed PFAs score zero and unknown genders cannot be scored
+    composite[composite < 0] = 0
+    composite[gender < 0] = -1
+
+    # Return the composite scores in the order they were given
+    return composite
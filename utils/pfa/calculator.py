@@ -1,5 +1,6 @@
 # Imports
 from datetime import datetime
+from functools import lru_cache
 from utils.pfa.male import (
     MaleScoreA,
     MaleScoreB,
@@ -22,8 +23,42 @@ from utils.pfa.female import (
     FemaleScoreH,
     FemaleScoreI,
 )
-
-
+import bisect
+
+# Score that fails the whole PFA when any component gets it
+FAILING_SCORE = -100000
+
+# Lowest age of every age bracket after the first one
+BRACKET_AGES = [25, 30, 35, 40, 45, 50, 55, 60]
+
+# Score tables of every gender, ordered by age bracket
+SCORE_TABLES = {
+    "male": [
+        MaleScoreA,
+        MaleScoreB,
+        MaleScoreC,
+        MaleScoreD,
+        MaleScoreE,
+        MaleScoreF,
+        MaleScoreG,
+        MaleScoreH,
+        MaleScoreI,
+    ],
+    "female": [
+        FemaleScoreA,
+        FemaleScoreB,
+        FemaleScoreC,
+        FemaleScoreD,
+        FemaleScoreE,
+        FemaleScoreF,
+        FemaleScoreG,
+        FemaleScoreH,
+        FemaleScoreI,
+    ],
+}
+
+
+@lru_cache(maxsize=4096)
 def _seconds(time_str: str) -> int:
     """Function to turn time in `mm:ss` format to integer seconds"""
 
@@ -37,158 +72,111 @@ def _seconds(time_str: str) -> int:
     return total_seconds
 
 
-def _in_range(range_str_map: dict, run_time: str) -> float:
-    """Function to return the run subscore from given run time"""
+def _compile_reps(rep_map: dict) -> tuple:
+    """Function to turn a repetition mapping into an array of scores"""
+
+    # The mappings go from the maxing repetitions down to the minimum ones
+    keys = list(rep_map.keys())
+    top, bottom = keys[0], keys[-1]
+
+    # Return the bounds and the score of every repetition count in between
+    return top, bottom, [rep_map.get(i) for i in range(bottom, top)]
+
+
+def _compile_run(run_map: dict) -> tuple:
+    """Function to turn a run mapping into an array of scores by second"""
+
+    # Get the maxing time and the range of every other score
+    keys = list(run_map.keys())
+    ranges = []
+    for i in keys[1:]:
+        if run_map[i] != 60:
+            start, end = [_seconds(j.strip()) for j in i.split("-")]
+            ranges.append((start, end, run_map[i]))
+
+    # Give every second the score of the first range that holds it
+    scores = [FAILING_SCORE] * (max(i[1] for i in ranges) + 1)
+    for start, end, score in reversed(ranges):
+        for i in range(start, end + 1):
+            scores[i] = score
+
+    # Return the maxing time and the scores
+    return _seconds(keys[0]), scores
 
-    # Iterate through each key
-    for i in range_str_map:
-        # Continue if the value of the iterated key is 60
-        if range_str_map[i] == 60:
-            continue
 
-        # Get the range of the iterate key
-        time_range = []
-        for j in i.split("-"):
-            time_range.append(_seconds(j.strip()))
+def _compile(table: type) -> tuple:
+    """Function to compile a score table for constant time lookups"""
+    return (
+        _compile_reps(table.pushup_map),
+        _compile_reps(table.situp_map),
+        _compile_run(table.run_map),
+    )
 
-        # Return value if the given run_time_str is in range
-        if run_time >= time_range[0] and run_time <= time_range[1]:
-            # Return
-            return range_str_map[i]
 
-    # Return large negative value if not in range
-    return -100000
+# Compiled score tables of every gender, ordered by age bracket
+COMPILED_TABLES = {
+    k: [_compile(i) for i in v] for k, v in SCORE_TABLES.items()
+}
+
+
+def _rep_score(compiled: tuple, reps: int) -> float:
+    """Function to return a repetition subscore from a compiled mapping"""
+
+    # Get the score of the repetitions, failing any below the minimum
+    top, bottom, scores = compiled
+    if reps >= top:
+        return 20
+    score = scores[int(reps) - bottom]
+    if score is None:
+        raise KeyError(int(reps))
+    return score
 
 
 def calculate_pfa(
     gender: str, age: int, pushups: int, situps: int, run_time: str
 ) -> float:
-    """Function to give path to file that contains the correct score specs"""
-
-    # Get the dictionary mappings
-    pushup_map = {}
-    situp_map = {}
-    run_map = {}
+    """Function to calculate the composite score of a PFA"""
 
-    #
-    #   MAPPING
-    #
-
-    # Map for males
-    if gender == "male":
-        if age < 25:
-            pushup_map = MaleScoreA.pushup_map
-            situp_map = MaleScoreA.situp_map
-            run_map = MaleScoreA.run_map
-        elif age >= 25 and age <= 29:
-            pushup_map = MaleScoreB.pushup_map
-            situp_map = MaleScoreB.situp_map
-            run_map = MaleScoreB.run_map
-        elif age >= 30 and age <= 34:
-            pushup_map = MaleScoreC.pushup_map
-            situp_map = MaleScoreC.situp_map
-            run_map = MaleScoreC.run_map
-        elif age >= 35 and age <= 39:
-            pushup_map = MaleScoreD.pushup_map
-            situp_map = MaleScoreD.situp_map
-            run_map = MaleScoreD.run_map
-        elif age >= 40 and age <= 44:
-            pushup_map = MaleScoreE.pushup_map
-            situp_map = MaleScoreE.situp_map
-            run_map = MaleScoreE.run_map
-        elif age >= 45 and age <= 49:
-            pushup_map = MaleScoreF.pushup_map
-            situp_map = MaleScoreF.situp_map
-            run_map = MaleScoreF.run_map
-        elif age >= 50 and age <= 54:
-            pushup_map = MaleScoreG.pushup_map
-            situp_map = MaleScoreG.situp_map
-            run_map = MaleScoreG.run_map
-        elif age >= 55 and age <= 59:
-            pushup_map = MaleScoreH.pushup_map
-            situp_map = MaleScoreH.situp_map
-            run_map = MaleScoreH.run_map
-        elif age >= 60:
-            pushup_map = MaleScoreI.pushup_map
-            situp_map = MaleScoreI.situp_map
-            run_map = MaleScoreI.run_map
-    elif gender == "female":
-        if age < 25:
-            pushup_map = FemaleScoreA.pushup_map
-            situp_map = FemaleScoreA.situp_map
-            run_map = FemaleScoreA.run_map
-        elif age >= 25 and age <= 29:
-            pushup_map = FemaleScoreB.pushup_map
-            situp_map = FemaleScoreB.situp_map
-            run_map = FemaleScoreB.run_map
-        elif age >= 30 and age <= 34:
-            pushup_map = FemaleScoreC.pushup_map
-            situp_map = FemaleScoreC.situp_map
-            run_map = FemaleScoreC.run_map
-        elif age >= 35 and age <= 39:
-            pushup_map = FemaleScoreD.pushup_map
-            situp_map = FemaleScoreD.situp_map
-            run_map = FemaleScoreD.run_map
-        elif age >= 40 and age <= 44:
-            pushup_map = FemaleScoreE.pushup_map
-            situp_map = FemaleScoreE.situp_map
-            run_map = FemaleScoreE.run_map
-        elif age >= 45 and age <= 49:
-            pushup_map = FemaleScoreF.pushup_map
-            situp_map = FemaleScoreF.situp_map
-            run_map = FemaleScoreF.run_map
-        elif age >= 50 and age <= 54:
-            pushup_map = FemaleScoreG.pushup_map
-            situp_map = FemaleScoreG.situp_map
-            run_map = FemaleScoreG.run_map
-        elif age >= 55 and age <= 59:
-            pushup_map = FemaleScoreH.pushup_map
-            situp_map = FemaleScoreH.situp_map
-            run_map = FemaleScoreH.run_map
-        elif age >= 60:
-            pushup_map = FemaleScoreI.pushup_map
-            situp_map = FemaleScoreI.situp_map
-            run_map = FemaleScoreI.run_map
-    else:
+    # Get the compiled tables of the gender's age bracket
+    if gender not in COMPILED_TABLES:
         return -1
+    pushup_map, situp_map, run_map = COMPILED_TABLES[gender][
+        bisect.bisect_right(BRACKET_AGES, age)
+    ]
 
     # Variable declaration
     composite = 0
     run_time = _seconds(run_time)
-    pushup_keys = list(pushup_map.keys())
-    situp_keys = list(situp_map.keys())
-    run_keys = list(run_map.keys())
 
     #
     #   PUSHUP CALCULATIONS
     #
 
-    if pushups < pushup_keys[-1]:
-        composite = -100000
-    elif pushups >= pushup_keys[0]:
-        composite += 20
+    if pushups < pushup_map[1]:
+        composite = FAILING_SCORE
     else:
-        composite += pushup_map[int(pushups)]
+        composite += _rep_score(pushup_map, pushups)
 
     #
     #   SITUP CALCULATIONS
     #
 
-    if situps < situp_keys[-1]:
-        composite = -100000
-    elif situps >= situp_keys[0]:
-        composite += 20
+    if situps < situp_map[1]:
+        composite = FAILING_SCORE
     else:
-        composite += situp_map[int(situps)]
+        composite += _rep_score(situp_map, situps)
 
     #
     #   RUN CALCULATIONS
     #
 
-    if run_time <= _seconds(run_keys[0]) and run_time != 0:
+    maxing, scores = run_map
+    if run_time <= maxing and run_time != 0:
         composite += 60
+    elif run_time < len(scores):
+        composite += scores[run_time]
     else:
-        composite += _in_range(run_map, run_time)
+        composite += FAILING_SCORE
 
     # Return composite
     return composite if composite > 0 else 0
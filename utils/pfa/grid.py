@@ -0,0 +1,80 @@
+# Imports
+from utils.pfa.calculator import BRACKET_AGES, COMPILED_TABLES, FAILING_SCORE
+from typing import Optional, Tuple
+import hashlib
+import bisect
+import json
+
+# Seconds clients may reuse an exported grid before revalidating it
+MAX_AGE = 86400
+
+
+def _bracket_grid(index: int, compiled: tuple) -> dict:
+    """Function to export a compiled table in a compact form"""
+
+    # Get the compiled subscores
+    pushup, situp, (maxing, run) = compiled
+
+    # Skip the failing times before the slowest scored range starts
+    start = next(i for i, v in enumerate(run) if v != FAILING_SCORE)
+
+    # Return the grid, where repetitions below `min` fail, repetitions from
+    # `max` score 20, run times up to `max` score 60 and run times outside
+    # the scores fail
+    return {
+        "age_from": BRACKET_AGES[index - 1] if index > 0 else None,
+        "age_below": (
+            BRACKET_AGES[index] if index < len(BRACKET_AGES) else None
+        ),
+        "pushup": {"min": pushup[1], "max": pushup[0], "scores": pushup[2]},
+        "situp": {"min": situp[1], "max": situp[0], "scores": situp[2]},
+        "run": {"max": maxing, "from": start, "scores": run[start:]},
+    }
+
+
+def _payload(message: dict) -> Tuple[bytes, str]:
+    """Function to serialize a grid response and hash it into an ETag"""
+
+    # Serialize the response the same way every time
+    body = json.dumps(
+        {"status": "success", "message": message},
+        separators=(",", ":"),
+        sort_keys=True,
+    ).encode()
+
+    # Return the body and its hash
+    return body, hashlib.sha256(body).hexdigest()
+
+
+# Exported grids of every gender, ordered by age bracket
+SCORE_GRIDS = {
+    k: [_bracket_grid(i, t) for i, t in enumerate(v)]
+    for k, v in COMPILED_TABLES.items()
+}
+
+# Serialized responses of every gender and bracket selection
+PAYLOADS = {
+    (gender, bracket): _payload(
+        {
+            k: v if bracket is None else [v[bracket]]
+            for k, v in SCORE_GRIDS.items()
+            if gender is None or k == gender
+        }
+    )
+    for gender in [None] + list(SCORE_GRIDS)
+    for bracket in [None] + list(range(len(BRACKET_AGES) + 1))
+}
+
+
+def get_score_grid(
+    gender: str = None, age: float = None
+) -> Optional[Tuple[bytes, str]]:
+    """Function to get the serialized grids of a gender and age, or all"""
+
+    # Check if the gender has grids
+    if gender is not None and gender not in SCORE_GRIDS:
+        return None
+
+    # Return the response of the selected grids
+    bracket = None if age is None else bisect.bisect_right(BRACKET_AGES, age)
+    return PAYLOADS[(gender, bracket)]
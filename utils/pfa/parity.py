@@ -0,0 +1,182 @@
+# Imports
+from datetime import datetime
+from utils.pfa.calculator import SCORE_TABLES, calculate_pfa
+from typing import Any, List
+import argparse
+import random
+import time
+import sys
+
+# Genders checked, including one the calculator does not know
+GENDERS = ["male", "female", "unknown"]
+
+# Ages checked, covering every bracket and its bounds
+AGES = list(range(17, 70))
+
+
+def _reference_seconds(time_str: str) -> int:
+    """Function to turn time in `mm:ss` format to seconds, as before"""
+
+    # Parse the time and convert it to seconds
+    time_obj = datetime.strptime(time_str, "%M:%S")
+    return time_obj.minute * 60 + time_obj.second
+
+
+def _reference_in_range(range_str_map: dict, run_time: int) -> float:
+    """Function to return the run subscore by scanning ranges, as before"""
+
+    # Return the score of the first range holding the run time
+    for i in range_str_map:
+        if range_str_map[i] == 60:
+            continue
+        time_range = [_reference_seconds(j.strip()) for j in i.split("-")]
+        if run_time >= time_range[0] and run_time <= time_range[1]:
+            return range_str_map[i]
+
+    # Return large negative value if not in range
+    return -100000
+
+
+def _reference_table(gender: str, age: int) -> Any:
+    """Function to pick the score table with the previous age checks"""
+
+    # Match the previous if/elif ladder of every bracket
+    tables = SCORE_TABLES[gender]
+    if age < 25:
+        return tables[0]
+    for i, low in enumerate(range(25, 60, 5), 1):
+        if age >= low and age <= low + 4:
+            return tables[i]
+    if age >= 60:
+        return tables[-1]
+    return None
+
+
+def reference_pfa(
+    gender: str, age: int, pushups: int, situps: int, run_time: str
+) -> float:
+    """Function to score a PFA the way the calculator did before"""
+
+    # Return an invalid score for an unknown gender
+    if gender not in SCORE_TABLES:
+        return -1
+
+    # Get the dictionary mappings
+    table = _reference_table(gender, age)
+    pushup_map = table.pushup_map
+    situp_map = table.situp_map
+    run_map = table.run_map
+
+    # Variable declaration
+    composite = 0
+    run_time = _reference_seconds(run_time)
+    pushup_keys = list(pushup_map.keys())
+    situp_keys = list(situp_map.keys())
+    run_keys = list(run_map.keys())
+
+    # Score the pushups
+    if pushups < pushup_keys[-1]:
+        composite = -100000
+    elif pushups >= pushup_keys[0]:
+        composite += 20
+    else:
+        composite += pushup_map[int(pushups)]
+
+    # Score the situps
+    if situps < situp_keys[-1]:
+        composite = -100000
+    elif situps >= situp_keys[0]:
+        composite += 20
+    else:
+        composite += situp_map[int(situps)]
+
+    # Score the run
+    if run_time <= _reference_seconds(run_keys[0]) and run_time != 0:
+        composite += 60
+    else:
+        composite += _reference_in_range(run_map, run_time)
+
+    # Return composite
+    return composite if composite > 0 else 0
+
+
+def _cases(samples: int, seed: int) -> List[tuple]:
+    """Function to build the PFA cases to compare"""
+
+    # Vary each component over its whole range with the others fixed
+    cases = []
+    for gender in GENDERS:
+        for age in AGES:
+            for reps in range(90):
+                cases.append((gender, age, reps, 40, "12:00"))
+                cases.append((gender, age, 50, reps, "12:00"))
+            for secs in range(40 * 60):
+                run = "%02d:%02d" % divmod(secs, 60)
+                cases.append((gender, age, 50, 50, run))
+
+    # Add random composites of every component
+    rng = random.Random(seed)
+    for _ in range(samples):
+        run = "%02d:%02d" % divmod(rng.randint(0, 1500), 60)
+        cases.append(
+            (
+                rng.choice(GENDERS[:2]),
+                rng.choice(AGES),
+                rng.randint(0, 80),
+                rng.randint(0, 80),
+                run,
+            )
+        )
+
+    # Return the cases
+    return cases
+
+
+def main(argv: List[str] = None) -> int:
+    """Function to compare the calculator against the previous scoring"""
+
+    # Parse the arguments
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.pfa.parity",
+        description="Compare PFA scores with the previous implementation",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=200000,
+        help="amount of random composite cases",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=1, help="seed of the random cases"
+    )
+    args = parser.parse_args(argv)
+
+    # Compare every case, printing the first few mismatches
+    cases = _cases(args.samples, args.seed)
+    mismatches = 0
+    for case in cases:
+        expected = reference_pfa(*case)
+        actual = calculate_pfa(*case)
+        if expected != actual or type(expected) is not type(actual):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"Mismatch {case}: {expected} != {actual}")
+    print(f"Checked {len(cases)} cases, {mismatches} mismatches")
+
+    # Time both implementations on the same case
+    case = ("male", 27, 45, 50, "10:30")
+    implementations = [("previous", reference_pfa), ("current", calculate_pfa)]
+    for name, func in implementations:
+        start = time.perf_counter()
+        for _ in range(20000):
+            func(*case)
+        elapsed = (time.perf_counter() - start) / 20000 * 1e6
+        print(f"{name}: {elapsed:.1f}us per call")
+
+    # Return the exit code
+    return 1 if mismatches else 0
+
+
+# Run the comparison when called as a module
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+# Imports
+from utils.pfa.calculator import calculate_pfa
+from typing import List, Tuple
+
+
+def rescore_chunk(docs: List[dict]) -> Tuple[List[tuple], List[str]]:
+    """Function to recompute the composite scores of stored PFAs"""
+
+    # Variable declaration
+    changes = []
+    failures = []
+
+    # Score every PFA the same way the PFA model does, keeping the changes
+    for doc in docs:
+        try:
+            score = calculate_pfa(
+                doc["info"]["gender"],
+                doc["info"]["age"],
+                doc["subscores"]["pushup"],
+                doc["subscores"]["situp"],
+                doc["subscores"]["run"],
+            )
+        except Exception:
+            failures.append(doc["_id"])
+            continue
+        if score != doc.get("composite_score"):
+            changes.append((doc["_id"], doc.get("composite_score"), score))
+
+    # Return the changed scores and the PFAs that could not be scored
+    return changes, failures